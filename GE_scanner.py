@@ -8,490 +8,111 @@
 지표        : 일목균형표 · MACD · CCI · RSI · BB · 거래량
 신호        : 12단계 (한국 스캐너와 동일 로직)
 
-실행: streamlit run global_scanner.py
-필요 패키지: pip install streamlit yfinance pandas numpy
+실행: streamlit run GE_scanner.py
+헤드리스: python -m gescan sp500 -o sp500.csv   (Streamlit 불필요, gescan/cli.py 참고)
+백그라운드: python -m gescan.daemon  (마감 후 자동 스캔 → 화면은 최신 결과 스냅샷을 바로 표시)
+여러 지수: 사이드바 '여러 지수 동시 스캔' — 겹치는 종목은 한 번만 받고 계산
+필요 패키지: pip install -r requirements.txt
 """
 
 import streamlit as st
-import yfinance as yf
-import pandas as pd
 import numpy as np
+import pandas as pd
+import os
+import time
 import urllib.parse
-from concurrent.futures import ThreadPoolExecutor, as_completed
-
-# ─────────────────────────────────────────────
-# 하드코딩 폴백 종목 목록
-# ─────────────────────────────────────────────
-
-DOW30 = [
-    ("AAPL","Apple"),("AMGN","Amgen"),("AXP","AmEx"),("BA","Boeing"),
-    ("CAT","Caterpillar"),("CRM","Salesforce"),("CSCO","Cisco"),
-    ("CVX","Chevron"),("DIS","Disney"),("DOW","Dow Inc"),
-    ("GS","Goldman"),("HD","Home Depot"),("HON","Honeywell"),
-    ("IBM","IBM"),("INTC","Intel"),("JNJ","J&J"),("JPM","JPMorgan"),
-    ("KO","Coca-Cola"),("MCD","McDonald's"),("MMM","3M"),
-    ("MRK","Merck"),("MSFT","Microsoft"),("NKE","Nike"),
-    ("PG","P&G"),("TRV","Travelers"),("UNH","UnitedHealth"),
-    ("V","Visa"),("VZ","Verizon"),("WBA","Walgreens"),("WMT","Walmart"),
-]
-
-DAX40 = [
-    ("ADS.DE","Adidas"),("AIR.DE","Airbus"),("ALV.DE","Allianz"),
-    ("BAS.DE","BASF"),("BAYN.DE","Bayer"),("BEI.DE","Beiersdorf"),
-    ("BMW.DE","BMW"),("BNR.DE","Brenntag"),("CON.DE","Continental"),
-    ("1COV.DE","Covestro"),("DHER.DE","Delivery Hero"),("DB1.DE","Deutsche Boerse"),
-    ("DBK.DE","Deutsche Bank"),("DHL.DE","DHL Group"),("DTE.DE","Deutsche Telekom"),
-    ("EOAN.DE","E.ON"),("FRE.DE","Fresenius"),("HNR1.DE","Hannover Re"),
-    ("HEI.DE","HeidelbergMaterials"),("HEN3.DE","Henkel"),("IFX.DE","Infineon"),
-    ("INL.DE","Inlining"),("LIN.DE","Linde"),("MBG.DE","Mercedes-Benz"),
-    ("MRK.DE","Merck KGaA"),("MTX.DE","MTU Aero"),("MUV2.DE","Munich Re"),
-    ("PAH3.DE","Porsche Holding"),("RHM.DE","Rheinmetall"),("RWE.DE","RWE"),
-    ("SAP.DE","SAP"),("SHL.DE","Siemens Healthineers"),("SIE.DE","Siemens"),
-    ("SRT3.DE","Sartorius"),("SY1.DE","Symrise"),("VNA.DE","Vonovia"),
-    ("VOW3.DE","Volkswagen"),("ZAL.DE","Zalando"),
-]
-
-NASDAQ100_SAMPLE = [
-    ("AAPL","Apple"),("MSFT","Microsoft"),("NVDA","Nvidia"),("AMZN","Amazon"),
-    ("META","Meta"),("GOOGL","Alphabet A"),("GOOG","Alphabet C"),("TSLA","Tesla"),
-    ("AVGO","Broadcom"),("COST","Costco"),("NFLX","Netflix"),("AMD","AMD"),
-    ("ADBE","Adobe"),("QCOM","Qualcomm"),("INTC","Intel"),("TXN","Texas Instr"),
-    ("AMAT","Applied Materials"),("INTU","Intuit"),("AMGN","Amgen"),("ISRG","Intuitive Surgical"),
-    ("BKNG","Booking"),("VRTX","Vertex"),("REGN","Regeneron"),("MU","Micron"),
-    ("LRCX","Lam Research"),("KLAC","KLA"),("MRVL","Marvell"),("SNPS","Synopsys"),
-    ("CDNS","Cadence"),("PANW","Palo Alto"),("CRWD","CrowdStrike"),("MELI","MercadoLibre"),
-    ("ADI","Analog Devices"),("ABNB","Airbnb"),("ORLY","O'Reilly"),("CSX","CSX"),
-    ("PYPL","PayPal"),("PCAR","Paccar"),("MAR","Marriott"),("FTNT","Fortinet"),
-    ("ADP","ADP"),("DXCM","Dexcom"),("ASML","ASML"),("TEAM","Atlassian"),
-    ("MNST","Monster"),("CHTR","Charter"),("BIIB","Biogen"),("IDXX","IDEXX"),
-    ("WDAY","Workday"),("CTAS","Cintas"),
-]
-
-INDICES = {
-    "🇺🇸 S&P 500":    "sp500",
-    "🇺🇸 나스닥 100":  "nasdaq100",
-    "🇺🇸 다우존스 30": "dow30",
-    "🇩🇪 DAX 40":     "dax40",
-}
-CURRENCY = {"sp500":"USD","nasdaq100":"USD","dow30":"USD","dax40":"EUR"}
 
+from gescan import universe
+from gescan.backtest import backtest
+from gescan.daemon import daemon_status, load_results, request_refresh
+from gescan.diff import previous_results, render_diff
+from gescan.fetch import FAILED, STATS
+from gescan.pipeline import make_pool, run_pipeline
+from gescan.provider import YAHOO, FileProvider
+from gescan.record import TF_COLS, render, sig_codes, to_frame
+from gescan.results import METRICS, ResultView, frame_metrics
+from gescan.health import FetchHealth
+from gescan.headless import (fan_out, fan_out_changes, fetch_period, make_fetch, run_scan,
+                             union_meta)
+from gescan.memo import ResultMemo, memo_key
+from gescan.panel import TAIL_BARS, TAIL_TOL
+from gescan.query import Screener, load_screens, save_screen
+from gescan.scheduler import FetchScheduler
+from gescan.store import BarStore
+from gescan.timeframe import TF
+from gescan.trace import Trace
+from gescan.universe import CURRENCY, INDICES, select_tickers
 
 # ─────────────────────────────────────────────
-# 종목 목록 로드
+# 스타일
 # ─────────────────────────────────────────────
-
-@st.cache_data(ttl=3600)
-def load_tickers(index_key: str):
-    """Wikipedia 파싱 → 실패 시 하드코딩 폴백"""
-    try:
-        if index_key == "sp500":
-            df = pd.read_html(
-                "https://en.wikipedia.org/wiki/List_of_S%26P_500_companies"
-            )[0]
-            return [{"ticker": r["Symbol"].replace(".","-"),
-                     "name":   r["Security"],
-                     "sector": r.get("GICS Sector","")}
-                    for _, r in df.iterrows()]
-
-        elif index_key == "dow30":
-            tables = pd.read_html(
-                "https://en.wikipedia.org/wiki/Dow_Jones_Industrial_Average"
-            )
-            for t in tables:
-                if "Symbol" in t.columns:
-                    return [{"ticker": str(r["Symbol"]).strip(),
-                             "name":   str(r.get("Company", r["Symbol"])).strip(),
-                             "sector": str(r.get("Industry","")).strip()}
-                            for _, r in t.iterrows()
-                            if str(r["Symbol"]).isalpha()]
-
-        elif index_key == "nasdaq100":
-            tables = pd.read_html(
-                "https://en.wikipedia.org/wiki/Nasdaq-100"
-            )
-            for t in tables:
-                cols_low = {c.lower(): c for c in t.columns}
-                if "ticker" in cols_low:
-                    tc = cols_low["ticker"]
-                    nc = cols_low.get("company", cols_low.get("name", tc))
-                    return [{"ticker": str(r[tc]).strip(),
-                             "name":   str(r[nc]).strip(),
-                             "sector": ""}
-                            for _, r in t.iterrows()
-                            if str(r[tc]).isalpha()]
-
-        elif index_key == "dax40":
-            tables = pd.read_html("https://en.wikipedia.org/wiki/DAX")
-            for t in tables:
-                cols_low = {c.lower(): c for c in t.columns}
-                if "ticker" in cols_low:
-                    tc = cols_low["ticker"]
-                    nc = cols_low.get("company", cols_low.get("name", tc))
-                    rows = [{"ticker": str(r[tc]).strip(),
-                             "name":   str(r[nc]).strip(),
-                             "sector": ""}
-                            for _, r in t.iterrows()
-                            if str(r[tc]).endswith(".DE")]
-                    if rows:
-                        return rows
-    except Exception:
-        pass
-
-    # 폴백
-    fallback = {
-        "dow30":    DOW30,
-        "dax40":    DAX40,
-        "nasdaq100":NASDAQ100_SAMPLE,
-        "sp500":    DOW30,   # sp500 파싱 실패 시 다우 30개로 대체
+# 셀 색은 표시 문자열이 아니라 수치 결과의 코드로 정한다 — 코드표(gescan.record)와 같은 순서의
+# CSS 목록을 코드 배열로 한 번에 색인 (셀마다 파이썬 함수를 부르지 않음)
+
+_B='font-weight:bold'
+SIG_CSS=['color:white;background-color:#b71c1c;'+_B, 'color:#ef5350;'+_B,    # 적극매수 · 매수관심
+         'color:#ff8f00;'+_B, 'color:#8d6e63;'+_B,                           # 진입준비 · 바닥탐색
+         'color:#2e7d32;'+_B, 'color:#558b2f', 'color:#78909c',              # 홀딩유지 · 추세상승 · 구름대내부
+         'color:#9e9e9e',                                                    # 관망
+         'color:white;background-color:#e65100;'+_B,                         # 구름대주의
+         'color:white;background-color:#4a148c;'+_B,                         # 하락가속
+         'color:#1565c0;'+_B, 'color:#42a5f5;'+_B,                           # 추세하락 · 매도관심
+         'color:white;background-color:#0d47a1;'+_B]                        # 적극매도
+ICH_CSS=['color:#ef5350', 'color:white;background-color:#c62828;'+_B,        # 구름대 위 · 상향돌파
+         'color:#ff8f00;'+_B, 'color:#9e9e9e',                               # 상승진입 · 내부
+         'color:white;background-color:#e65100;'+_B,                         # 하락진입
+         'color:#64b5f6', 'color:white;background-color:#1565c0;'+_B]        # 구름대 아래 · 하향이탈
+RSI_CSS=['color:#43a047;'+_B, 'color:#1e88e5', '', 'color:#fb8c00', 'color:#e53935;'+_B]
+CCI_CSS=['color:#43a047;'+_B, 'color:#1e88e5;'+_B, 'color:#fb8c00;'+_B,      # 과매도탈출 · 제로크로스 · 과매수탈출
+         'color:#e53935;'+_B, 'color:#e53935', 'color:#43a047', '']          # 제로데드 · 과매수 · 과매도 · 중립
+MA_CSS =['color:#42a5f5', 'color:#ef5350', 'color:#ef5350;'+_B, 'color:#42a5f5;'+_B]  # MA_X 순서
+BB_CSS =['color:#ef9a00;'+_B, 'color:#26a69a;'+_B, '']
+SC_CSS =np.array(['color:white;background-color:#1565c0;'+_B, 'color:#42a5f5;'+_B,   # ≤-5 · -4~-2
+                  'color:#9e9e9e', 'color:#ef5350;'+_B,                            # -1~1 · 2~4
+                  'color:white;background-color:#c62828;'+_B], dtype=object)       # ≥5
+
+def _css(table, codes):
+    return np.array(['', *table], dtype=object)[np.asarray(codes, dtype=int) + 1]   # -1 → ''
+
+def _sign(a):
+    return np.where(np.asarray(a, dtype=float) >= 0, 'color:#ef5350', 'color:#42a5f5')
+
+def cell_styles(df, cols):
+    """수치 결과 프레임 → render(df) 와 같은 모양의 CSS 프레임"""
+    ma = np.stack([df[k].to_numpy(dtype=int) for k in ('ma5','ma20','ma60')])
+    # MA크로스 강조 순서: GC · DC · 위 · 아래
+    mx = np.select([(ma==2).any(0), (ma==3).any(0), (ma==1).any(0)], [2, 3, 1], 0)
+    vr = np.round(df['vr'].to_numpy(dtype=float), 1)
+    css = {
+        '신호': _css(SIG_CSS, df['sig']), '일목': _css(ICH_CSS, df['ich']),
+        'RSI': _css(RSI_CSS, df['rsi_z']), 'CCI': _css(CCI_CSS, df['cci_z']),
+        '총점': SC_CSS[np.digitize(df['score'].to_numpy(dtype=int), [-4, -1, 2, 5])],
+        '등락률': _sign(np.round(df['chg'], 2)), '이격률': _sign(np.round(df['disp'], 2)),
+        'MA크로스': _css(MA_CSS, mx), 'BB': _css(BB_CSS, df['bb_sq']),
+        '거래량': np.where(vr>=2, 'color:#ef5350', np.where(vr<0.5, 'color:#64b5f6', '')),
+        **{lbl: _css(SIG_CSS, df[k]) for k, lbl in TF_COLS.items() if lbl in cols},
     }
-    return [{"ticker": t, "name": n, "sector": ""}
-            for t, n in fallback.get(index_key, [])]
-
-
-# ─────────────────────────────────────────────
-# 지표 계산
-# ─────────────────────────────────────────────
-
-def calc_rsi(s: pd.Series, p=14) -> pd.Series:
-    d = s.diff()
-    g = d.clip(lower=0);  l = -d.clip(upper=0)
-    ag = g.ewm(com=p-1, min_periods=p).mean()
-    al = l.ewm(com=p-1, min_periods=p).mean()
-    return 100 - 100/(1 + ag/al.replace(0, np.nan))
-
-def calc_cci(hi, lo, cl, p=20) -> pd.Series:
-    tp  = (hi+lo+cl)/3
-    ma  = tp.rolling(p).mean()
-    mad = tp.rolling(p).apply(lambda x: np.abs(x-x.mean()).mean(), raw=True)
-    return (tp-ma)/(0.015*mad.replace(0,np.nan))
-
-def calc_bb(s: pd.Series, p=20, k=2.0):
-    ma = s.rolling(p).mean()
-    sd = s.rolling(p).std()
-    return ma+k*sd, ma-k*sd, (2*k*sd/ma*100)
-
-def bb_squeeze(bw: pd.Series):
-    cur = bw.iloc[-1]; r = bw.iloc[-20:]
-    if cur <= r.quantile(0.20): return "⚡수축", True
-    if cur >= r.quantile(0.80): return "💥팽창", False
-    return "➖보통", False
-
-
-# ─────────────────────────────────────────────
-# 12단계 신호
-# ─────────────────────────────────────────────
-
-def calc_signal(last, prev, ich, rsi_v, cci_now, cci_pv, disp):
-    sc = 0; det = {}
-
-    # ① 구름대
-    if   '상향돌파' in ich: s= 3
-    elif '하향이탈' in ich: s=-3
-    elif '상승진입' in ich: s= 1
-    elif '하락진입' in ich: s=-2
-    else:                   s= 0
-    sc+=s; det['구름대']=s
-
-    # ② MACD
-    hn=last['mh']; hp=prev['mh']; sl=hn-hp
-    if   hn>0 and hp<=0: s= 2
-    elif hn<0 and hp>=0: s=-2
-    elif hn<0 and sl>0:  s= 1
-    elif hn>0 and sl<0:  s=-1
-    else:                s= 0
-    sc+=s; det['MACD']=s
-
-    # ③ CCI
-    if   cci_pv<-100 and cci_now>=-100: s= 2
-    elif cci_pv<   0 and cci_now>=   0: s= 1
-    elif cci_pv>   0 and cci_now<=   0: s=-1
-    elif cci_pv> 100 and cci_now<= 100: s=-2
-    else:                               s= 0
-    sc+=s; det['CCI']=s
-
-    # ④ 이격률
-    if   disp> 20: s=-3
-    elif disp> 12: s=-2
-    elif disp>  6: s=-1
-    elif disp>=-3: s= 0
-    elif disp>=-8: s= 1
-    else:          s= 2
-    sc+=s; det['이격률']=s
-
-    # ⑤ 거래량
-    vr = last.get('vr', np.nan)
-    ht = (det['구름대']!=0 or abs(det['MACD'])>=1 or abs(det['CCI'])>=1)
-    if not pd.isna(vr):
-        if   vr>=1.5 and ht: s= 1
-        elif vr< 0.5:        s=-1
-        else:                s= 0
-    else: s=0
-    sc+=s; det['거래량']=s
-
-    # 플래그
-    ab  = '구름대 위'  in ich or '상향돌파' in ich
-    bel = '구름대 아래' in ich or '하향이탈' in ich
-    fe  = '하락진입'   in ich
-    ins = '내부'       in ich
-    cb_o= det['구름대']== 3;  cb_d=det['구름대']==-3
-    mu  = det['MACD']  >= 1;  md  =det['MACD']  <=-1
-    cu  = det['CCI']   >  0;  cd  =det['CCI']   < 0
-    hid = disp>15;  mid= 6<disp<=15;  lod=disp<-10
-
-    if fe:
-        sig="⚠️ 구름대주의"
-    elif sc>=7 and cb_o and mu and cu:
-        sig="🔥 적극매수"
-    elif sc>=4 and not hid and (cb_o or mu or cu) and sum([cb_o,mu,cu])>=2:
-        sig="📈 매수관심"
-    elif sc>=2 and disp<=6 and ht and not fe:
-        sig="🌱 진입준비"
-    elif bel and (mu or cu) and sc>=0:
-        sig="🔄 바닥탐색"
-    elif bel and md and cd:
-        sig="🔻 하락가속"
-    elif sc<=-5 and cb_d and md and cd:
-        sig="🧊 적극매도"
-    elif sc<=-3:
-        sig="📉 매도관심"
-    elif bel and lod:
-        sig="🔽 추세하락"
-    elif ab and hid:
-        sig="🔼 추세상승"
-    elif ab and mid and not ht:
-        sig="🛡️ 홀딩유지"
-    elif ins:
-        sig="🌫️ 구름대내부"
-    else:
-        sig="⏸️ 관망"
-    return sc, sig
-
-
-# ─────────────────────────────────────────────
-# 종목 분석
-# ─────────────────────────────────────────────
+    return pd.DataFrame({c: css.get(c, '') for c in cols}, index=range(len(df)), columns=cols)
 
-def analyze(ticker, name, sector, currency):
-    try:
-        raw = yf.download(
-            ticker, period="18mo", interval="1d",
-            auto_adjust=True, progress=False, timeout=15
-        )
-        if raw is None or len(raw) < 80:
-            return None
-
-        # MultiIndex 처리
-        if isinstance(raw.columns, pd.MultiIndex):
-            raw.columns = raw.columns.get_level_values(0)
-        raw.columns = [str(c).strip() for c in raw.columns]
-
-        df = raw[['High','Low','Close','Volume']].copy()
-        df.columns = ['H','L','C','V']
-        df = df.dropna(subset=['C']).sort_index()
-
-        # 이동평균
-        df['ma5']  = df['C'].rolling(5).mean()
-        df['ma20'] = df['C'].rolling(20).mean()
-        df['ma60'] = df['C'].rolling(60).mean()
-
-        # 일목균형표
-        h9 =df['H'].rolling(9).max(); l9 =df['L'].rolling(9).min()
-        h26=df['H'].rolling(26).max();l26 =df['L'].rolling(26).min()
-        h52=df['H'].rolling(52).max();l52 =df['L'].rolling(52).min()
-        tk=(h9+l9)/2; kj=(h26+l26)/2; sb=(h52+l52)/2
-        sa_fut = ((tk+kj)/2).shift(26)
-        sb_fut = sb.shift(26)
-        df['sa']=sa_fut; df['sb']=sb_fut
-
-        # MACD
-        e12=df['C'].ewm(span=12,adjust=False).mean()
-        e26=df['C'].ewm(span=26,adjust=False).mean()
-        macd=e12-e26
-        df['mh']=macd - macd.ewm(span=9,adjust=False).mean()
-
-        # RSI / CCI / BB / Volume ratio
-        df['RSI'] = calc_rsi(df['C'])
-        df['CCI'] = calc_cci(df['H'],df['L'],df['C'])
-        df['bbu'],df['bbl'],df['bbw'] = calc_bb(df['C'])
-        df['vr']  = df['V'] / df['V'].rolling(20).mean()
-
-        df_f = df.dropna(subset=['sa','sb','RSI','CCI','bbw','mh']).copy()
-        if len(df_f) < 6:
-            return None
-
-        rows = [df_f.iloc[-i] for i in range(1,6)]
-        last,prev,p2,p3,p4 = rows
-
-        # 일목 상태
-        def ct(r): return max(r['sa'],r['sb'])
-        def cb(r): return min(r['sa'],r['sb'])
-        an = last['C']>ct(last); bn=last['C']<cb(last)
-
-        bkd=None
-        if an:
-            for d,r in enumerate([prev,p2,p3,p4],1):
-                if r['C']<=ct(r): bkd=d; break
-        bdd=None
-        if bn:
-            for d,r in enumerate([prev,p2,p3,p4],1):
-                if r['C']>=cb(r): bdd=d; break
-
-        if an:
-            ich = f"🔥 상향돌파({bkd}일전)" if bkd else "📈 구름대 위"
-        elif bn:
-            ich = f"🧊 하향이탈({bdd}일전)" if bdd else "📉 구름대 아래"
-        else:
-            pr=[prev,p2,p3,p4]
-            wa=any(r['C']>ct(r) for r in pr)
-            wb=any(r['C']<cb(r) for r in pr)
-            if wa and not wb:   ich="⚠️ 구름대하락진입"
-            elif wb and not wa: ich="🌱 구름대상승진입"
-            else:               ich="🌫️ 구름대 내부"
-
-        # MA 크로스
-        def mx(l,p,col):
-            if p['C']<=p[col] and l['C']>l[col]: return "🔥GC"
-            if p['C']>=p[col] and l['C']<l[col]: return "🧊DC"
-            return "📈↑" if l['C']>l[col] else "📉↓"
-        mat=f"5:{mx(last,prev,'ma5')} 20:{mx(last,prev,'ma20')} 60:{mx(last,prev,'ma60')}"
-
-        # RSI 표시
-        rv=round(last['RSI'],1)
-        rd=(f"{rv} 🟢과매도" if rv<=30 else f"{rv} 🔵관심" if rv<=45 else
-            f"{rv} ⚪중립"   if rv<=55 else f"{rv} 🟡주의"  if rv<=70 else
-            f"{rv} 🔴과매수")
-
-        # CCI 표시
-        cn=last['CCI']; cp=prev['CCI']; cv=round(cn,1)
-        if   cp<-100 and cn>=-100: cd=f"{cv} 🟢과매도탈출"
-        elif cp<   0 and cn>=   0: cd=f"{cv} 🔵제로크로스"
-        elif cp> 100 and cn<= 100: cd=f"{cv} 🟡과매수탈출"
-        elif cp>   0 and cn<=   0: cd=f"{cv} 🔴제로데드"
-        elif cn> 100:              cd=f"{cv} ⚡과매수"
-        elif cn<-100:              cd=f"{cv} 💧과매도"
-        else:                      cd=f"{cv} ➖중립"
-
-        # BB
-        bsq,_=bb_squeeze(df_f['bbw'])
-        bp=("상단" if last['C']>=last['bbu'] else
-            "하단" if last['C']<=last['bbl'] else "내부")
-        bbd=f"{bsq}/{bp}"
-
-        # 거래량
-        vr=round(last['vr'],1) if not pd.isna(last['vr']) else 1.0
-        vd=f"{vr}배 📈" if vr>=2 else f"{vr}배 📉" if vr<0.5 else f"{vr}배"
-
-        # 이격률
-        disp=((last['C']/last['ma20'])-1)*100 if last['ma20']>0 else 0
-        df_=f"{'+' if disp>=0 else ''}{round(disp,2)}%"
-
-        # 등락률
-        chg=round(((last['C']-prev['C'])/prev['C'])*100,2)
-        cf=f"{'+' if chg>=0 else ''}{chg}%"
-
-        # 신호
-        sc,sig=calc_signal(last,prev,ich,rv,cn,cp,disp)
-
-        pf=round(last['C'],2)
-        chart=f"https://finance.yahoo.com/chart/{ticker}"
-
-        return [ticker,name,sector,cf,f"{pf} {currency}",df_,sc,sig,
-                ich,mat,rd,cd,bbd,vd,chart]
-    except Exception:
-        return None
+PAGE=100   # 한 번에 그리는 행 수
 
-
-# ─────────────────────────────────────────────
-# 스타일
-# ─────────────────────────────────────────────
-
-def sty_sig(v):
-    v=str(v)
-    if '적극매수'   in v: return 'color:white;background-color:#b71c1c;font-weight:bold'
-    if '매수관심'   in v: return 'color:#ef5350;font-weight:bold'
-    if '진입준비'   in v: return 'color:#ff8f00;font-weight:bold'
-    if '바닥탐색'   in v: return 'color:#8d6e63;font-weight:bold'
-    if '홀딩유지'   in v: return 'color:#2e7d32;font-weight:bold'
-    if '추세상승'   in v: return 'color:#558b2f'
-    if '구름대내부' in v: return 'color:#78909c'
-    if '구름대주의' in v: return 'color:white;background-color:#e65100;font-weight:bold'
-    if '하락가속'   in v: return 'color:white;background-color:#4a148c;font-weight:bold'
-    if '추세하락'   in v: return 'color:#1565c0;font-weight:bold'
-    if '매도관심'   in v: return 'color:#42a5f5;font-weight:bold'
-    if '적극매도'   in v: return 'color:white;background-color:#0d47a1;font-weight:bold'
-    return 'color:#9e9e9e'
-
-def sty_ich(v):
-    v=str(v)
-    if '상향돌파' in v: return 'color:white;background-color:#c62828;font-weight:bold'
-    if '하향이탈' in v: return 'color:white;background-color:#1565c0;font-weight:bold'
-    if '하락진입' in v: return 'color:white;background-color:#e65100;font-weight:bold'
-    if '상승진입' in v: return 'color:#ff8f00;font-weight:bold'
-    if '구름대 위'   in v: return 'color:#ef5350'
-    if '구름대 아래' in v: return 'color:#64b5f6'
-    return 'color:#9e9e9e'
-
-def sty_rsi(v):
-    v=str(v)
-    if '과매도' in v: return 'color:#43a047;font-weight:bold'
-    if '🔵' in v:     return 'color:#1e88e5'
-    if '과매수' in v: return 'color:#e53935;font-weight:bold'
-    if '🟡' in v:     return 'color:#fb8c00'
-    return ''
-
-def sty_cci(v):
-    v=str(v)
-    if '과매도탈출' in v: return 'color:#43a047;font-weight:bold'
-    if '제로크로스' in v: return 'color:#1e88e5;font-weight:bold'
-    if '제로데드'   in v: return 'color:#e53935;font-weight:bold'
-    if '과매수탈출' in v: return 'color:#fb8c00;font-weight:bold'
-    if '과매수'     in v: return 'color:#e53935'
-    if '과매도'     in v: return 'color:#43a047'
-    return ''
-
-def sty_sc(v):
-    try:
-        n=int(v)
-        if n>= 5: return 'color:white;background-color:#c62828;font-weight:bold'
-        if n>= 2: return 'color:#ef5350;font-weight:bold'
-        if n>=-1: return 'color:#9e9e9e'
-        if n>=-4: return 'color:#42a5f5;font-weight:bold'
-        return 'color:white;background-color:#1565c0;font-weight:bold'
-    except: return ''
-
-def sty_pct(v):
-    v=str(v)
-    if v.startswith('+'): return 'color:#ef5350'
-    if v.startswith('-'): return 'color:#42a5f5'
-    return ''
-
-COLS=['티커','종목명','섹터','등락률','현재가','이격률','총점','신호',
-      '일목','MA크로스','RSI','CCI','BB','거래량','차트']
-
-def show_df(df):
+def show_df(df, key=None):
+    """
+    수치 결과 프레임 → 표 — 보이는 페이지만 render · 스타일 (총점순 PAGE 행씩)
+    key 가 있으면 페이지 선택, 없으면 첫 페이지만 (스캔 중 반복 갱신용)
+    """
     if df.empty:
         st.info("데이터 없음"); return
-    h=(len(df)+1)*35+3
-    styled=(
-        df.style
-        .map(sty_sig, subset=['신호'])
-        .map(sty_ich, subset=['일목'])
-        .map(sty_rsi, subset=['RSI'])
-        .map(sty_cci, subset=['CCI'])
-        .map(sty_sc,  subset=['총점'])
-        .map(sty_pct, subset=['등락률','이격률'])
-        .map(lambda x:('color:#ef5350;font-weight:bold' if '🔥' in str(x) else
-                       'color:#42a5f5;font-weight:bold' if '🧊' in str(x) else
-                       'color:#ef5350' if '📈' in str(x) else
-                       'color:#42a5f5' if '📉' in str(x) else ''),
-             subset=['MA크로스'])
-        .map(lambda x:('color:#ef9a00;font-weight:bold' if '⚡' in str(x) else
-                       'color:#26a69a;font-weight:bold' if '💥' in str(x) else ''),
-             subset=['BB'])
-        .map(lambda x:('color:#ef5350' if '📈' in str(x) else
-                       'color:#64b5f6' if '📉' in str(x) else ''),
-             subset=['거래량'])
-    )
+    pages=-(-len(df)//PAGE); pg=1
+    if pages>1 and key is not None:
+        if st.session_state.get(key,1)>pages: st.session_state[key]=1
+        pg=st.number_input(f"페이지 (전체 {len(df)}개 · {pages}쪽)",1,pages,1,key=key)
+    elif pages>1:
+        st.caption(f"총점 상위 {PAGE}개 표시 · 전체 {len(df)}개")
+    page=df.iloc[(pg-1)*PAGE:pg*PAGE]
+    view=render(page)
+    h=(len(view)+1)*35+3
+    styled=view.style.apply(lambda _: cell_styles(page, view.columns), axis=None)
     import streamlit as _st
     _st.dataframe(styled, use_container_width=True, height=h,
         column_config={
@@ -503,6 +124,8 @@ def show_df(df):
             "이격률": _st.column_config.TextColumn("이격",  width="small"),
             "총점":   _st.column_config.NumberColumn("점수",width="small"),
             "신호":   _st.column_config.TextColumn("신호",  width="medium"),
+            "주봉":   _st.column_config.TextColumn("주봉",  width="medium"),
+            "월봉":   _st.column_config.TextColumn("월봉",  width="medium"),
             "일목":   _st.column_config.TextColumn("일목",  width="medium"),
             "MA크로스":_st.column_config.TextColumn("MA",   width="medium"),
             "RSI":    _st.column_config.TextColumn("RSI",   width="small"),
@@ -518,27 +141,119 @@ def show_df(df):
 # 메트릭 / 필터
 # ─────────────────────────────────────────────
 
-def upd_metrics(df):
-    bk='적극매수|매수관심'; fk='하락가속|추세하락|적극매도'; sk='매도관심|적극매도'
-    m_tot.metric("전체",     f"{len(df)}개")
-    m_buy.metric("매수계열", f"{len(df[df['신호'].str.contains(bk,regex=True)])}개")
-    m_ent.metric("진입/바닥",f"{len(df[df['신호'].str.contains('진입준비|바닥탐색',regex=True)])}개")
-    m_cau.metric("구름대주의",f"{len(df[df['신호'].str.contains('구름대주의')])}개")
-    m_fal.metric("하락계열", f"{len(df[df['신호'].str.contains(fk,regex=True)])}개")
-    m_sel.metric("매도관심↓",f"{len(df[df['신호'].str.contains(sk,regex=True)])}개")
+def upd_metrics(mc):
+    """mc: {메트릭 라벨: 개수} (ResultView.metrics / metric_counts)"""
+    m_tot.metric("전체", f"{mc['전체']}개")
+    for m,(lbl,_) in zip([m_buy,m_ent,m_cau,m_fal,m_sel],METRICS):
+        m.metric(lbl, f"{mc[lbl]}개")
+
+# 필터 버튼 → 신호 코드
+FILTERS={"매수":sig_codes("적극매수","매수관심"),"진입준비":sig_codes("진입준비"),
+         "바닥탐색":sig_codes("바닥탐색"),"홀딩":sig_codes("홀딩유지","추세상승"),
+         "구름대주의":sig_codes("구름대주의"),"하락가속":sig_codes("하락가속","추세하락"),
+         "매도":sig_codes("매도")}
+
+def scr(df):
+    """결과 프레임별 Screener — 정렬 색인은 프레임마다 한 번 (재실행 간 유지)"""
+    c=st.session_state.setdefault('gq',[])
+    for s in c:
+        if s.df is df: return s
+    c[:]=c[-7:]+[Screener(df)]
+    return c[-1]
 
 def apf(df, f):
-    fm={"매수":"적극매수|매수관심","진입준비":"진입준비","바닥탐색":"바닥탐색",
-        "홀딩":"홀딩유지|추세상승","구름대주의":"구름대주의",
-        "하락가속":"하락가속|추세하락","매도":"매도"}
-    if f in fm: return df[df['신호'].str.contains(fm[f],regex=True)]
-    return df
+    """
+    수치 결과 프레임 필터 (신호 코드 비교) — 상위 시간대 확인을 켜면 같은 계열 신호만
+    조건 검색(qry)이 있으면 함께 적용
+    """
+    m = np.ones(len(df), bool)
+    if f in FILTERS:
+        m &= df['sig'].isin(FILTERS[f]).to_numpy()
+        for k in confirm:
+            if (df[k]>=0).any(): m &= df[k].isin(FILTERS[f]).to_numpy()   # 계산 안 한 결과(스냅샷 등)는 그대로
+    if qry: m &= scr(df).mask(qry)
+    return df if m.all() else df[m]
+
+
+def health_note(h):
+    """불량 종목 · 차단기 요약 (없으면 빈 문자열)"""
+    if h is None: return ""
+    x=[f"불량 제외 {len(h.skipped)}개" if h.skipped else "",
+       f"새 불량 {len(h.marked)}개" if h.marked else "",
+       f"요청 차단 감지 {h.trips}회 (대기 후 재시도)" if h.trips else ""]
+    return " | ".join(v for v in x if v)
+
+def show_trace(tr):
+    """스캔 후 단계별 소요 시간 요약"""
+    with st.expander("⏱️ 단계별 소요 시간", expanded=False):
+        c1,c2=st.columns([3,2])
+        c1.dataframe(tr.stages().round(2), hide_index=True, use_container_width=True)
+        c2.dataframe(tr.slowest(10), hide_index=True, use_container_width=True)
+        cn=" · ".join(f"{k} {v}" for k,v in tr.counts.items())
+        qd=f"대기열 평균 {sum(tr.depth)/len(tr.depth):.1f} · 최대 {max(tr.depth)}" if tr.depth else ""
+        st.caption(" | ".join(x for x in (cn,qd) if x) or "특이사항 없음")
+        if tr.errors:
+            st.caption("오류: "+", ".join(f"{t}({e})" for t,e in list(tr.errors.items())[:20]))
+
+
+def show_changes(gc):
+    """직전 스캔 대비 변화 — gc: {제목: gescan.diff.diff 결과}"""
+    n=sum(len(d) for d in gc.values())
+    with st.expander(f"🔀 직전 스캔 대비 변화 ({n}개)", expanded=0<n<=50):
+        if not n: st.caption("바뀐 종목 없음"); return
+        for lbl,d in gc.items():
+            if not len(d): continue
+            if len(gc)>1: st.markdown(f"**{lbl}**")
+            st.dataframe(render_diff(d), hide_index=True, use_container_width=True)
+
+
+def show_multi(gm):
+    """여러 지수 결과 — 메트릭은 중복 제거한 합집합 기준, 표는 지수별 탭"""
+    if not any(len(d) for d in gm.values()):
+        with ra: st.info("데이터 없음"); return
+    upd_metrics(frame_metrics(pd.concat(gm.values()).drop_duplicates('ticker')))
+    rt.subheader(f"🔍 {len(gm)}개 지수 결과 ({st.session_state.gf})")
+    with ra.container():
+        dds={k:apf(d,st.session_state.gf) for k,d in gm.items()}
+        for tab,(k,dd) in zip(st.tabs([f"{IDX_LBL[k]} ({len(d)})" for k,d in dds.items()]),
+                              dds.items()):
+            with tab: show_df(dd, key=f"pg_{k}_{st.session_state.gf}")
 
 
 # ─────────────────────────────────────────────
 # UI
 # ─────────────────────────────────────────────
 
+IDX_LBL={v:k for k,v in INDICES.items()}
+
+load_universe=st.cache_data(ttl=600)(universe.load_universe)
+
+def load_tickers(index_key):
+    return load_universe(index_key)[0]
+
+@st.cache_data(ttl=30)
+def latest_results(index_key):
+    return load_results(index_key)
+
+@st.cache_resource
+def get_store():
+    return BarStore()
+
+@st.cache_resource
+def get_pool(n):
+    return make_pool(n)
+
+@st.cache_resource
+def get_memo():
+    # 세션 · 재실행 간 공유 → 방금 계산한 종목은 다른 탭 · 다른 지수 스캔에서도 바로 재사용
+    return ResultMemo()
+
+@st.cache_resource
+def get_sched():
+    # 세션 간 공유 → 여러 사용자가 동시에 스캔해도 요청률 제한이 한 곳에서 적용됨
+    return FetchScheduler()
+
+
 st.set_page_config(page_title="🌍 글로벌 스마트 스캐너", layout="wide")
 st.title("🌍 글로벌 스마트 스캐너")
 st.caption("미국(S&P 500 / 나스닥 100 / 다우존스) · 독일(DAX 40) | 데이터: Yahoo Finance")
@@ -549,16 +264,59 @@ idx_lbl  = st.sidebar.selectbox("지수 선택", list(INDICES.keys()))
 idx_key  = INDICES[idx_lbl]
 curr     = CURRENCY[idx_key]
 
+if st.sidebar.button("🔄 종목 목록 갱신", use_container_width=True,
+        help="Wikipedia 에서 구성 종목을 다시 받아 검증 후 저장 (평소에는 저장된 목록 사용)"):
+    ok,msg=universe.refresh(idx_key); load_universe.clear()
+    (st.sidebar.success if ok else st.sidebar.warning)(msg)
+
+multi = st.sidebar.checkbox("여러 지수 동시 스캔", False,
+    help="선택한 지수의 종목 합집합을 한 번만 받고 계산해 지수별로 나눠 표시 (겹치는 종목 중복 제거)")
+idx_sel = st.sidebar.multiselect("스캔할 지수", list(INDICES), default=list(INDICES)[1:],
+    disabled=not multi)
+
 sec_f = ""
-if idx_key == "sp500":
+if idx_key == "sp500" and not multi:
     st.sidebar.markdown("---")
     sec_f = st.sidebar.text_input("섹터 필터 (예: Technology)", placeholder="비워두면 전체")
 
 st.sidebar.markdown("---")
 max_n = st.sidebar.slider("최대 종목 수", 10, 500, 50, 10,
     help="S&P 500 전체(500개)는 약 8~10분")
-n_wk  = st.sidebar.slider("병렬 다운로드", 1, 10, 5,
-    help="높을수록 빠르나 Yahoo 차단 위험↑")
+data_dir = st.sidebar.text_input("로컬 데이터 디렉터리", placeholder="비워두면 Yahoo Finance",
+    help="종목별 파일 <종목>.parquet 또는 <종목>.csv 를 읽음 (python -m gescan.provider 참고)")
+prov = None
+if data_dir:
+    try: prov = FileProvider(data_dir)
+    except ValueError as e: st.sidebar.error(str(e))
+adaptive = st.sidebar.checkbox("적응형 요청 제어", prov is None, disabled=prov is not None,
+    help="응답 상태에 따라 요청 속도·동시성을 자동 조절 (429·타임아웃 시 감속, 재시도)")
+n_wk  = st.sidebar.slider("병렬 다운로드", 1, 10, 5, disabled=adaptive,
+    help="동시에 진행할 다운로드·캐시 작업 수 · 높을수록 빠르나 Yahoo 차단 위험↑")
+n_cpu = st.sidebar.slider("계산 프로세스", 0, os.cpu_count() or 1,
+    min(4, os.cpu_count() or 1),
+    help="지표·신호 계산 프로세스 수 · 0 이면 화면 스레드에서 계산")
+n_bt  = st.sidebar.slider("배치 크기", 10, 200, 50, 10,
+    help="한 번의 요청으로 받는 종목 수")
+use_cache = st.sidebar.checkbox("로컬 캐시 사용", prov is None, disabled=prov is not None,
+    help="받아둔 일봉을 재사용하고 새 봉만 추가로 받음")
+rebuild   = st.sidebar.checkbox("캐시 재구축", False, disabled=not use_cache,
+    help="분할·수정주가 반영을 위해 전체 이력을 다시 받음")
+retry_bad = st.sidebar.checkbox("불량 종목 다시 시도", False, disabled=not use_cache,
+    help="상장폐지·잘못된 심볼 등 최근 받지 못해 건너뛰는 종목도 요청")
+CALC={"패널":"panel","증분":"online","종목별":"ticker","최근 창":"tail"}
+calc  = CALC[st.sidebar.selectbox("지표 계산", list(CALC), index=1 if use_cache else 0,
+    help="패널: 배치 전체를 한 번에 계산 · 증분: 캐시에 저장된 지표 상태에 새 봉만 반영"
+         f" · 최근 창: 최근 {TAIL_BARS}봉만 받고 계산 (전체 이력 대비 오차 {TAIL_TOL:.0e} 이내)")]
+if calc=="online" and not use_cache: calc="panel"
+lowmem = st.sidebar.checkbox("메모리 절약 (float32 · memmap)", False,
+    disabled=calc not in ("panel","tail"),
+    help="패널 계산 배열을 float32 로 두고, 계산 프로세스에는 배치를 memmap 파일로 넘겨 공유 · 대형 유니버스용")
+f32 = dict(dtype="float32", mmap=True) if lowmem and calc in ("panel","tail") else {}
+TF_LBL={v[1]:k for k,v in TF.items()}
+tfs = tuple(TF_LBL[l] for l in st.sidebar.multiselect("상위 시간대 신호", list(TF_LBL),
+    help="받은 일봉을 주봉·월봉으로 묶어 같은 12단계 신호를 계산 (추가 요청 없음, 일봉을 2년·8년치 받음)"))
+confirm = [f"sig_{k.lower()}" for k in tfs] if st.sidebar.checkbox("필터에 상위 시간대 확인",
+    False, disabled=not tfs, help="신호 필터를 누르면 주봉·월봉도 같은 계열 신호인 종목만") else []
 
 st.sidebar.markdown("---")
 st.sidebar.markdown("""
@@ -575,6 +333,18 @@ st.sidebar.markdown("""
 - 이격률 ±3 · 거래량 ±1
 """)
 go = st.sidebar.button("🚀 분석 시작", use_container_width=True)
+svc = daemon_status()
+if st.sidebar.button("⚡ 지금 갱신 (백그라운드)", use_container_width=True,
+        disabled=not (svc and svc['alive']),
+        help="스캔 서비스(python -m gescan.daemon)에 즉시 스캔을 요청 · 끝나면 새 스냅샷이 표시됨"):
+    request_refresh(idx_key)
+    st.sidebar.info("갱신 요청됨 — 서비스가 다음 확인(최대 1분) 때 스캔합니다")
+st.sidebar.caption("🟢 스캔 서비스 실행 중" if svc and svc['alive'] else
+                   "⚪ 스캔 서비스 꺼짐 — '분석 시작'으로 직접 스캔")
+with st.sidebar.expander("🧪 신호 백테스트"):
+    bt_p  = st.selectbox("이력 기간", ["2y","5y","10y"], index=1)
+    bt_go = st.button("백테스트 실행", use_container_width=True,
+        help="선택한 지수의 전 기간 · 전 종목 신호별 이후 5/20/60일 수익률과 적중률")
 
 # 메트릭
 st.subheader("📊 진단 현황")
@@ -593,60 +363,201 @@ for col,lbl,key in zip(fb,
     ["전체","매수","진입준비","바닥탐색","홀딩","구름대주의","하락가속","매도"]):
     if col.button(lbl, use_container_width=True): st.session_state.gf=key
 
+# 조건 검색
+screens=load_screens()
+qc1,qc2=st.columns([1,4])
+pick=qc1.selectbox("저장된 조건", ["(직접 입력)",*screens])
+qry=qc2.text_input("🔎 조건 검색", value=screens.get(pick,""),
+    placeholder="score >= 4 and rsi < 45 and vol_ratio > 1.5 and ichimoku == breakout_up",
+    help="열: score · rsi · cci · vr(vol_ratio) · chg · disp · price · sig · ich · rsi_z · cci_z · "
+         "ma5/ma20/ma60 · bb_sq · bb_pos · sector … · 코드는 이름(ich == breakout_up) 또는 "
+         "라벨 일부(sig == '매수') · and / or / not · in [..]").strip()
+if qry:
+    try: Screener(to_frame([])).mask(qry)              # 열 · 코드 이름 검사
+    except ValueError as e: st.error(f"조건 검색: {e}"); qry=""
+    if qry:
+        with st.expander("💾 조건 저장"):
+            sn=st.text_input("이름", key="scr_name")
+            if st.button("저장", disabled=not sn): save_screen(sn, qry); st.success(f"저장됨: {sn}")
+
 st.markdown("---")
 rt=st.empty(); ra=st.empty()
 
+# 최신 결과 스냅샷 — 직접 스캔한 결과가 없으면 서비스가 저장한 결과를 바로 표시
+if not go and not bt_go and not multi and st.session_state.get('gsrc',0) is not None:
+    snap_df,snap_info=latest_results(idx_key)
+    if snap_df is not None and st.session_state.get('gsrc')!=(idx_key,snap_info['version']):
+        st.session_state.pop('gm',None)
+        st.session_state['gd']=snap_df; st.session_state['gsrc']=(idx_key,snap_info['version'])
+    if snap_df is not None:
+        st.caption(f"🗂️ {idx_lbl} 스냅샷 {snap_info['version']} · "
+                   f"{snap_info['age']/60:.0f}분 전 · {snap_info['count']}개 종목")
+
 # 분석 실행
-if go:
+if go and multi:
+    st.session_state.gf="전체"
+    st.session_state.pop('gd',None); st.session_state['gm']={}; st.session_state['gsrc']=None
+    st.session_state.pop('gc',None)
+    keys=[INDICES[l] for l in idx_sel]
+    if not keys:
+        st.error("스캔할 지수를 선택하세요"); st.stop()
+
+    tr=Trace()
+    with st.spinner("종목 목록 로드 중..."), tr.span("종목목록"):
+        unis={k:load_universe(k) for k in keys}
+    for k,(tl,info) in unis.items():
+        if info['source']=="fallback":
+            st.warning(f"⚠️ {IDX_LBL[k]} 구성 종목을 받지 못해 기본 목록 {len(tl)}개로 대체합니다"
+                       f" ({info['note']})")
+
+    meta,members=union_meta({k:tl for k,(tl,_) in unis.items()}, "", max_n)
+    tot=len(meta); n_all=sum(map(len,members.values()))
+    if not tot:
+        st.error("종목 목록 로드 실패"); st.stop()
+    st.info(f"▶ {len(keys)}개 지수 | {n_all}개 중 중복 제외 {tot}개 분석 "
+            f"(배치 {n_bt}개 · 다운로드 {n_wk} · 계산 {n_cpu})")
+    tr.count("중복 제거", n_all-tot)
+    pb=st.progress(0,"준비 중...")
+
+    def prog(view, done, tot):
+        pb.progress(done/tot, text=f"분석 중 ({done}/{tot})")
+        upd_metrics(view.metrics())
+
+    view=run_scan(meta, {t:m['currency'] for t,m in meta.items()},
+                  io_workers=2 if adaptive else n_wk, cpu_workers=n_cpu, batch=n_bt,
+                  mode=calc, cache=use_cache, rebuild=rebuild, adaptive=adaptive,
+                  store=get_store() if use_cache else None,
+                  sched=get_sched() if adaptive else None, pool=get_pool(n_cpu),
+                  on_batch=prog, trace=tr, provider=prov, tfs=tfs, memo=get_memo(),
+                  retry_bad=retry_bad, **f32)
+    pb.empty()
+    st.session_state['gm']=fan_out(view, members)
+    if view.prev is not None:
+        st.session_state['gc']={IDX_LBL[k]:d for k,d in fan_out_changes(view, members).items()}
+    show_multi(st.session_state['gm'])
+    st.success(f"✅ 완료! {len(view)}개 종목 분석됨 → "
+               + " · ".join(f"{IDX_LBL[k]} {len(d)}개" for k,d in st.session_state['gm'].items()))
+    if health_note(view.health): st.caption(health_note(view.health))
+    if 'gc' in st.session_state: show_changes(st.session_state['gc'])
+    show_trace(tr)
+    try: tr.dump(index=",".join(keys), mode=calc, tickers=tot, rows=len(view))
+    except OSError: pass
+
+elif go:
     st.session_state.gf="전체"
-    st.session_state['gd']=pd.DataFrame()
+    st.session_state.pop('gm',None); st.session_state['gd']=pd.DataFrame()
+    st.session_state['gsrc']=None; st.session_state.pop('gc',None)
 
-    with st.spinner(f"{idx_lbl} 종목 목록 로드 중..."):
-        tlist=load_tickers(idx_key)
+    tr=Trace()
+    with st.spinner(f"{idx_lbl} 종목 목록 로드 중..."), tr.span("종목목록"):
+        tlist,u_info=load_universe(idx_key)
 
     if not tlist:
         st.error("종목 목록 로드 실패"); st.stop()
-
-    if sec_f:
-        tlist=[t for t in tlist if sec_f.lower() in t.get('sector','').lower()]
-    tlist=tlist[:max_n]
-
-    tot=len(tlist)
-    st.info(f"▶ {idx_lbl} | {tot}개 분석 시작 (병렬 {n_wk}개)")
-
-    results=[]; pb=st.progress(0,"준비 중..."); done=0
-
-    with ThreadPoolExecutor(max_workers=n_wk) as ex:
-        futs={ex.submit(analyze,t['ticker'],t['name'],t.get('sector',''),curr):t
-              for t in tlist}
-        for fut in as_completed(futs):
-            item=futs[fut]; done+=1
-            try: res=fut.result()
-            except: res=None
-            if res:
-                results.append(res)
-                df_all=pd.DataFrame(results,columns=COLS)
-                df_all=df_all.sort_values('총점',ascending=False).reset_index(drop=True)
-                st.session_state['gd']=df_all
-                upd_metrics(df_all)
-                dd=apf(df_all,st.session_state.gf)
-                rt.subheader(f"🔍 {idx_lbl} 결과 ({st.session_state.gf} / {len(dd)}개)")
-                with ra: show_df(dd)
-            pb.progress(done/tot, text=f"분석 중: {item['ticker']} ({done}/{tot})")
-
+    if u_info['source']=="fallback":
+        st.warning(f"⚠️ {idx_lbl} 구성 종목을 받지 못해 기본 목록 {len(tlist)}개로 대체합니다"
+                   f" ({u_info['note']})")
+
+    tlist=select_tickers(tlist, sec_f, max_n)
+    meta={t['ticker']:t for t in tlist}
+
+    tot=len(meta)
+    st.info(f"▶ {idx_lbl} | {tot}개 분석 시작 (배치 {n_bt}개 · 다운로드 {n_wk} · 계산 {n_cpu})")
+
+    store=get_store() if use_cache else None
+    # 캐시 사용 시 직전 스캔 결과 → 마지막 봉이 같은 종목은 재사용, 변화표 기준
+    view=ResultView(previous_results(store, list(meta)) if store else None)
+    pb=st.progress(0,"준비 중..."); done=0
+    drawn=0; t_draw=0.0
+
+    def draw():
+        with tr.span("표"):
+            df_all=view.frame()
+            st.session_state['gd']=df_all
+            upd_metrics(view.metrics())
+            dd=apf(df_all,st.session_state.gf)
+            rt.subheader(f"🔍 {idx_lbl} 결과 ({st.session_state.gf} / {len(dd)}개)")
+            with ra.container(): show_df(dd)
+
+    sched=get_sched() if adaptive else None
+    n_io=2 if adaptive else n_wk   # 적응형: 실제 동시 요청 수는 스케줄러가 정함
+    fetch=make_fetch(store, sched, threads=n_wk, rebuild=rebuild, provider=prov,
+                     period=fetch_period(calc, tfs, prov))
+    if rebuild: get_memo().drop(list(meta))
+    memo=get_memo().scope(memo_key(prov, f32.get('dtype'), tfs, calc))
+    # 원격 공급자만: 음성 캐시(캐시 사용 시) + 요청 차단기
+    failed=sched.failed if sched else FAILED
+    for t in meta: failed.pop(t, None)     # 직전 스캔의 실패 이유를 이번 실패로 읽지 않도록
+    health=(FetchHealth(store, reason=failed.get, retry_bad=retry_bad)
+            if prov is None else None)
+    before=dict(sched.stats if sched else STATS)
+
+    for part,rows in run_pipeline(list(meta), meta, curr, fetch, io_workers=n_io,
+                                  cpu_workers=n_cpu, batch=n_bt, mode=calc,
+                                  store=store, pool=get_pool(n_cpu), trace=tr, reuse=True,
+                                  tfs=tfs, memo=memo, health=health, **f32):
+        done+=len(part)
+        pb.progress(done/tot, text=f"분석 중: {part[-1]} ({done}/{tot})")
+        view.extend(r for r in rows if r)
+        # 다시 그리기는 25행 또는 0.5초마다
+        if len(view)>drawn and (len(view)-drawn>=25 or time.monotonic()-t_draw>=0.5):
+            draw(); drawn=len(view); t_draw=time.monotonic()
+
+    if len(view)>drawn: draw()
+    pb.empty()
+    st.success(f"✅ 완료! {len(view)}개 종목 분석됨"
+               + (f" (방금 계산한 {tr.counts['메모 적중']}개는 메모 사용)" if tr.counts['메모 적중'] else "")
+               + (f" (변경 없는 {tr.counts['재사용']}개는 직전 결과 사용)" if tr.counts['재사용'] else ""))
+    if view.prev is not None:
+        st.session_state['gc']={idx_lbl:view.changes()}
+        show_changes(st.session_state['gc'])
+    if health_note(health): st.caption(health_note(health))
+    if sched:
+        ss=sched.snapshot(); fl=[t for t in meta if t in sched.failed]
+        st.caption(f"누적 요청 {ss.get('ok',0)}건 성공 · 재시도 {ss.get('retry',0)} · "
+                   f"차단 {ss.get('throttle',0)} · 타임아웃 {ss.get('timeout',0)} · "
+                   f"현재 {ss['rate']}회/초 · 동시 {ss['concurrency']}"
+                   + (f" | 실패: {', '.join(fl[:20])}" if fl else ""))
+        tr.requests(before, sched.stats)
+    elif prov is None:
+        fl=[f"{t}({FAILED[t]})" for t in meta if t in FAILED]
+        if fl: st.caption(f"실패: {', '.join(fl[:20])}")
+        tr.requests(before, STATS)
+    show_trace(tr)
+    try: tr.dump(index=idx_key, mode=calc, tickers=tot, rows=len(view))
+    except OSError: pass
+
+# 백테스트
+if bt_go and not go:
+    tl=select_tickers(load_tickers(idx_key), sec_f, max_n)
+    pb=st.progress(0,"이력 다운로드 중..."); frames={}
+    for i,(t,f) in enumerate((prov or YAHOO).iter([x['ticker'] for x in tl], chunk=n_bt,
+                                                  period=bt_p),1):
+        if f is not None: frames[t]=f
+        pb.progress(i/len(tl), text=f"이력 다운로드: {t} ({i}/{len(tl)})")
     pb.empty()
-    st.success(f"✅ 완료! {len(results)}개 종목 분석됨")
+    t0=time.time(); bt=backtest(frames)
+    st.subheader(f"🧪 {idx_lbl} 신호 백테스트 ({bt_p} · {len(frames)}개 종목)")
+    st.dataframe(bt.round(2), hide_index=True, use_container_width=True)
+    st.caption(f"계산 {time.time()-t0:.2f}초 · 적중: 매수계열은 상승, 하락계열은 하락한 비율 · "
+               "중립 신호는 상승 비율만 표시")
 
 # 필터 버튼 동작
-if not go and 'gd' in st.session_state:
+if not go and not bt_go and 'gm' in st.session_state:
+    show_multi(st.session_state['gm'])
+    if 'gc' in st.session_state: show_changes(st.session_state['gc'])
+
+elif not go and not bt_go and 'gd' in st.session_state:
     df=st.session_state['gd']
     if not df.empty:
-        upd_metrics(df)
+        upd_metrics(frame_metrics(df))
         dd=apf(df,st.session_state.gf)
         rt.subheader(f"🔍 결과 ({st.session_state.gf} / {len(dd)}개)")
-        with ra: show_df(dd)
+        with ra.container(): show_df(dd, key=f"pg_{st.session_state.gf}")
+        if 'gc' in st.session_state and st.session_state.get('gsrc') is None:
+            show_changes(st.session_state['gc'])
         if not dd.empty:
-            sm=dd[['티커','종목명','현재가','총점','신호','일목','RSI']].to_string(index=False)
+            sm=render(dd)[['티커','종목명','현재가','총점','신호','일목','RSI']].to_string(index=False)
             bd=urllib.parse.quote(f"글로벌 주식 분석 리포트\n\n{sm}")
             ml=f"mailto:?subject=글로벌주식리포트&body={bd}"
             st.markdown(
@@ -656,5 +567,5 @@ if not go and 'gd' in st.session_state:
                 f'📧 현재 리스트 Outlook 전송</div></a>',
                 unsafe_allow_html=True)
 
-elif 'gd' not in st.session_state:
+elif 'gd' not in st.session_state and 'gm' not in st.session_state and not bt_go:
     with ra: st.info("왼쪽에서 지수를 선택하고 '분석 시작'을 눌러주세요.")
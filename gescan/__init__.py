@@ -0,0 +1,34 @@
+"""
+글로벌 스마트 스캐너 엔진
+Streamlit UI(GE_scanner.py)와 분리된 데이터 · 지표 · 신호 계산 모듈.
+Streamlit 을 import 하지 않으므로 배치 작업 · 테스트 · 작업자 프로세스에서 바로 쓸 수 있다.
+
+    from gescan import render, scan
+    df = scan("dow30", max_n=10)     # 수치 결과 (Result 필드)
+    render(df)                        # 표시용 표 (COLS)
+    scan_many(["dow30", "nasdaq100"])  # {지수: 결과} — 겹치는 종목은 한 번만 계산
+    df, chg = scan("dow30", diff=True) # 직전 스캔 대비 신호 · 총점 · 일목 변화
+    scan("dow30", provider="bars/")    # 인터넷 없이 로컬 파일(bars/<종목>.csv)로
+    scan("dow30", tfs="WM")            # 주봉 · 월봉 신호 열 추가 (sig_w · sig_m)
+    Screener(df)("score >= 4 and rsi < 45 and ichimoku == breakout_up")   # 조건 검색
+    scan("dow30", memo=ResultMemo())   # 같은 메모로 다시 스캔하면 유효한 종목은 받지도 계산하지도 않음
+    scan("dow30", retry_bad=True)      # 음성 캐시(상장폐지 · 잘못된 심볼)에 있는 종목도 다시 요청
+
+오프라인 벤치마크(합성 데이터): python -m gescan.bench
+백그라운드 스캔 서비스(결과 스냅샷): python -m gescan.daemon
+"""
+
+from gescan.analysis import analyze, analyze_frame, analyze_many, summarize
+from gescan.headless import scan, scan_many
+from gescan.memo import ResultMemo
+from gescan.provider import FileProvider, Provider, YahooProvider, get_provider
+from gescan.query import Screener
+from gescan.record import COLS, Result, render
+from gescan.signals import calc_signal
+from gescan.timeframe import resample
+from gescan.universe import CURRENCY, INDICES, load_tickers, load_universe
+
+__all__ = ["COLS", "CURRENCY", "FileProvider", "INDICES", "Provider", "Result",
+           "ResultMemo", "Screener", "YahooProvider", "analyze", "analyze_frame",
+           "analyze_many", "calc_signal", "get_provider", "load_tickers", "load_universe",
+           "render", "resample", "scan", "scan_many", "summarize"]
@@ -0,0 +1,5 @@
+import sys
+
+from gescan.cli import main
+
+sys.exit(main())
@@ -0,0 +1,226 @@
+"""
+종목 분석
+OHLCV → 지표 → 일목 상태 · 12단계 신호 · 구간 코드 → Result (표시 문자열은 record.render)
+"""
+
+import time
+
+import pandas as pd
+
+from gescan.fetch import download_one
+from gescan.indicators import calc_bb, calc_cci, calc_rsi, bb_squeeze
+from gescan.online import online_tails
+from gescan.panel import NEED, PanelRef, mapped_tails, panel_tails, trim_tail
+from gescan.record import BB_SQ, ICH_DN, ICH_UP, SIG_CODE, Result, ich_label
+from gescan.signals import calc_signal
+from gescan.timeframe import history_for, tf_codes, with_timeframes
+
+MIN_BARS = 80        # 지표 · 신호를 계산할 최소 봉 수 (일목 52 + 26)
+
+
+def analyze(ticker, name, sector, currency, provider=None, tfs=()):
+    """
+    종목 하나 받기 + 분석 — provider(gescan.provider.Provider) 가 없으면 yfinance
+    tfs: 상위 시간대 ('W' · 'M') — 같은 일봉(기간만 늘려 받음)을 묶어 주봉 · 월봉 신호 추가
+    """
+    period = history_for(tfs)
+    raw = (download_one(ticker, period) if provider is None else
+           provider.download([ticker], period=period).get(ticker))
+    res = analyze_frame(raw, ticker, name, sector, currency)
+    if res is None or not tfs: return res
+    return with_timeframes([res], tf_codes({ticker: raw}, tfs))[0]
+
+def analyze_frame(raw, ticker, name, sector, currency, trace=None):
+    """OHLCV → Result (지표 단계 오류는 trace.fail 에 남기고 None)"""
+    try:
+        df_f = add_indicators(raw)
+    except Exception as e:
+        if trace is not None: trace.fail(ticker, e)
+        return None
+    if df_f is None:
+        return None
+    return summarize(df_f, ticker, name, sector, currency, trace)
+
+def add_indicators(raw):
+    """OHLCV → 지표 계산 · 결측 제거된 프레임 (봉 수 부족이면 None · 오류는 호출자에게)"""
+    if raw is None or len(raw) < MIN_BARS:
+        return None
+
+    # MultiIndex 처리
+    if isinstance(raw.columns, pd.MultiIndex):
+        raw.columns = raw.columns.get_level_values(0)
+    raw.columns = [str(c).strip() for c in raw.columns]
+
+    df = raw[['High','Low','Close','Volume']].copy()
+    df.columns = ['H','L','C','V']
+    df = df.dropna(subset=['C']).sort_index()
+
+    # 이동평균
+    df['ma5']  = df['C'].rolling(5).mean()
+    df['ma20'] = df['C'].rolling(20).mean()
+    df['ma60'] = df['C'].rolling(60).mean()
+
+    # 일목균형표
+    h9 =df['H'].rolling(9).max(); l9 =df['L'].rolling(9).min()
+    h26=df['H'].rolling(26).max();l26 =df['L'].rolling(26).min()
+    h52=df['H'].rolling(52).max();l52 =df['L'].rolling(52).min()
+    tk=(h9+l9)/2; kj=(h26+l26)/2; sb=(h52+l52)/2
+    sa_fut = ((tk+kj)/2).shift(26)
+    sb_fut = sb.shift(26)
+    df['sa']=sa_fut; df['sb']=sb_fut
+
+    # MACD
+    e12=df['C'].ewm(span=12,adjust=False).mean()
+    e26=df['C'].ewm(span=26,adjust=False).mean()
+    macd=e12-e26
+    df['mh']=macd - macd.ewm(span=9,adjust=False).mean()
+
+    # RSI / CCI / BB / Volume ratio
+    df['RSI'] = calc_rsi(df['C'])
+    df['CCI'] = calc_cci(df['H'],df['L'],df['C'])
+    df['bbu'],df['bbl'],df['bbw'] = calc_bb(df['C'])
+    df['vr']  = df['V'] / df['V'].rolling(20).mean()
+
+    return df.dropna(subset=NEED).copy()
+
+
+# ─────────────────────────────────────────────
+# 결과 레코드 (일목 상태 → 수치 → 신호 → 구간 코드)
+# ─────────────────────────────────────────────
+
+def last_rows(df_f):
+    """마지막 5개 지표 행 [last, prev, p2, p3, p4]"""
+    return [df_f.iloc[-i] for i in range(1,6)]
+
+def cloud_state(rows):
+    """일목 상태 → (ICH 코드, 돌파/이탈 후 일수)"""
+    last,prev,p2,p3,p4 = rows
+    def ct(r): return max(r['sa'],r['sb'])
+    def cb(r): return min(r['sa'],r['sb'])
+    an = last['C']>ct(last); bn=last['C']<cb(last)
+
+    bkd=None
+    if an:
+        for d,r in enumerate([prev,p2,p3,p4],1):
+            if r['C']<=ct(r): bkd=d; break
+    bdd=None
+    if bn:
+        for d,r in enumerate([prev,p2,p3,p4],1):
+            if r['C']>=cb(r): bdd=d; break
+
+    if an:
+        return (ICH_UP, bkd) if bkd else (0, 0)        # 상향돌파 / 구름대 위
+    if bn:
+        return (ICH_DN, bdd) if bdd else (5, 0)        # 하향이탈 / 구름대 아래
+    pr=[prev,p2,p3,p4]
+    wa=any(r['C']>ct(r) for r in pr)
+    wb=any(r['C']<cb(r) for r in pr)
+    if wa and not wb:   return 4, 0                    # 구름대하락진입
+    if wb and not wa:   return 2, 0                    # 구름대상승진입
+    return 3, 0                                        # 구름대 내부
+
+def readings(last, prev):
+    """신호 계산에 쓰는 수치 (RSI 반올림값, CCI, 직전 CCI, 20일 이격률)"""
+    rv=round(last['RSI'],1)
+    cn=last['CCI']; cp=prev['CCI']
+    disp=((last['C']/last['ma20'])-1)*100 if last['ma20']>0 else 0
+    return rv,cn,cp,disp
+
+def classify(df_f, last, prev, rv, cn, cp):
+    """MA 크로스(MA_X) · RSI 구간 · CCI 구간 · BB 수축/위치 코드"""
+    def mx(col):
+        if prev['C']<=prev[col] and last['C']>last[col]: return 2   # GC
+        if prev['C']>=prev[col] and last['C']<last[col]: return 3   # DC
+        return 1 if last['C']>last[col] else 0
+
+    rz=(0 if rv<=30 else 1 if rv<=45 else 2 if rv<=55 else 3 if rv<=70 else 4)
+
+    if   cp<-100 and cn>=-100: cz=0   # 과매도탈출
+    elif cp<   0 and cn>=   0: cz=1   # 제로크로스
+    elif cp> 100 and cn<= 100: cz=2   # 과매수탈출
+    elif cp>   0 and cn<=   0: cz=3   # 제로데드
+    elif cn> 100:              cz=4   # 과매수
+    elif cn<-100:              cz=5   # 과매도
+    else:                      cz=6   # 중립
+
+    bsq,_=bb_squeeze(df_f['bbw'])
+    bp=(0 if last['C']>=last['bbu'] else 1 if last['C']<=last['bbl'] else 2)
+    return mx('ma5'),mx('ma20'),mx('ma60'),rz,cz,BB_SQ.index(bsq),bp
+
+def summarize(df_f, ticker, name, sector, currency, trace=None):
+    """지표 계산 · 결측 제거가 끝난 프레임 → Result (trace 가 있으면 단계별 시간 기록)"""
+    try:
+        if len(df_f) < 6:
+            return None
+        pc = time.perf_counter; a = pc()
+        rows = last_rows(df_f); last,prev = rows[:2]
+        ich,days = cloud_state(rows)
+        b = pc()
+        rv,cn,cp,disp = readings(last, prev)
+        sc,sig = calc_signal(last,prev,ich_label(ich,days),rv,cn,cp,disp)
+        c = pc()
+        m5,m20,m60,rz,cz,sq,bp = classify(df_f,last,prev,rv,cn,cp)
+        chg=((last['C']-prev['C'])/prev['C'])*100
+        res = Result(ticker,name,sector,currency,float(chg),float(last['C']),float(disp),
+                     int(sc),SIG_CODE[sig],ich,days,m5,m20,m60,float(last['RSI']),rz,
+                     float(cn),cz,sq,bp,float(last['vr']))
+        if trace is not None:
+            d = pc()
+            trace.add("일목",b-a,ticker); trace.add("신호",c-b,ticker); trace.add("분류",d-c,ticker)
+        return res
+    except Exception as e:
+        if trace is not None: trace.fail(ticker, e)
+        return None
+
+
+def analyze_many(frames, meta, currency, mode="panel", store=None, trace=None, dtype=None,
+                 tfs=()):
+    """
+    {종목: OHLCV} → 결과 행 목록
+    mode: panel(패널로 한 번에) · online(저장된 증분 상태 갱신) · ticker(종목별)
+          · tail(최근 gescan.panel.TAIL_BARS 봉만 panel 방식으로)
+    dtype: panel 의 배열 dtype (np.float32 면 메모리 절반, 기본 float64)
+    frames 가 gescan.panel.PanelRef 면 memmap 패널 파일에서 바로 계산 (panel 방식)
+    tfs: 상위 시간대 ('W' · 'M') — 일봉 프레임을 묶어 주봉 · 월봉 신호 추가 (PanelRef 는 제외)
+    """
+    ref = frames if isinstance(frames, PanelRef) else None
+    if ref is not None: frames = dict.fromkeys(ref.tickers)
+    if trace is not None:          # 봉 수 부족은 오류가 아니지만 결과가 없는 이유로 남김
+        for t, f in frames.items():
+            if f is not None and len(f) < MIN_BARS: trace.short(t, len(f))
+
+    def row(df_f, t):
+        if df_f is None: return None
+        return summarize(df_f,t,meta[t]['name'],meta[t].get('sector',''),currency,trace)
+
+    pc = time.perf_counter
+    if mode=="ticker":
+        out = []
+        for t,raw in frames.items():
+            a = pc()
+            try: df_f = add_indicators(raw)
+            except Exception as e:
+                df_f = None
+                if trace is not None: trace.fail(t, e)
+            if trace is not None: trace.add("지표",pc()-a,t)
+            out.append(row(df_f,t))
+    else:
+        a = pc()
+        try:
+            if ref is not None:  tails=mapped_tails(ref)
+            elif mode=="online": tails=online_tails(frames,store)
+            elif mode=="tail": tails=panel_tails(trim_tail(frames),dtype=dtype or float)
+            else: tails=panel_tails(frames,dtype=dtype or float)
+        except Exception as e:
+            if trace is not None: trace.fail(f"<{mode}>", e)
+            return [None]*len(frames)
+        if trace is not None: trace.add("지표",pc()-a,tuple(frames),len(frames))
+        out = [row(tails.get(t),t) for t in frames]
+    if tfs and ref is None:
+        a = pc()
+        try: out = with_timeframes(out, tf_codes(frames, tfs, dtype or float))
+        except Exception as e:
+            if trace is not None: trace.fail("<시간대>", e)
+        if trace is not None: trace.add("시간대",pc()-a,tuple(frames),len(frames))
+    if trace is not None: trace.count("결과 없음", out.count(None))
+    return out
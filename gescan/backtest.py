@@ -0,0 +1,228 @@
+"""
+전체 이력 신호 시계열 · 백테스트
+cloud_state / calc_signal 은 마지막 행만 스칼라 분기로 판정한다. 여기서는 같은 규칙을
+패널(날짜 × 종목) 배열에 np.select 로 적용해 모든 날짜 · 모든 종목의 총점 · 신호를 한 번에 구한다.
+"직전 행" 은 summarize 와 같이 결측 제거된 유효 행 기준이고, 그날까지 봉이 80개 · 유효 행이
+6개 이상일 때만 신호가 있다 (그날 스캔했다면 나왔을 결과와 같음).
+
+  python -m gescan.backtest dow30 -P 5y
+  python -m gescan.backtest --synthetic 500 -P 5y -o bt.csv     # 오프라인 (합성 데이터)
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from gescan.fetch import iter_download
+from gescan.panel import NEED, build_panel, panel_indicators
+from gescan.record import ICH_DN, ICH_UP, SIG_CODE, SIGNALS
+from gescan.universe import CURRENCY, load_tickers, select_tickers
+
+MIN_BARS = 80
+HORIZONS = (5, 20, 60)
+
+# 신호별 기대 방향 (+1 상승 · -1 하락 · 0 중립 — 중립은 적중률 없음)
+DIRECTION = np.array([+1, +1, +1, +1, +1, +1, 0, 0, -1, -1, -1, -1, -1], dtype=np.int8)
+S = SIG_CODE
+
+
+# ─────────────────────────────────────────────
+# 유효 행 기준 이전 행 인덱스
+# ─────────────────────────────────────────────
+
+def _prev_index(valid):
+    """(n × m) 유효 마스크 → 각 칸 이전의 마지막 유효 행 번호 (없으면 -1)"""
+    n = len(valid)
+    run = np.maximum.accumulate(np.where(valid, np.arange(n)[:, None], -1), axis=0)
+    return np.vstack([np.full((1, valid.shape[1]), -1), run[:-1]])
+
+def _step(prev, idx):
+    """행 번호 배열 idx 의 이전 유효 행 번호"""
+    return np.where(idx < 0, -1, np.take_along_axis(prev, np.maximum(idx, 0), axis=0))
+
+def _at(a, idx):
+    """a 를 행 번호 배열 idx 위치에서 읽음 (idx < 0 이면 NaN)"""
+    return np.where(idx < 0, np.nan, np.take_along_axis(a, np.maximum(idx, 0), axis=0))
+
+
+# ─────────────────────────────────────────────
+# 신호 시계열
+# ─────────────────────────────────────────────
+
+def signal_arrays(X, min_bars=MIN_BARS):
+    """
+    panel_indicators 결과 → {'ok','score','sig','ich','days'} (n × m)
+    ok 가 False 인 칸의 값은 의미 없음
+    """
+    n, m = X['C'].shape
+    valid = np.logical_and.reduce([~np.isnan(X[k]) for k in NEED])
+    bars = np.cumsum(~np.isnan(X['C']), axis=0)
+    ok = valid & (bars >= min_bars) & (np.cumsum(valid, axis=0) >= 6)
+
+    prev = _prev_index(valid)
+    i0 = np.broadcast_to(np.arange(n)[:, None], (n, m))
+    ix = [i0]
+    for _ in range(4): ix.append(_step(prev, ix[-1]))
+    C  = [_at(X['C'], i) for i in ix]
+    sa = [_at(X['sa'], i) for i in ix]; sb = [_at(X['sb'], i) for i in ix]
+    ct = [np.fmax(a, b) for a, b in zip(sa, sb)]; cb = [np.fmin(a, b) for a, b in zip(sa, sb)]
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        # 일목 상태 (cloud_state)
+        an = C[0] > ct[0]; bn = C[0] < cb[0]
+        bkd = np.select([C[d] <= ct[d] for d in range(1, 5)], [1, 2, 3, 4], 0)
+        bdd = np.select([C[d] >= cb[d] for d in range(1, 5)], [1, 2, 3, 4], 0)
+        wa = np.logical_or.reduce([C[d] > ct[d] for d in range(1, 5)])
+        wb = np.logical_or.reduce([C[d] < cb[d] for d in range(1, 5)])
+        ich = np.select([an & (bkd > 0), an, bn & (bdd > 0), bn, wa & ~wb, wb & ~wa],
+                        [ICH_UP, 0, ICH_DN, 5, 4, 2], 3)
+        days = np.where(an, bkd, np.where(bn, bdd, 0))
+
+        # ① 구름대
+        s_ich = np.select([ich == ICH_UP, ich == ICH_DN, ich == 2, ich == 4], [3, -3, 1, -2], 0)
+        # ② MACD
+        hn = X['mh']; hp = _at(X['mh'], ix[1]); sl = hn - hp
+        s_macd = np.select([(hn > 0) & (hp <= 0), (hn < 0) & (hp >= 0),
+                            (hn < 0) & (sl > 0), (hn > 0) & (sl < 0)], [2, -2, 1, -1], 0)
+        # ③ CCI
+        cn = X['CCI']; cp = _at(X['CCI'], ix[1])
+        s_cci = np.select([(cp < -100) & (cn >= -100), (cp < 0) & (cn >= 0),
+                           (cp > 0) & (cn <= 0), (cp > 100) & (cn <= 100)], [2, 1, -1, -2], 0)
+        # ④ 이격률
+        ma20 = X['ma20']
+        disp = np.where(ma20 > 0, (X['C']/ma20 - 1)*100, 0)
+        s_disp = np.select([disp > 20, disp > 12, disp > 6, disp >= -3, disp >= -8],
+                           [-3, -2, -1, 0, 1], 2)
+        # ⑤ 거래량
+        vr = X['vr']
+        ht = (s_ich != 0) | (np.abs(s_macd) >= 1) | (np.abs(s_cci) >= 1)
+        s_vol = np.select([(vr >= 1.5) & ht, vr < 0.5], [1, -1], 0)
+        sc = s_ich + s_macd + s_cci + s_disp + s_vol
+
+        # 플래그 → 신호 (calc_signal 과 같은 우선순위)
+        ab = (ich == 0) | (ich == ICH_UP); bel = (ich == 5) | (ich == ICH_DN)
+        fe = ich == 4; ins = ich == 3
+        cb_o = s_ich == 3; cb_d = s_ich == -3
+        mu = s_macd >= 1; md = s_macd <= -1; cu = s_cci > 0; cd = s_cci < 0
+        hid = disp > 15; mid = (6 < disp) & (disp <= 15); lod = disp < -10
+        sig = np.select([
+            fe,
+            (sc >= 7) & cb_o & mu & cu,
+            (sc >= 4) & ~hid & (cb_o | mu | cu) & (cb_o.astype(int) + mu + cu >= 2),
+            (sc >= 2) & (disp <= 6) & ht & ~fe,
+            bel & (mu | cu) & (sc >= 0),
+            bel & md & cd,
+            (sc <= -5) & cb_d & md & cd,
+            sc <= -3,
+            bel & lod,
+            ab & hid,
+            ab & mid & ~ht,
+            ins,
+        ], [S["⚠️ 구름대주의"], S["🔥 적극매수"], S["📈 매수관심"], S["🌱 진입준비"],
+            S["🔄 바닥탐색"], S["🔻 하락가속"], S["🧊 적극매도"], S["📉 매도관심"],
+            S["🔽 추세하락"], S["🔼 추세상승"], S["🛡️ 홀딩유지"], S["🌫️ 구름대내부"]],
+            S["⏸️ 관망"])
+
+    return {'ok': ok, 'score': sc.astype(np.int16), 'sig': sig.astype(np.int8),
+            'ich': ich.astype(np.int8), 'days': days.astype(np.int8)}
+
+def signal_history(frames, min_bars=MIN_BARS, dtype=np.float64):
+    """{종목: OHLCV} → 신호가 있는 모든 (종목, 날짜) 의 긴 DataFrame"""
+    names, idxs, P = build_panel(frames, min_bars, dtype)
+    if not names:
+        return pd.DataFrame(columns=['ticker','date','close','score','sig','ich','ich_days'])
+    Z = signal_arrays(panel_indicators(P), min_bars)
+    n = len(P['C']); j, r = np.nonzero(Z['ok'].T)          # 종목 순 → 날짜 순
+    dates = np.concatenate([ix.to_numpy()[r[j == k] - (n - len(ix))]
+                            for k, ix in enumerate(idxs)])
+    return pd.DataFrame({'ticker': np.array(names, dtype=object)[j], 'date': dates,
+                         'close': P['C'][r, j], 'score': Z['score'][r, j],
+                         'sig': Z['sig'][r, j], 'ich': Z['ich'][r, j],
+                         'ich_days': Z['days'][r, j]})
+
+
+# ─────────────────────────────────────────────
+# 백테스트
+# ─────────────────────────────────────────────
+
+def forward_returns(C, h):
+    """h 봉 뒤 수익률 (%) — 이력 끝을 넘으면 NaN"""
+    out = np.full_like(C, np.nan)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        out[:-h] = (C[h:]/C[:-h] - 1)*100
+    return out
+
+def backtest(frames, horizons=HORIZONS, min_bars=MIN_BARS, dtype=np.float64):
+    """
+    신호별 이후 h 봉 수익률 — 건수, 평균(%), 적중률(%: 기대 방향으로 움직인 비율), 상승 비율(%)
+    마지막 행 '전체' 는 모든 신호 발생일의 기준값
+    dtype=np.float32 면 패널 · 지표 배열 메모리 절반 (대형 유니버스 · 긴 이력)
+    """
+    names, idxs, P = build_panel(frames, min_bars, dtype)
+    k = len(SIGNALS)
+    cols = {"신호": SIGNALS + ["전체"], "방향": list(DIRECTION) + [0]}
+    if not names:
+        return pd.DataFrame(cols)
+    Z = signal_arrays(panel_indicators(P), min_bars)
+    ok = Z['ok']; sig = Z['sig'][ok].astype(int)
+    cols["건수"] = np.append(np.bincount(sig, minlength=k), len(sig))
+    for h in horizons:
+        f = forward_returns(P['C'], h)[ok]; m = ~np.isnan(f)
+        s, fv = sig[m], f[m]
+        n = np.bincount(s, minlength=k).astype(float)
+        tot = np.bincount(s, fv, minlength=k)
+        up = np.bincount(s, fv > 0, minlength=k)
+        dn = np.bincount(s, fv < 0, minlength=k)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            hit = np.where(DIRECTION > 0, up, np.where(DIRECTION < 0, dn, np.nan))/n
+            cols[f"{h}일 평균(%)"] = np.append(tot/n, fv.mean() if len(fv) else np.nan)
+            cols[f"{h}일 적중(%)"] = np.append(hit*100, np.nan)
+            cols[f"{h}일 상승(%)"] = np.append(up/n*100, (fv > 0).mean()*100 if len(fv) else np.nan)
+    return pd.DataFrame(cols)
+
+
+# ─────────────────────────────────────────────
+# 명령줄
+# ─────────────────────────────────────────────
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m gescan.backtest",
+                                 description="신호별 이후 수익률 · 적중률 백테스트")
+    ap.add_argument("index", nargs="?", choices=list(CURRENCY), help="지수")
+    ap.add_argument("--synthetic", type=int, metavar="N",
+                    help="네트워크 대신 N 종목 합성 데이터 사용")
+    ap.add_argument("-P", "--period", default="5y", help="이력 기간 (yfinance period)")
+    ap.add_argument("-n", "--max", type=int, default=None, help="최대 종목 수")
+    ap.add_argument("--sector", default="", help="섹터 필터 (S&P 500)")
+    ap.add_argument("-H", "--horizons", type=int, nargs="+", default=list(HORIZONS))
+    ap.add_argument("-o", "--output", help="결과 CSV 경로")
+    ap.add_argument("--float32", action="store_true", help="패널 · 지표 배열을 float32 로")
+    a = ap.parse_args(argv)
+    if not a.index and not a.synthetic:
+        ap.error("지수 또는 --synthetic 이 필요합니다")
+
+    t0 = time.time()
+    if a.synthetic:
+        from gescan.bench import PERIODS, synth_frames
+        frames = synth_frames(a.synthetic, PERIODS.get(a.period, 1260))
+    else:
+        tl = select_tickers(load_tickers(a.index), a.sector, a.max)
+        frames = {t: f for t, f in iter_download([x['ticker'] for x in tl], period=a.period)
+                  if f is not None}
+    t1 = time.time()
+    res = backtest(frames, tuple(a.horizons),
+                   dtype=np.float32 if a.float32 else np.float64)
+    print(f"{len(frames)} 종목 · 데이터 {t1-t0:.1f}초 · 백테스트 {time.time()-t1:.2f}초",
+          file=sys.stderr)
+    with pd.option_context("display.width", 200, "display.max_columns", None):
+        print(res.round(2).to_string(index=False))
+    if a.output:
+        res.to_csv(a.output, index=False, encoding="utf-8-sig")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,250 @@
+"""
+오프라인 벤치마크 (네트워크 없음)
+  python -m gescan.bench                                 # 30 · 500 · 3000 종목 × 18mo · 5y
+  python -m gescan.bench -n 500 -P 5y -m panel online
+  python -m gescan.bench -n 30 --golden bench_golden.json   # 기준 결과 저장 → 이후 비교
+
+결정적 합성 OHLCV(종목별 고정 시드)로 같은 입력을 매번 재현하고, 단계별 시간을 잰다.
+  지표   : add_indicators(ticker) · panel_tails(panel) · online_tails(online, 하루치 증분)
+  일목 · 신호 · 분류 : summarize 안의 단계 (gescan.trace 로 기록)
+  표     : ResultView 누적 + DataFrame 생성 + 표시 문자열(render)
+각 모드의 결과 행은 종목별 경로(ticker — 기존 analyze_frame 과 같은 코드)와 비교한다.
+panel32(-m panel32) 는 float32 패널, tail(-m tail) 은 최근 TAIL_BARS 봉 창 — 표시 행 대신
+코드 일치 · 수치 상대 오차(F32_RTOL · TAIL_TOL)로 비교하고 지표의 기준 대비 최대 오차를 '오차' 로 보인다.
+최대 메모리는 tracemalloc 으로 따로 한 번 더 돌려 잰다 (시간 측정에는 영향 없음).
+--data DIR 이면 합성 데이터 대신 종목별 파일(gescan.provider.FileProvider)을 읽어 같은 측정을 한다.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+from gescan.analysis import analyze_many
+from gescan.online import online_tails
+from gescan.panel import F32_RTOL, TAIL_TOL, panel_tails, tail_error, trim_tail
+from gescan.provider import FileProvider
+from gescan.record import render, to_frame
+from gescan.results import ResultView
+from gescan.store import BarStore
+from gescan.trace import Trace
+
+SIZES = (30, 500, 3000)
+PERIODS = {"18mo": 378, "5y": 1260}     # 거래일 수
+MODES = ("ticker", "panel", "online")
+# 기본 목록에는 없는 모드 → (analyze_many 모드, dtype, 허용 오차)
+EXTRA = {"panel32": ("panel", np.float32, F32_RTOL), "tail": ("tail", None, TAIL_TOL)}
+STAGES = ("지표", "일목", "신호", "분류", "표")
+
+
+# ─────────────────────────────────────────────
+# 합성 데이터
+# ─────────────────────────────────────────────
+
+def synth_frames(n, bars, seed=0, end="2026-06-30"):
+    """
+    n 종목 × bars 거래일 OHLCV — 종목 i 는 항상 같은 시드라 n 이 달라도 앞 종목은 같다.
+    일부 종목은 상장이 늦거나(짧은 이력) 종가 결측이 있고, 극소수는 80봉 미만이다.
+    """
+    idx = pd.bdate_range(end=end, periods=bars)
+    out = {}
+    for i in range(n):
+        rng = np.random.default_rng([seed, i])
+        c = 20*np.exp(rng.normal(0, 1) + np.cumsum(rng.normal(2e-4, 0.02, bars)))
+        h = c*(1 + np.abs(rng.normal(0, 0.01, bars)))
+        l = c*(1 - np.abs(rng.normal(0, 0.01, bars)))
+        o = np.clip(c*(1 + rng.normal(0, 0.005, bars)), l, h)
+        v = rng.integers(10**5, 10**7, bars).astype(float)
+        f = pd.DataFrame({'Open': o, 'High': h, 'Low': l, 'Close': c, 'Volume': v},
+                         index=idx)
+        if i % 7 == 3:  f = f.iloc[rng.integers(bars//3, bars//2):]    # 늦은 상장
+        if i % 11 == 5: f.iloc[rng.integers(0, len(f)-10, 3), 3] = np.nan  # 종가 결측
+        if i % 97 == 50: f = f.iloc[-60:]                             # 봉 수 부족
+        out[f"S{i:04d}"] = f
+    return out
+
+
+# ─────────────────────────────────────────────
+# 단계별 실행
+# ─────────────────────────────────────────────
+
+def run_mode(mode, frames, currency="USD", store=None):
+    """(종목별 결과 행, 단계별 초, 결과 DataFrame)"""
+    meta = {t: {'name': t, 'sector': "합성"} for t in frames}
+    tr = Trace()
+    mode, dtype, _ = EXTRA.get(mode, (mode, None, None))
+    rows = dict(zip(frames, analyze_many(frames, meta, currency, mode, store, tr, dtype)))
+    clock = dict.fromkeys(STAGES, 0.0)
+    for st, _, s, _ in tr.events: clock[st] += s
+    a = time.perf_counter()
+    view = ResultView(); view.extend(r for r in rows.values() if r is not None)
+    table = render(view.frame())
+    clock["표"] = time.perf_counter() - a
+    return rows, clock, table
+
+def _seed(frames, path):
+    """online 모드용 상태 저장소 — 마지막 봉 직전까지의 상태 (어제 스캔한 셈)"""
+    store = BarStore(path)
+    online_tails({t: f.iloc[:-1] for t, f in frames.items()}, store)
+    return store
+
+def shown(rows):
+    """{종목: Result | None} → {종목: 표시 행 | None} — 모드 간 · 기준 비교는 표시 행으로"""
+    ok = [t for t in rows if rows[t] is not None]
+    out = dict.fromkeys(rows)
+    out.update(zip(ok, map(list, render(to_frame(rows[t] for t in ok))
+                                 .itertuples(index=False, name=None))))
+    return out
+
+def near(a, b, rtol=F32_RTOL, atol=1e-3):
+    """Result 두 개가 허용 오차 안에서 같은지 — 코드 · 총점은 같고 수치는 rtol(절대 atol) 이내"""
+    if a is None or b is None: return a is b
+    for x, y in zip(a, b):
+        if isinstance(x, float):
+            if not (np.isclose(x, y, rtol=rtol, atol=atol) or (x != x and y != y)): return False
+        elif x != y: return False
+    return True
+
+def f32_error(frames):
+    """float32 패널 지표의 float64 대비 최대 오차 (gescan.panel.tail_error 중 최댓값)"""
+    return max(tail_error(panel_tails(frames), panel_tails(frames, dtype=np.float32)).values())
+
+def tail_window_error(frames):
+    """tail 방식 지표(마지막 5행)의 전체 이력 대비 최대 오차"""
+    return max(tail_error(panel_tails(frames), panel_tails(trim_tail(frames)), last=5).values())
+
+MODE_ERR = {"panel32": f32_error, "tail": tail_window_error}
+
+def digest(rows):
+    """표시 행 해시 (종목 순)"""
+    b = json.dumps([rows[t] for t in sorted(rows)], ensure_ascii=False)
+    return hashlib.sha256(b.encode()).hexdigest()[:16]
+
+def bench(n, period, modes=MODES, repeat=1, mem=True, seed=0, data=None):
+    """시나리오 하나 (n 종목 × period) → 모드별 결과 dict 목록 (data: 파일 공급자 디렉터리)"""
+    if data is None:
+        frames = synth_frames(n, PERIODS[period], seed)
+    else:
+        fp = FileProvider(data)
+        frames = {t: f.iloc[-PERIODS[period]:] for t, f in
+                  fp.download(fp.tickers()[:n], start="1900-01-01").items()}
+        n = len(frames)
+    ref = None; out = []
+    with tempfile.TemporaryDirectory(prefix="gescan-bench-") as tmp:
+        for mode in ("ticker",) + tuple(m for m in modes if m != "ticker"):
+            raw = None
+            best = None
+            for k in range(repeat if mode in modes else 1):
+                store = _seed(frames, os.path.join(tmp, f"{mode}{k}.sqlite")) \
+                    if mode == "online" else None
+                rows, clock, table = run_mode(mode, frames, store=store)
+                if best is None or sum(clock.values()) < sum(best.values()): best = clock
+            if mode == "ticker": raw = rows
+            if mode in EXTRA:
+                tol = EXTRA[mode][2]      # RSI · CCI 는 100 척도라 절대 허용도 tol · 100
+                rows = {t: near(r, raw0[t], tol, max(1e-3, tol*100)) for t, r in rows.items()}
+            else:             rows = shown(rows)
+            if ref is None: ref, raw0 = rows, raw     # 기준 = float64 종목별(ticker) 엔진
+            if mode not in modes: continue
+            peak = None
+            if mem:
+                store = _seed(frames, os.path.join(tmp, f"{mode}m.sqlite")) \
+                    if mode == "online" else None
+                tracemalloc.start()
+                run_mode(mode, frames, store=store)
+                peak = tracemalloc.get_traced_memory()[1]/2**20
+                tracemalloc.stop()
+            rec = _record(n, period, mode, best, peak, rows, ref, table)
+            rec["ref_digest"] = digest(ref)
+            if mode in EXTRA:
+                rec["mismatch"] = sum(not v for v in rows.values())
+                rec["err"], rec["tol"] = MODE_ERR[mode](frames), EXTRA[mode][2]
+                rec["mismatch"] += rec["err"] > rec["tol"]
+            out.append(rec)
+    return out
+
+def _record(n, period, mode, best, peak, rows, ref, table):
+    tot = sum(best.values())
+    return {"tickers": n, "period": period, "mode": mode,
+            **{k: round(v, 4) for k, v in best.items()},
+            "total": round(tot, 4), "tps": round(n/tot, 1),
+            "peak_mb": None if peak is None else round(peak, 1),
+            "rows": len(table),
+            "mismatch": sum(rows[t] != ref[t] for t in ref),
+            "digest": digest(rows)}
+
+
+# ─────────────────────────────────────────────
+# 명령줄
+# ─────────────────────────────────────────────
+
+def _rjust(s, w):
+    """화면 폭 기준 오른쪽 맞춤 (한글 등 전각 문자는 2칸)"""
+    cw = sum(2 if unicodedata.east_asian_width(c) in "WF" else 1 for c in s)
+    return " "*max(0, w - cw) + s
+
+def _print(res):
+    hd = (_rjust("모드", 4) + " "*5 + "".join(_rjust(s, 10) for s in STAGES) + _rjust("합계", 10)
+          + _rjust("종목/초", 12) + _rjust("최대MB", 10) + _rjust("행", 7) + _rjust("불일치", 9))
+    n, p = res[0]["tickers"], res[0]["period"]
+    print(f"\n{n} 종목 · {p} ({PERIODS[p]}봉) — 단위: 초")
+    print(hd)
+    for r in res:
+        pk = "-" if r["peak_mb"] is None else f"{r['peak_mb']:.1f}"
+        print(f"{r['mode']:<9}" + "".join(f"{r[s]:>10.3f}" for s in STAGES) +
+              f"{r['total']:>10.3f}{r['tps']:>12.1f}{pk:>10}{r['rows']:>7}{r['mismatch']:>9}"
+              + (f"   오차 {r['err']:.1e} (허용 {r['tol']:.0e})" if "err" in r else ""))
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m gescan.bench",
+                                 description="오프라인 스캔 벤치마크 (합성 데이터)")
+    ap.add_argument("-n", "--tickers", type=int, nargs="+", default=list(SIZES))
+    ap.add_argument("-P", "--period", nargs="+", choices=list(PERIODS),
+                    default=list(PERIODS))
+    ap.add_argument("-m", "--modes", nargs="+", choices=MODES + tuple(EXTRA),
+                    default=list(MODES))
+    ap.add_argument("-r", "--repeat", type=int, default=1, help="반복 횟수 (최솟값 사용)")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--no-mem", action="store_true", help="최대 메모리 측정 생략")
+    ap.add_argument("--json", help="결과를 JSON 으로 저장")
+    ap.add_argument("--golden", help="기준 해시 파일 (없으면 만들고, 있으면 비교)")
+    ap.add_argument("--data", metavar="DIR", help="합성 대신 종목별 파일 디렉터리 (앞에서 n 종목)")
+    a = ap.parse_args(argv)
+
+    res = []
+    for p in a.period:
+        for n in a.tickers:
+            r = bench(n, p, tuple(a.modes), a.repeat, not a.no_mem, a.seed, a.data)
+            _print(r); res.extend(r)
+    bad = sum(r["mismatch"] for r in res)
+
+    if a.golden:
+        # 기준 해시는 모드 선택과 무관하게 항상 float64 종목별 엔진 결과
+        key = lambda r: f"{a.seed}/{r['tickers']}/{r['period']}"
+        got = {key(r): r["ref_digest"] for r in res}
+        if os.path.exists(a.golden):
+            with open(a.golden) as f: gold = json.load(f)
+            diff = sorted(k for k, d in got.items() if k in gold and gold[k] != d)
+            bad += len(diff)
+            print(f"\n기준 비교: {len(got)-len(diff)}/{len(got)} 일치" +
+                  (f" · 다름: {', '.join(diff)}" if diff else ""))
+        else:
+            with open(a.golden, "w") as f: json.dump(got, f, indent=1)
+            print(f"\n기준 해시 저장: {a.golden}")
+    if a.json:
+        with open(a.json, "w") as f: json.dump(res, f, ensure_ascii=False, indent=1)
+    if bad:
+        print(f"\n결과 불일치 {bad}건", file=sys.stderr)
+    return 1 if bad else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,146 @@
+"""
+명령줄 스캔
+  python -m gescan sp500 -o sp500.csv
+  python -m gescan dax40 -o dax.json --procs 4
+  python -m gescan nasdaq100 -n 50 -o nq.parquet --no-cache
+  python -m gescan dow30 nasdaq100 dax40 -o out/{index}.csv   # 겹치는 종목은 한 번만 계산
+출력 형식은 확장자(.csv / .parquet / .json)로 정하며 --format 으로 바꿀 수 있다.
+기본은 화면과 같은 표시용 표, --raw 면 수치 · 코드 그대로(Result 필드) 저장한다.
+--diff 경로를 주면 직전 스캔 대비 신호 · 총점 · 일목 변화표를 따로 저장한다 (캐시 필요).
+--data DIR 이면 Yahoo 대신 로컬 종목별 파일(gescan.provider.FileProvider)에서 읽는다.
+  기간은 각 파일의 마지막 봉부터 재고, --asof 날짜를 주면 그날까지의 봉만 쓴다 (실행 날짜와 무관).
+--tf W M 이면 같은 일봉을 주봉 · 월봉으로 묶어 시간대별 신호 열을 더한다 (일봉 기간만 늘려 받음).
+상장폐지 · 잘못된 심볼 등 받지 못한 종목은 음성 캐시에 남아 만료 전까지 건너뛴다 (--retry-bad 로 다시 요청).
+--where 조건식 · --screen 이름이면 결과 중 조건에 맞는 종목만 저장한다 (gescan.query).
+  python -m gescan sp500 -o pick.csv --where "score >= 4 and rsi < 45 and vol_ratio > 1.5"
+지수를 여러 개 주면 지수별 파일로 나눠 저장한다 — 경로에 {index} 가 없으면 확장자 앞에 -지수 를 붙인다.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from gescan.diff import render_diff
+from gescan.headless import scan, scan_many
+from gescan.provider import get_provider
+from gescan.query import Screener, load_screens
+from gescan.record import render
+from gescan.trace import DEFAULT_PATH, Trace
+from gescan.universe import CURRENCY
+
+FORMATS = ("csv", "parquet", "json")
+
+
+def write(df, path, fmt=None):
+    fmt = fmt or os.path.splitext(path)[1].lstrip(".").lower() or "csv"
+    if fmt == "csv":
+        df.to_csv(path, index=False, encoding="utf-8-sig")   # 엑셀에서 한글 깨짐 방지
+    elif fmt == "parquet":
+        df.to_parquet(path, index=False)                      # pyarrow 필요
+    elif fmt == "json":
+        df.to_json(path, orient="records", force_ascii=False, indent=1)
+    else:
+        raise ValueError(f"지원하지 않는 형식: {fmt} ({', '.join(FORMATS)})")
+
+
+def out_path(path, index_key):
+    """여러 지수 저장 경로 — {index} 치환, 없으면 확장자 앞에 -지수"""
+    if "{index}" in path: return path.replace("{index}", index_key)
+    stem, ext = os.path.splitext(path)
+    return f"{stem}-{index_key}{ext}"
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m gescan",
+                                 description="글로벌 스마트 스캐너 (헤드리스)")
+    ap.add_argument("index", nargs="+", choices=list(CURRENCY),
+                    help="지수 (여러 개면 종목 합집합을 한 번만 받아 지수별로 저장)")
+    ap.add_argument("-o", "--output", required=True, help="결과 파일 경로")
+    ap.add_argument("--format", choices=FORMATS, help="출력 형식 (기본: 확장자)")
+    ap.add_argument("-n", "--max", type=int, default=None, help="최대 종목 수")
+    ap.add_argument("--sector", default="", help="섹터 필터 (S&P 500)")
+    ap.add_argument("-w", "--workers", type=int, default=2, help="다운로드 작업자 수")
+    ap.add_argument("-p", "--procs", type=int, default=0,
+                    help="계산 프로세스 수 (0: 메인 프로세스에서 계산)")
+    ap.add_argument("-b", "--batch", type=int, default=50, help="배치 크기")
+    ap.add_argument("--mode", choices=("online", "panel", "ticker", "tail"), default="online",
+                    help="지표 계산 방식 (tail: 최근 TAIL_BARS 봉만 받고 계산)")
+    ap.add_argument("--float32", action="store_true",
+                    help="panel 방식 지표 배열을 float32 로 (메모리 절반, 허용 오차 panel.F32_RTOL)")
+    ap.add_argument("--mmap", action="store_true",
+                    help="계산 프로세스에 배치를 memmap 패널 파일로 넘김 (panel · tail 방식 · -p > 0)")
+    ap.add_argument("--tf", nargs="+", choices=("W", "M"), default=(),
+                    help="상위 시간대 신호 추가 (W: 주봉, M: 월봉 — 일봉 2y · 8y 를 받아 묶음)")
+    ap.add_argument("--no-cache", action="store_true", help="로컬 캐시 사용 안 함")
+    ap.add_argument("--rebuild", action="store_true", help="캐시 전체 재구축")
+    ap.add_argument("--retry-bad", action="store_true",
+                    help="음성 캐시(최근 받지 못한 종목)를 무시하고 모두 요청")
+    ap.add_argument("--fixed", action="store_true",
+                    help="적응형 요청 제어 대신 고정 작업자 수로 다운로드")
+    ap.add_argument("--raw", action="store_true", help="표시 문자열 대신 수치 결과 저장")
+    ap.add_argument("--where", metavar="QUERY",
+                    help="조건 검색 (예: \"score >= 4 and ichimoku == breakout_up\")")
+    ap.add_argument("--screen", metavar="NAME", help="저장된 조건 이름 (gescan.query.load_screens)")
+    ap.add_argument("--data", metavar="DIR",
+                    help="Yahoo 대신 DIR/<종목>.parquet|csv 에서 읽기 (캐시 · 요청 제어 생략)")
+    ap.add_argument("--asof", metavar="YYYY-MM-DD",
+                    help="--data 기준일 — 이 날짜까지의 봉으로 스캔 (기본: 파일의 마지막 봉)")
+    ap.add_argument("--diff", metavar="PATH",
+                    help="직전 스캔 대비 변화표 저장 경로 (여러 지수면 {index} 치환)")
+    ap.add_argument("--no-reuse", action="store_true",
+                    help="마지막 봉이 그대로인 종목도 다시 계산")
+    ap.add_argument("--trace", nargs="?", const=DEFAULT_PATH, metavar="PATH",
+                    help=f"단계별 계측 기록을 JSONL 로 추가 (기본: {DEFAULT_PATH})")
+    ap.add_argument("-q", "--quiet", action="store_true")
+    a = ap.parse_args(argv)
+    if a.asof and not a.data: ap.error("--asof 는 --data 와 함께 사용")
+    try: prov = get_provider(a.data, a.asof) if a.data else None
+    except ValueError as e: ap.error(str(e))
+    screens = load_screens()
+    if a.screen and a.screen not in screens:
+        ap.error(f"저장된 조건이 없음: {a.screen} ({', '.join(screens)})")
+    query = " and ".join(f"({q})" for q in (a.where, screens.get(a.screen)) if q)
+
+    def progress(view, done, tot):
+        if not a.quiet:
+            print(f"\r{done}/{tot} 분석 · {len(view)}개 결과", end="", file=sys.stderr)
+
+    t0 = time.time(); tr = Trace() if a.trace else None
+    keys = list(dict.fromkeys(a.index))
+    kw = dict(max_n=a.max, sector=a.sector, io_workers=a.workers, cpu_workers=a.procs,
+              batch=a.batch, mode=a.mode, cache=not a.no_cache, rebuild=a.rebuild,
+              adaptive=not a.fixed, on_batch=progress, trace=tr, reuse=not a.no_reuse,
+              diff=bool(a.diff), provider=prov, mmap=a.mmap,
+              dtype="float32" if a.float32 else None, tfs=a.tf, retry_bad=a.retry_bad)
+    if len(keys) == 1:
+        res = scan(keys[0], **kw)
+        dfs, chg = ({keys[0]: res[0]}, {keys[0]: res[1]}) if a.diff else ({keys[0]: res}, {})
+        paths = {keys[0]: a.output}
+        dpaths = {keys[0]: a.diff}
+    else:
+        dfs, chg = scan_many(keys, **kw) if a.diff else (scan_many(keys, **kw), {})
+        paths = {k: out_path(a.output, k) for k in keys}
+        dpaths = {k: out_path(a.diff, k) for k in keys} if a.diff else {}
+    if query:
+        dfs = {k: Screener(df)(query) for k, df in dfs.items()}
+    for k, df in dfs.items():
+        write(df if a.raw else render(df), paths[k], a.format)
+    for k, d in chg.items():
+        write(d if a.raw else render_diff(d), dpaths[k], a.format)
+    n = sum(map(len, dfs.values()))
+    if tr is not None:
+        tr.dump(a.trace, index=",".join(keys), mode=a.mode, tickers=a.max, rows=n)
+        if not a.quiet:
+            print("\n" + tr.stages().round(2).to_string(index=False), file=sys.stderr)
+    if not a.quiet:
+        for k, df in dfs.items():
+            print(f"\n✅ {k}: {len(df)}개 종목 → {paths[k]}", end="", file=sys.stderr)
+            if k in chg:
+                print(f" · 변화 {len(chg[k])}개 → {dpaths[k]}", end="", file=sys.stderr)
+        print(f" ({time.time()-t0:.1f}초)", file=sys.stderr)
+    return 0 if n else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+"""
+백그라운드 스캔 서비스
+설정한 지수를 거래소 마감 후(마감 + settle) 다시 스캔해 버전별 결과 스냅샷으로 저장한다.
+Streamlit 화면은 최신 스냅샷을 바로 열고, '지금 갱신' 은 요청 파일만 남겨 서비스가 처리한다.
+여러 사용자가 같은 스캔 하나를 공유하므로 세션마다 Yahoo 요청을 다시 보내지 않는다.
+
+  python -m gescan.daemon                        # 전체 지수, 마감 후마다
+  python -m gescan.daemon dow30 dax40 --every 1800   # 장중에도 30분마다
+  python -m gescan.daemon sp500 --once           # 한 번 스캔 후 종료 (cron)
+
+스냅샷 : ~/.cache/gescan/results/<지수>-<버전>.json (지수별 KEEP 개 보관)
+요청   : results/<지수>.request — 다음 확인 때 스캔 후 삭제
+상태   : results/daemon.json — pid · 마지막 확인 시각 (화면에서 실행 여부 표시)
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+
+from gescan.headless import scan_many
+from gescan.record import from_values, to_values
+from gescan.scheduler import FetchScheduler
+from gescan.store import DEFAULT_DIR, BarStore, last_close, market_open
+from gescan.universe import CURRENCY
+
+RES_DIR = os.path.join(DEFAULT_DIR, "results")
+KEEP    = 10            # 지수별 보관 버전 수
+SETTLE  = 1800          # 마감 후 이만큼 지나서 스캔 (종가 확정 대기)
+POLL    = 60            # 확인 주기(초)
+ALIVE   = 3*POLL        # 상태 파일이 이보다 오래되면 서비스 중지로 봄
+
+# 지수 → 거래소 세션 (gescan.store.SESSIONS 의 종목 접미사)
+SUFFIX = {"dax40": ".DE"}
+
+
+# ─────────────────────────────────────────────
+# 결과 스냅샷
+# ─────────────────────────────────────────────
+
+def _path(name):
+    return os.path.join(RES_DIR, name)
+
+def result_snapshots(index_key):
+    """저장된 결과 스냅샷 경로 (오래된 → 최신)"""
+    if not os.path.isdir(RES_DIR): return []
+    return sorted(_path(f) for f in os.listdir(RES_DIR)
+                  if f.startswith(f"{index_key}-") and f.endswith(".json"))
+
+def save_results(index_key, df, **info):
+    """수치 결과 프레임을 새 버전으로 저장 (임시 파일 → 교체) 후 오래된 버전 정리"""
+    os.makedirs(RES_DIR, exist_ok=True)
+    now = time.time(); ver = time.strftime("%Y%m%dT%H%M%S", time.gmtime(now))
+    path = _path(f"{index_key}-{ver}.json")
+    snap = {"index": index_key, "version": ver, "created": now, "count": len(df),
+            **info, "rows": to_values(df)}
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(snap, f, ensure_ascii=False)
+    os.replace(tmp, path)
+    for old in result_snapshots(index_key)[:-KEEP]:
+        try: os.remove(old)
+        except OSError: pass
+    return path
+
+def load_results(index_key):
+    """(수치 결과 프레임, 정보) — 최신 스냅샷, 없으면 (None, None)"""
+    for path in reversed(result_snapshots(index_key)):
+        try:
+            with open(path, encoding="utf-8") as f: snap = json.load(f)
+        except (OSError, ValueError): continue
+        df = from_values(snap.pop("rows"))
+        return df, {**snap, "age": time.time() - snap["created"]}
+    return None, None
+
+
+# ─────────────────────────────────────────────
+# 갱신 요청 · 상태
+# ─────────────────────────────────────────────
+
+def request_refresh(index_key):
+    """다음 확인 때 스캔하도록 요청 파일 생성"""
+    os.makedirs(RES_DIR, exist_ok=True)
+    with open(_path(f"{index_key}.request"), "w") as f: f.write(str(time.time()))
+
+def requested(index_key):
+    return os.path.exists(_path(f"{index_key}.request"))
+
+def _clear_request(index_key):
+    try: os.remove(_path(f"{index_key}.request"))
+    except OSError: pass
+
+def _beat(keys):
+    os.makedirs(RES_DIR, exist_ok=True)
+    tmp = _path("daemon.json.tmp")
+    with open(tmp, "w") as f:
+        json.dump({"pid": os.getpid(), "ts": time.time(), "indices": keys}, f)
+    os.replace(tmp, _path("daemon.json"))
+
+def daemon_status():
+    """서비스 상태 {pid, ts, indices, alive} — 상태 파일이 없으면 None"""
+    try:
+        with open(_path("daemon.json")) as f: st = json.load(f)
+    except (OSError, ValueError): return None
+    return {**st, "alive": time.time() - st["ts"] < ALIVE}
+
+
+# ─────────────────────────────────────────────
+# 일정
+# ─────────────────────────────────────────────
+
+def due(index_key, now=None, settle=SETTLE, every=None):
+    """
+    스캔할 때인지 — 요청 파일이 있거나, 스냅샷이 없거나,
+    최신 스냅샷이 마지막 마감 + settle 이전이거나, (every) 장중이고 every 초가 지났으면
+    """
+    now = now or time.time()
+    if requested(index_key): return True
+    snaps = result_snapshots(index_key)
+    if not snaps: return True
+    created = os.path.getmtime(snaps[-1])
+    sfx = SUFFIX.get(index_key, "")
+    done = last_close(sfx, now) + settle
+    if created < done <= now: return True
+    return bool(every) and market_open(sfx, now) and now - created >= every
+
+def run_once(keys, store=None, **kw):
+    """지수들을 한 번에 스캔(겹치는 종목은 한 번만) → {지수: 스냅샷 경로}"""
+    for k in keys: _clear_request(k)
+    a = time.time()
+    dfs = scan_many(keys, store=store, **kw)
+    wall = round(time.time() - a, 1)
+    return {k: save_results(k, df, mode=kw.get("mode", "online"), wall=wall)
+            for k, df in dfs.items()}
+
+def serve(keys, poll=POLL, settle=SETTLE, every=None, log=print, **kw):
+    """due 인 지수를 모아 스캔하는 루프 (BarStore · 스케줄러는 루프 전체에서 재사용)"""
+    store = BarStore() if kw.pop("cache", True) else None
+    sched = FetchScheduler()
+    while True:
+        _beat(keys)
+        go = [k for k in keys if due(k, settle=settle, every=every)]
+        if go:
+            log(f"{time.strftime('%H:%M:%S')} 스캔: {', '.join(go)}")
+            try:
+                for k, p in run_once(go, store=store, sched=sched,
+                                     cache=store is not None, **kw).items():
+                    log(f"  {k} → {p}")
+            except Exception as e:                 # 한 번 실패해도 서비스는 계속
+                log(f"  실패: {type(e).__name__}: {e}")
+        time.sleep(poll)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m gescan.daemon",
+                                 description="백그라운드 스캔 서비스 (결과 스냅샷 저장)")
+    ap.add_argument("index", nargs="*", choices=list(CURRENCY), help="지수 (기본: 전체)")
+    ap.add_argument("--once", action="store_true", help="한 번 스캔 후 종료")
+    ap.add_argument("--every", type=int, default=None, metavar="SEC",
+                    help="장중에도 SEC 초마다 다시 스캔")
+    ap.add_argument("--settle", type=int, default=SETTLE, help="마감 후 대기(초)")
+    ap.add_argument("--poll", type=int, default=POLL, help="확인 주기(초)")
+    ap.add_argument("-p", "--procs", type=int, default=0, help="계산 프로세스 수")
+    ap.add_argument("--mode", choices=("online", "panel", "ticker", "tail"), default="online")
+    ap.add_argument("--no-cache", action="store_true", help="로컬 캐시 사용 안 함")
+    a = ap.parse_args(argv)
+    keys = list(dict.fromkeys(a.index)) or list(CURRENCY)
+    kw = dict(cpu_workers=a.procs, mode=a.mode, cache=not a.no_cache)
+    if a.once:
+        for k, p in run_once(keys, **kw).items(): print(f"{k} → {p}")
+        return 0
+    try:
+        serve(keys, poll=a.poll, settle=a.settle, every=a.every, **kw)
+    except KeyboardInterrupt:
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
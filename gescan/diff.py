@@ -0,0 +1,103 @@
+"""
+스캔 간 변화
+  - 재사용 : 마지막 봉(날짜 · 종가 · 거래량)이 직전 스캔과 같은 종목은 계산하지 않고 직전 결과를 쓴다
+             → 장중 재스캔 비용이 새 데이터가 있는 종목 수에 비례
+  - 변화표 : 직전 스캔 대비 신호 · 총점 · 일목 상태가 바뀐 종목 (예: ⏸️ 관망 → 🔥 적극매수)
+직전 결과는 BarStore 의 result 테이블에 종목별로 저장된다.
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+
+from gescan.record import ICH, SIGNALS, Result, to_frame
+
+DIFF_COLS = ['티커','종목명','구분','신호','일목','총점','점수변화']
+
+
+# ─────────────────────────────────────────────
+# 직전 결과 재사용
+# ─────────────────────────────────────────────
+
+def bar_stamp(f):
+    """마지막 봉 지문 — 날짜가 같아도 장중 종가 · 거래량이 바뀌면 다른 값"""
+    if f is None or not len(f): return None
+    r = f.iloc[-1]
+    return f"{pd.Timestamp(f.index[-1]):%Y-%m-%d}|{r['Close']!r}|{r.get('Volume')!r}"
+
+def dump_row(r):
+    return json.dumps(list(r), ensure_ascii=False)
+
+def load_row(s):
+    return Result(*json.loads(s))
+
+def split_unchanged(frames, store, tag=""):
+    """
+    {종목: 프레임} → (재사용 {종목: 직전 Result}, 다시 계산할 {종목: 프레임}, {종목: 지문})
+    지문은 계산할 종목 것만 — 계산 후 put_results 에 그대로 쓴다
+    tag 는 지문 뒤에 붙는 계산 설정 (예: 상위 시간대) — 설정이 다르면 재사용하지 않음
+    """
+    stamps = {t: bar_stamp(f) for t, f in frames.items()}
+    if tag: stamps = {t: s and f"{s}|{tag}" for t, s in stamps.items()}
+    prev = store.get_results([t for t, s in stamps.items() if s is not None])
+    kept = {t: load_row(prev[t][1]) for t, s in stamps.items()
+            if t in prev and prev[t][0] == s}
+    return (kept, {t: f for t, f in frames.items() if t not in kept},
+            {t: s for t, s in stamps.items() if t not in kept})
+
+def save_rows(store, part, rows, stamps):
+    """계산 결과를 지문과 함께 저장 (결과 없음 · 빈 프레임은 다음 스캔에서 다시 계산)"""
+    recs = {t: (stamps[t], dump_row(r)) for t, r in zip(part, rows)
+            if r is not None and stamps.get(t)}
+    if recs: store.put_results(recs)
+
+def previous_results(store, tickers):
+    """직전 스캔 결과 → 수치 결과 DataFrame (스캔 전에 읽어 diff 의 기준으로 사용)"""
+    return to_frame(load_row(row) for _, row in store.get_results(tickers).values())
+
+
+# ─────────────────────────────────────────────
+# 변화표
+# ─────────────────────────────────────────────
+
+def diff(prev, cur):
+    """
+    직전 · 현재 수치 결과 → 바뀐 종목만 (현재 총점 내림차순)
+    열: ticker · name · new(직전 없음) · sig0/sig · ich0/ich · score0/score · dscore
+    직전 코드는 새 종목이면 -1. 일목 돌파/이탈 후 일수 변화만으로는 바뀐 것으로 보지 않는다.
+    """
+    p = prev[['ticker','sig','ich','score']].rename(
+        columns={'sig': 'sig0', 'ich': 'ich0', 'score': 'score0'})
+    d = cur[['ticker','name','sig','ich','score']].merge(p, on='ticker', how='left')
+    new = d['sig0'].isna().to_numpy()
+    d[['sig0','ich0','score0']] = d[['sig0','ich0','score0']].fillna(-1)
+    d = d.astype({'sig0': 'int8', 'ich0': 'int8', 'score0': 'int16'})
+    d['new'] = new
+    d['dscore'] = np.where(new, 0, d['score'] - d['score0']).astype('int16')
+    chg = new | (d['sig'] != d['sig0']).to_numpy() | (d['ich'] != d['ich0']).to_numpy() \
+          | (d['dscore'] != 0).to_numpy()
+    return d[chg].sort_values('score', ascending=False, kind='stable').reset_index(drop=True)
+
+def _arrow(table, a, b, new):
+    lab = np.array(table, dtype=object)
+    cur = lab[np.asarray(b, dtype=int)]
+    old = lab[np.clip(np.asarray(a, dtype=int), 0, None)]
+    return [c if n or o == c else f"{o} → {c}" for o, c, n in zip(old, cur, new)]
+
+def render_diff(d):
+    """변화표 → 표시용 DataFrame(DIFF_COLS)"""
+    if d.empty:
+        return pd.DataFrame(columns=DIFF_COLS)
+    new = d['new'].to_numpy()
+    kind = np.where(new, "🆕 신규",
+           np.where(d['sig'] != d['sig0'], "🔀 신호",
+           np.where(d['ich'] != d['ich0'], "☁️ 일목", "± 점수")))
+    return pd.DataFrame({
+        '티커': d['ticker'].tolist(), '종목명': d['name'].tolist(), '구분': kind,
+        '신호': _arrow(SIGNALS, d['sig0'], d['sig'], new),
+        '일목': _arrow(ICH, d['ich0'], d['ich'], new),
+        '총점': d['score'].to_numpy(dtype=int),
+        '점수변화': [("" if n else f"{'+' if x>0 else ''}{x}") for x, n in
+                  zip(d['dscore'].tolist(), new)],
+    }, columns=DIFF_COLS)
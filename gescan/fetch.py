@@ -0,0 +1,158 @@
+"""
+배치 다운로드
+여러 종목을 한 번의 yf.download([...], group_by="ticker") 호출로 받아
+종목별 OHLCV 프레임으로 분리한다.
+청크에서 빠진 종목은 Ticker.history(raise_errors=True) 로 하나씩 다시 받는다 — yf.download 는
+종목별 오류를 돌려주지 않고 로그로만 남기므로, 실패 종류(classify)는 이 예외로 가린다.
+실패는 종류별로 지수 백오프 + 지터로 최대 RETRIES 회 재시도한다 (빈 응답은 상장폐지일 수 있어
+EMPTY_RETRIES 회). 최종 실패 이유는 FAILED, 결과 종류별 건수는 STATS 에 남긴다
+(FetchScheduler.failed · stats 와 같은 형식 — Trace.requests 로 스캔 전후 차이를 기록).
+
+yfinance 1.7 부터 yf.download 는 호출마다 상태(_DownloadCtx)를 따로 두어 스레드 동시 호출에
+안전하다 (requirements.txt 에 고정) — I/O 작업자(io_workers) 수만큼 청크를 동시에 받는다.
+"""
+
+import random
+import threading
+import time
+from collections import Counter
+
+import pandas as pd
+import yfinance as yf
+
+OHLCV = ['Open','High','Low','Close','Volume']
+
+RETRIES, EMPTY_RETRIES = 2, 1
+BASE_DELAY, MAX_DELAY = 1.0, 30.0
+FAILED = {}          # 최종 실패 종목 → 마지막 실패 종류 (성공하면 지움)
+STATS = Counter()    # 결과 종류별 건수 (ok/throttle/timeout/empty/error/retry)
+_STATS_LOCK = threading.Lock()
+
+
+def _count(kind, n=1):
+    with _STATS_LOCK: STATS[kind] += n
+
+
+def classify(e):
+    """예외 · 오류 메시지 → 'throttle' | 'timeout' | 'empty' | 'error'"""
+    n = type(e).__name__.lower() if isinstance(e, BaseException) else ""
+    m = str(e).lower()
+    if 'ratelimit' in n or '429' in m or 'too many requests' in m or 'rate limit' in m:
+        return 'throttle'
+    if 'timeout' in n or 'timed out' in m or isinstance(e, TimeoutError): return 'timeout'
+    if 'missing' in n or 'delisted' in m or 'no data' in m: return 'empty'
+    return 'error'
+
+def backoff(attempt, kind, base=BASE_DELAY, cap=MAX_DELAY):
+    """재시도 전 대기 (초) — 지수 백오프, 차단(429)은 4배, ×0.5~1.5 지터"""
+    return min(cap, base*2**attempt*(4 if kind == 'throttle' else 1))*random.uniform(0.5, 1.5)
+
+
+def chunked(seq, n):
+    n = max(1, int(n))
+    for i in range(0, len(seq), n):
+        yield seq[i:i+n]
+
+
+def clean_frame(df):
+    """컬럼 정리 + 빈 행 제거 → 비어 있으면 None"""
+    if df is None or df.empty:
+        return None
+    df = df.copy()
+    df.columns = [str(c).strip() for c in df.columns]
+    df = df[[c for c in OHLCV if c in df.columns]]
+    df = df.dropna(how='all')
+    if 'Close' not in df.columns or df['Close'].isna().all():
+        return None
+    return df.sort_index()
+
+
+def split_frame(raw, tickers):
+    """MultiIndex(종목, 필드) 프레임 → {종목: OHLCV 프레임}"""
+    out = {}
+    if raw is None or raw.empty:
+        return out
+    if not isinstance(raw.columns, pd.MultiIndex):
+        # 단일 종목 요청은 평범한 컬럼으로 올 수 있음
+        if len(tickers) == 1:
+            f = clean_frame(raw)
+            if f is not None: out[tickers[0]] = f
+        return out
+    lv0 = set(raw.columns.get_level_values(0))
+    if not lv0 & set(tickers):
+        raw = raw.swaplevel(axis=1)   # group_by='column' 형태
+        lv0 = set(raw.columns.get_level_values(0))
+    for t in tickers:
+        if t not in lv0: continue
+        f = clean_frame(raw[t])
+        if f is not None: out[t] = f
+    return out
+
+
+def _download(tickers, period, interval, timeout, threads, start=None):
+    # start 가 주어지면 기간(period) 대신 해당 날짜 이후만 요청
+    rng = {"start": start} if start is not None else {"period": period}
+    return yf.download(
+        tickers if len(tickers) > 1 else tickers[0],
+        interval=interval, group_by="ticker",
+        auto_adjust=True, progress=False, timeout=timeout, threads=threads, **rng
+    )
+
+def history(ticker, period="18mo", interval="1d", timeout=15, start=None):
+    """종목 하나 Ticker.history — 실패는 예외로 (classify 용) · 비면 None"""
+    rng = {"start": start} if start is not None else {"period": period}
+    df = yf.Ticker(ticker).history(interval=interval, auto_adjust=True,
+                                   timeout=timeout, raise_errors=True, **rng)
+    if df is not None and getattr(df.index, 'tz', None) is not None:
+        df.index = df.index.tz_localize(None)   # download() 과 같은 tz-naive 날짜
+    return clean_frame(df)
+
+
+def download_one(ticker, period="18mo", interval="1d", timeout=15, start=None,
+                 retries=RETRIES):
+    """종목 하나 받기 (실패 종류별 재시도) → 프레임 | None (이유는 FAILED[종목])"""
+    for attempt in range(retries + 1):
+        f = None
+        try:
+            f = history(ticker, period, interval, timeout, start)
+            kind = 'ok' if f is not None else 'empty'
+        except Exception as e:
+            kind = classify(e)
+        _count(kind)
+        if kind == 'ok':
+            FAILED.pop(ticker, None)
+            return f
+        lim = min(retries, EMPTY_RETRIES) if kind == 'empty' else retries
+        if attempt >= lim: break
+        _count('retry')
+        time.sleep(backoff(attempt, kind))
+    FAILED[ticker] = kind
+    return None
+
+
+def download_chunk(tickers, period="18mo", interval="1d", timeout=15, threads=True,
+                   start=None):
+    """한 청크 다운로드 → 실패/누락 종목은 개별 재시도 (청크 요청이 차단되면 물러난 뒤)"""
+    tickers = list(tickers)
+    try:
+        got = split_frame(_download(tickers, period, interval, timeout, threads, start),
+                          tickers)
+    except Exception as e:
+        got = {}; kind = classify(e); _count(kind)
+        if kind == 'throttle': time.sleep(backoff(0, 'throttle'))
+    _count('ok', len(got))
+    for t in got: FAILED.pop(t, None)
+    for t in tickers:
+        if t not in got:
+            f = download_one(t, period, interval, timeout, start)
+            if f is not None: got[t] = f
+    return got
+
+
+def iter_download(tickers, chunk=50, period="18mo", interval="1d",
+                  timeout=15, threads=True):
+    """청크 단위로 받아 (종목, 프레임 | None) 을 순서대로 내보냄"""
+    for part in chunked(list(tickers), chunk):
+        got = download_chunk(part, period, interval, timeout, threads)
+        for t in part:
+            yield t, got.get(t)
@@ -0,0 +1,209 @@
+"""
+헤드리스 스캔 (Streamlit 없이)
+UI · CLI · 배치 작업이 같은 경로로 지수를 스캔한다.
+캐시를 쓰면 마지막 봉이 직전 스캔과 같은 종목은 다시 계산하지 않고, 직전 대비 변화표를 낼 수 있다.
+여러 지수를 고르면 종목 합집합을 한 번만 받고 계산해 지수별 결과로 나눈다 (scan_many).
+"""
+
+import time
+
+from gescan.diff import diff as diff_frames, previous_results
+from gescan.fetch import FAILED, STATS, download_chunk, iter_download
+from gescan.health import FetchHealth
+from gescan.memo import memo_key
+from gescan.panel import tail_period
+from gescan.pipeline import run_pipeline
+from gescan.provider import get_provider
+from gescan.record import Result, to_frame
+from gescan.results import ResultView
+from gescan.scheduler import FetchScheduler
+from gescan.store import BarStore, iter_cached
+from gescan.timeframe import history_for, timeframes
+from gescan.universe import CURRENCY, load_tickers, select_tickers
+
+
+def make_fetch(store=None, sched=None, threads=True, rebuild=False, provider=None,
+               period="18mo"):
+    """
+    run_pipeline 의 fetch(part) 선택
+    store 가 있으면 로컬 캐시 경유, sched 가 있으면 적응형 스케줄러로 요청
+    provider(gescan.provider.Provider) 가 있으면 yfinance 대신 그 공급자에서 받음
+    period : 받을 일봉 기간 (상위 시간대를 계산하면 gescan.timeframe.history_for)
+    """
+    if provider is not None:
+        if store is not None:
+            return lambda part: iter_cached(part, store, chunk=len(part), period=period,
+                                            threads=threads, rebuild=rebuild,
+                                            download=provider.download)
+        return lambda part: provider.iter(part, chunk=len(part), period=period)
+    if store is not None:
+        dl = sched.download if sched is not None else download_chunk
+        return lambda part: iter_cached(part, store, chunk=len(part), period=period,
+                                        threads=threads, rebuild=rebuild, download=dl)
+    if sched is not None:
+        return lambda part: sched.iter(part, period)
+    return lambda part: iter_download(part, chunk=len(part), period=period, threads=threads)
+
+
+def fetch_period(mode="online", tfs=(), provider=None):
+    """
+    받을 일봉 기간 — tail 방식은 원격 공급자만 최근 창(tail_period)으로 줄여 받는다.
+    로컬 파일은 읽는 비용이 같으므로 보통 기간을 읽고 파이프라인이 마지막 TAIL_BARS 봉으로 자른다
+    (달력 기간이 아니라 마지막 봉 기준 봉 수).
+    """
+    remote = provider is None or provider.remote
+    return history_for(tfs, tail_period() if mode == "tail" and remote else "18mo")
+
+
+def scan(index_key, max_n=None, sector="", io_workers=2, cpu_workers=0, batch=50,
+         mode="online", cache=True, rebuild=False, adaptive=True, tickers=None,
+         store=None, sched=None, pool=None, on_batch=None, trace=None, reuse=True,
+         diff=False, provider=None, dtype=None, mmap=False, tfs=(), memo=None,
+         retry_bad=False):
+    """
+    지수 하나를 스캔해 총점 내림차순 수치 결과 DataFrame(Result 필드) 을 돌려줌
+    표시용 표는 gescan.record.render(df)
+    tickers  : load_tickers 형식 목록을 직접 넘기면 지수 목록 대신 사용
+    on_batch : 배치가 끝날 때마다 on_batch(view, done, total) 호출 (진행 표시용)
+    trace    : gescan.trace.Trace — 단계별 시간 · 요청 결과 건수 기록
+    reuse    : 마지막 봉이 직전 스캔과 같은 종목은 직전 결과 사용 (캐시 필요)
+    diff     : True 면 (결과, 직전 스캔 대비 변화표) — 변화표는 gescan.diff.diff 형식
+    provider : gescan.provider.Provider 또는 get_provider 인자 (기본: yfinance)
+               로컬 디렉터리는 기간을 파일의 마지막 봉부터 잰다 (기준일은 FileProvider(dir, asof))
+    dtype    : panel 방식 배열 dtype (np.float32 면 지표 배열 메모리 절반)
+    mmap     : 계산 프로세스에 배치를 memmap 패널 파일로 넘김 (panel · tail 방식 · cpu_workers > 0)
+    mode     : online · panel · ticker · tail (최근 TAIL_BARS 봉만 받고 계산 — 일일 갱신용)
+    tfs      : 상위 시간대 'W'(주봉) · 'M'(월봉) — 같은 일봉을 묶어 sig_w/score_w · sig_m/score_m 추가
+               (추가 요청 없이 일봉 기간만 늘려 받음, gescan.timeframe)
+    memo     : gescan.memo.ResultMemo — 유효한 결과가 있는 종목은 받지도 계산하지도 않음 (세션 간 공유)
+    retry_bad: 음성 캐시(상장폐지 · 잘못된 심볼 등, gescan.health)를 무시하고 모두 요청
+    """
+    if tickers is None:
+        a = time.perf_counter(); tickers = load_tickers(index_key)
+        if trace is not None: trace.add("종목목록", time.perf_counter() - a)
+    tlist = select_tickers(tickers, sector, max_n)
+    meta = {t['ticker']: t for t in tlist}
+    view = run_scan(meta, CURRENCY.get(index_key, ""), io_workers=io_workers,
+                    cpu_workers=cpu_workers, batch=batch, mode=mode, cache=cache,
+                    rebuild=rebuild, adaptive=adaptive, store=store, sched=sched,
+                    pool=pool, on_batch=on_batch, trace=trace, reuse=reuse,
+                    provider=provider, dtype=dtype, mmap=mmap, tfs=tfs, memo=memo,
+                    retry_bad=retry_bad)
+    df = view.frame()
+    if not diff: return df
+    return df, diff_frames(df[:0] if view.prev is None else view.prev, df)
+
+
+def run_scan(meta, currency, io_workers=2, cpu_workers=0, batch=50, mode="online",
+             cache=True, rebuild=False, adaptive=True, store=None, sched=None, pool=None,
+             on_batch=None, trace=None, reuse=True, provider=None, dtype=None,
+             mmap=False, tfs=(), memo=None, retry_bad=False):
+    """
+    {종목: 종목 정보} 를 받아 계산 → ResultView (scan · scan_many 공용)
+    currency 가 dict 면 종목별 통화 ({종목: 통화})
+    캐시를 쓰면 view.prev 에 직전 스캔 결과를 담는다 (view.changes())
+    로컬 공급자(remote=False)는 캐시 · 적응형 요청 제어를 쓰지 않는다
+    rebuild 면 메모의 해당 종목도 비운다
+    원격 공급자는 요청 차단기를 거치고, 캐시를 쓰면 불량 종목 음성 캐시도 쓴다 (view.health)
+    """
+    provider = get_provider(provider) if provider is not None else None
+    if provider is not None:
+        adaptive = False
+        if not provider.remote: cache = False
+    if cache and store is None: store = BarStore()
+    if not cache: store = None
+    if store is None and mode == "online": mode = "panel"
+    if adaptive and sched is None: sched = FetchScheduler()
+    tfs = timeframes(tfs)
+    fetch = make_fetch(store, sched if adaptive else None, threads=max(1, io_workers),
+                       rebuild=rebuild, provider=provider,
+                       period=fetch_period(mode, tfs, provider))
+    cur = currency if isinstance(currency, dict) else None
+    health = None
+    if provider is None or provider.remote:
+        failed = sched.failed if adaptive else FAILED
+        for t in meta: failed.pop(t, None)     # 직전 스캔의 실패 이유를 이번 실패로 읽지 않도록
+        health = FetchHealth(store, reason=failed.get, retry_bad=retry_bad)
+    if memo is not None:
+        if rebuild: memo.drop(list(meta))
+        memo = memo.scope(memo_key(provider, dtype or ("float32" if mmap else None), tfs,
+                                     mode))
+
+    view = ResultView(previous_results(store, list(meta)) if store is not None else None)
+    view.health = health
+    done = 0
+    stats = sched.stats if adaptive else STATS     # 고정 작업자 경로도 같은 요청 결과 건수
+    before = dict(stats)
+    for part, rows in run_pipeline(list(meta), meta, "" if cur else currency, fetch,
+                                   io_workers=io_workers, cpu_workers=cpu_workers,
+                                   batch=batch, mode=mode, store=store, pool=pool,
+                                   trace=trace, reuse=reuse, dtype=dtype, mmap=mmap,
+                                   tfs=tfs, memo=memo, health=health):
+        rows = [r for r in rows if r]
+        if cur: rows = [r._replace(currency=cur[r.ticker]) for r in rows]
+        view.extend(rows)
+        done += len(part)
+        if on_batch: on_batch(view, done, len(meta))
+    if trace is not None: trace.requests(before, stats)
+    return view
+
+
+# ─────────────────────────────────────────────
+# 여러 지수 동시 스캔 (종목 중복 제거)
+# ─────────────────────────────────────────────
+
+def union_meta(universes, sector="", max_n=None):
+    """
+    {지수: load_tickers 형식 목록} → (meta, members)
+    meta    : {종목: 정보} 합집합 — 먼저 나온 지수의 정보 + 'currency'
+    members : {지수: {종목: 정보}} — 지수별 필터 · max_n 적용 후 구성, 결과 분배용
+    """
+    meta, members = {}, {}
+    for k, tl in universes.items():
+        sub = {t['ticker']: t for t in select_tickers(tl, sector, max_n)}
+        members[k] = sub
+        for t, info in sub.items():
+            meta.setdefault(t, {**info, 'currency': CURRENCY.get(k, "")})
+    return meta, members
+
+def fan_out(view, members, rows=None):
+    """
+    합집합 결과(ResultView) → {지수: 수치 결과 DataFrame}
+    종목명 · 섹터 · 통화는 각 지수 목록 기준으로 다시 채운다 (순위 · 동점 순서 유지)
+    rows 를 주면 view.rows 대신 그 Result 목록을 나눈다 (직전 결과 등)
+    """
+    out = {}
+    for k, sub in members.items():
+        cur = CURRENCY.get(k, "")
+        out[k] = to_frame(r._replace(name=sub[r.ticker]['name'],
+                                     sector=sub[r.ticker].get('sector', ''), currency=cur)
+                          for r in (view.rows if rows is None else rows) if r.ticker in sub)
+    return out
+
+def fan_out_changes(view, members):
+    """합집합 결과 → {지수: 직전 스캔 대비 변화표} (직전 결과가 없으면 모두 신규)"""
+    cur = fan_out(view, members)
+    prev = view.prev.itertuples(index=False) if view.prev is not None else ()
+    old = fan_out(view, members, [Result(*r) for r in prev])
+    return {k: diff_frames(old[k], cur[k]) for k in members}
+
+def scan_many(index_keys, max_n=None, sector="", on_batch=None, trace=None,
+              universes=None, diff=False, **kw):
+    """
+    여러 지수를 한 번에 스캔 → {지수: 수치 결과 DataFrame}
+    겹치는 종목(AAPL · MSFT 등)은 한 번만 받고 계산한 뒤 지수별 결과로 나눈다.
+    universes : {지수: 종목 목록} 을 직접 넘기면 load_tickers 대신 사용
+    나머지 인자는 scan 과 같다 (on_batch 의 total 은 합집합 종목 수).
+    diff=True 면 ({지수: 결과}, {지수: 직전 스캔 대비 변화표})
+    """
+    if universes is None:
+        a = time.perf_counter()
+        universes = {k: load_tickers(k) for k in dict.fromkeys(index_keys)}
+        if trace is not None: trace.add("종목목록", time.perf_counter() - a)
+    meta, members = union_meta(universes, sector, max_n)
+    if trace is not None:
+        trace.count("중복 제거", sum(map(len, members.values())) - len(meta))
+    view = run_scan(meta, {t: m['currency'] for t, m in meta.items()},
+                    on_batch=on_batch, trace=trace, **kw)
+    if not diff: return fan_out(view, members)
+    return fan_out(view, members), fan_out_changes(view, members)
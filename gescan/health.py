@@ -0,0 +1,145 @@
+"""
+불량 종목 · 요청 차단기
+상장폐지 · 잘못된 심볼은 요청할 때마다 타임아웃까지 작업자를 붙잡고 결과 없이 끝난다.
+
+음성 캐시 (BarStore 의 bad 테이블, 캐시를 쓸 때만)
+  - 종목 탓이 확실한 실패만 이유와 함께 기록하고, 만료 전까지는 요청하지 않는다
+      empty   : 데이터 없음 (상장폐지 · 잘못된 심볼)       WAIT['empty'] × 2^(연속 실패-1)
+      short   : MIN_BARS 미만 (신규 상장) — 모자란 봉 수만큼 거래일이 지난 뒤
+    (최대 MAX_WAIT) · 다시 받으면 기록을 지운다
+  - 차단(429) · 타임아웃 · 기타 오류 · 이유를 모르는 실패는 일시적인 것으로 보고 기록하지 않는다
+    (정상 종목이 며칠씩 빠지는 오판이 음성 캐시의 가장 나쁜 실패)
+차단기
+  - 최근 window 종목 중 실패율이 trip 이상이면 요청이 막힌 것(차단 · 장애)으로 보고 cool 초 동안
+    요청을 멈춘 뒤, 실패한 종목을 한 번 더 받아 본다 (쉴 때마다 cool 두 배, 최대 max_cool)
+  - 차단기가 열린 배치의 실패는 종목 탓이 아니므로 음성 캐시에 기록하지 않는다
+"""
+
+import threading
+import time
+from collections import deque
+
+MIN_BARS = 80
+WAIT = {"empty": 86400}       # 종목 탓이 확실한 실패 → 기본 대기 (이 밖의 이유는 기록하지 않음)
+MAX_WAIT = 30*86400
+
+
+def expiry(reason, count, now, bars=0):
+    """만료 시각 (epoch 초)"""
+    if reason == "short":
+        wait = max(1, MIN_BARS - bars) * 86400 * 7/5     # 거래일 → 달력일
+    else:
+        wait = WAIT[reason] * 2**min(count - 1, 10)
+    return now + min(wait, MAX_WAIT)
+
+
+class Breaker:
+    """최근 실패율 기반 요청 차단기 (I/O 스레드 공유)"""
+
+    def __init__(self, window=100, trip=0.8, min_n=20, cool=60, max_cool=600):
+        self.recent = deque(maxlen=window)
+        self.trip, self.min_n = trip, min_n
+        self.base, self.cool, self.max_cool = cool, cool, max_cool
+        self.until = 0.0; self.trips = 0
+        self._lock = threading.Lock()
+
+    def record(self, ok, failed):
+        """배치 결과 반영 → 이번에 열렸으면 True"""
+        with self._lock:
+            self.recent.extend([True]*ok + [False]*failed)
+            n = len(self.recent); bad = n - sum(self.recent)
+            if n >= self.min_n and bad >= self.trip * n:
+                self.until = time.monotonic() + self.cool
+                self.cool = min(self.max_cool, self.cool*2)
+                self.trips += 1; self.recent.clear()
+                return True
+            if ok and not failed: self.cool = self.base
+            return False
+
+    @property
+    def open(self):
+        return time.monotonic() < self.until
+
+    def wait(self, stop=None):
+        """열려 있으면 닫힐 때까지 대기 (stop 이벤트가 켜지면 중단)"""
+        while self.open and not (stop is not None and stop.is_set()):
+            time.sleep(max(0.0, min(0.2, self.until - time.monotonic())))
+
+
+class FetchHealth:
+    """
+    run_pipeline(health=...) 인자 — 음성 캐시(store) + 차단기
+    reason(종목) → 실패 이유 (FetchScheduler.failed.get · gescan.fetch.FAILED.get)
+    이유를 알 수 없으면(reason 없음 · None) 일시적 실패로 보고 기록하지 않는다
+    """
+
+    def __init__(self, store=None, breaker=None, reason=None, retry_bad=False):
+        self.store, self.reason = store, reason
+        self.breaker = breaker if breaker is not None else Breaker()
+        self.retry_bad = retry_bad
+        self.known = set()            # 불량 기록이 있는 종목 (만료 포함)
+        self.skipped = {}; self.marked = {}   # 이번 스캔에서 제외한 · 새로 기록한 {종목: 이유}
+
+    @property
+    def trips(self):
+        return self.breaker.trips
+
+    def skip(self, tickers, now=None):
+        """{종목: 이유} — 만료 전 불량 종목 (요청하지 않음)"""
+        if self.store is None: return {}
+        now = now or time.time()
+        rec = self.store.get_bad(tickers)
+        self.known |= set(rec)
+        if self.retry_bad: return {}
+        self.skipped = {t: r[0] for t, r in rec.items() if r[3] > now}
+        return self.skipped
+
+    def fetch(self, fetch, part, stop=None):
+        """차단기를 거쳐 받기 → ({종목: 프레임}, 차단기가 열렸는지)"""
+        self.breaker.wait(stop)
+        got = _get(fetch, part)
+        miss = [t for t in part if got.get(t) is None]
+        if not self.breaker.record(len(part) - len(miss), len(miss)):
+            return got, False
+        self.breaker.wait(stop)                 # 쉬고 나서 실패한 종목만 한 번 더
+        if stop is None or not stop.is_set():
+            again = _get(fetch, miss)
+            got.update((t, f) for t, f in again.items() if f is not None)
+            self.breaker.record(sum(f is not None for f in again.values()),
+                                sum(f is None for f in again.values()))
+        return got, True
+
+    def note(self, frames, systemic=False, now=None):
+        """받은 결과 반영 → {종목: 이유} (이번에 불량으로 기록한 것)"""
+        if self.store is None: return {}
+        now = now or time.time()
+        if systemic:        # 차단기가 열리기 전 배치에서 기록한 실패도 종목 탓이 아님 → 되돌림
+            undo = [t for t, r in self.marked.items() if r != "short"]
+            if undo:
+                self.store.clear_bad(undo)
+                for t in undo: del self.marked[t]
+        bad = {}
+        for t, f in frames.items():
+            if f is None:
+                r = self.reason(t) if self.reason else None
+                if not systemic and r in WAIT: bad[t] = (r, 0)
+            elif len(f) < MIN_BARS:
+                bad[t] = ("short", len(f))
+        prev = self.store.get_bad(bad) if bad else {}
+        rec = {}
+        for t, (r, n) in bad.items():
+            cnt = prev[t][1] + 1 if t in prev and prev[t][0] == r else 1
+            rec[t] = (r, cnt, now, expiry(r, cnt, now, n))
+        if rec: self.store.put_bad(rec)
+        ok = [t for t, f in frames.items() if f is not None and t not in bad and t in self.known]
+        if ok:
+            self.store.clear_bad(ok); self.known -= set(ok)
+        self.known |= set(rec)
+        out = {t: r[0] for t, r in rec.items()}
+        self.marked.update(out)
+        return out
+
+
+def _get(fetch, part):
+    try:    return dict(fetch(part))
+    except Exception: return {}
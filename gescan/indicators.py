@@ -0,0 +1,33 @@
+"""
+지표 계산 (종목 단위 Series)
+"""
+
+import numpy as np
+import pandas as pd
+
+from gescan.rolling import rolling_mad
+
+
+def calc_rsi(s: pd.Series, p=14) -> pd.Series:
+    d = s.diff()
+    g = d.clip(lower=0);  l = -d.clip(upper=0)
+    ag = g.ewm(com=p-1, min_periods=p).mean()
+    al = l.ewm(com=p-1, min_periods=p).mean()
+    return 100 - 100/(1 + ag/al.replace(0, np.nan))
+
+def calc_cci(hi, lo, cl, p=20) -> pd.Series:
+    tp  = (hi+lo+cl)/3
+    ma  = tp.rolling(p).mean()
+    mad = rolling_mad(tp, p)
+    return (tp-ma)/(0.015*mad.replace(0,np.nan))
+
+def calc_bb(s: pd.Series, p=20, k=2.0):
+    ma = s.rolling(p).mean()
+    sd = s.rolling(p).std()
+    return ma+k*sd, ma-k*sd, (2*k*sd/ma*100)
+
+def bb_squeeze(bw: pd.Series):
+    cur = bw.iloc[-1]; r = bw.iloc[-20:]
+    if cur <= r.quantile(0.20): return "⚡수축", True
+    if cur >= r.quantile(0.80): return "💥팽창", False
+    return "➖보통", False
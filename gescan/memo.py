@@ -0,0 +1,87 @@
+"""
+종목별 결과 메모 (프로세스 전역 · 메모리)
+같은 프로세스의 모든 세션 · 재실행이 공유한다 — 같은 지수를 다시 고르거나 max_n 을 늘리거나
+다른 브라우저 탭에서 스캔해도, 방금 계산한 종목은 받지도 계산하지도 않는다.
+
+키     : (종목, 설정 지문) — 설정은 공급자 · 배열 dtype · 상위 시간대 (memo_key)
+유효   : gescan.store.is_fresh 와 같은 규칙 — 장중 intraday_ttl 이내, 마감 후엔 마감 + settle 이후 계산분
+         (새 봉이 생길 수 없는 동안은 다시 계산할 이유가 없음)
+크기   : maxsize 종목 수를 넘으면 가장 오래 안 쓴 것부터 버림 (LRU)
+마지막 봉 날짜를 함께 두고, 더 오래된 봉으로 계산한 결과가 새 결과를 덮어쓰지 않게 한다.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+from gescan.store import is_fresh
+
+
+def memo_key(provider=None, dtype=None, tfs=(), mode=None):
+    """설정 지문 — 결과가 달라지는 설정만 (panel/online/ticker 는 같은 결과, tail 은 근사)"""
+    src = getattr(provider, "root", None) or getattr(provider, "name", None) or "yahoo"
+    if getattr(provider, "asof", None) is not None: src += f"@{provider.asof.date()}"
+    key = f"{src}|{pd.api.types.pandas_dtype(dtype or float).name}|{''.join(tfs)}"
+    return key + "|tail" if mode == "tail" else key
+
+
+class ResultMemo:
+    """(종목, 설정) → (계산 시각, 마지막 봉 날짜, Result) — 스레드 안전 LRU"""
+
+    def __init__(self, maxsize=20000, intraday_ttl=900, settle=1800):
+        self.maxsize = maxsize
+        self.ttl = dict(intraday_ttl=intraday_ttl, settle=settle)
+        self._d = OrderedDict(); self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self._d)
+
+    def get(self, tickers, key, now=None):
+        """{종목: Result} — 유효한 것만 (만료된 항목은 지움)"""
+        now = now or time.time(); out = {}
+        with self._lock:
+            for t in tickers:
+                e = self._d.get((t, key))
+                if e is None: continue
+                if not is_fresh(t, e[0], now, **self.ttl):
+                    del self._d[(t, key)]; continue
+                self._d.move_to_end((t, key)); out[t] = e[2]
+            self.hits += len(out); self.misses += len(tickers) - len(out)
+        return out
+
+    def put(self, rows, key, bars, now=None):
+        """rows: {종목: Result} · bars: {종목: 마지막 봉 날짜} (결과 없음은 넣지 않음)"""
+        now = now or time.time()
+        with self._lock:
+            for t, r in rows.items():
+                if r is None: continue
+                b = bars.get(t); old = self._d.get((t, key))
+                if old is not None and b is not None and old[1] is not None and old[1] > b:
+                    continue
+                self._d[(t, key)] = (now, b, r); self._d.move_to_end((t, key))
+            while len(self._d) > self.maxsize:
+                self._d.popitem(last=False)
+
+    def drop(self, tickers):
+        """종목 항목 삭제 (모든 설정) — 캐시 재구축 때"""
+        ts = set(tickers)
+        with self._lock:
+            for k in [k for k in self._d if k[0] in ts]: del self._d[k]
+
+    def scope(self, key):
+        """설정 하나에 묶인 보기 — run_pipeline(memo=...) 인자"""
+        return MemoScope(self, key)
+
+
+class MemoScope:
+    def __init__(self, memo, key):
+        self.memo, self.key = memo, key
+
+    def get(self, tickers):
+        return self.memo.get(tickers, self.key)
+
+    def put(self, rows, bars):
+        self.memo.put(rows, self.key, bars)
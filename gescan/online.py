@@ -0,0 +1,259 @@
+"""
+증분(온라인) 지표 상태
+새 봉 하나가 들어오면 전체 이력을 다시 계산하지 않고 누산기 · 링 버퍼만 갱신한다.
+
+상태 구성
+  EMA12/26/9 누산기, RSI Wilder 평균(adjust=True 가중합), 5~60봉 창 링 버퍼,
+  shift(26) 용 선행스팬 버퍼, summarize 가 읽는 마지막 20개 유효 지표 행
+초기 상태는 패널 엔진으로 한 번에 계산하고, 이후 봉마다 update() 한다.
+봉당 비용은 이력 길이와 무관하고 창 크기(최대 60)에만 비례한다.
+"""
+
+import json
+import math
+from collections import deque
+from itertools import islice
+
+import numpy as np
+import pandas as pd
+
+from gescan.panel import KEYS, NEED, build_panel, panel_indicators
+
+MIN_BARS = 80
+TAIL = 20
+_A_RSI = 1/14                       # ewm(com=13)
+_A12, _A26, _A9 = 2/13, 2/27, 2/10  # ewm(span=…)
+NAN = float('nan')
+
+
+# 창이 작아(≤60) numpy 변환보다 순수 파이썬 연산이 빠르다
+def _last(buf, p):
+    """링 버퍼의 마지막 p 개 (부족하면 None)"""
+    n = len(buf)
+    return None if n < p else list(islice(buf, n-p, None))
+
+def _mean(buf, p):
+    a = _last(buf, p)
+    return NAN if a is None else sum(a)/p
+
+def _hasnan(a):
+    return any(x != x for x in a)
+
+def _nz(v):
+    return NAN if v == 0 else v
+
+
+class IndicatorState:
+    """종목 하나의 지표 상태"""
+
+    def __init__(self):
+        self.n = 0; self.last_date = None; self.prev_c = NAN
+        self.e12 = self.e26 = self.e9 = NAN
+        self.ag = self.al = NAN; self.den = 0.0; self.cnt = 0
+        self.c  = deque(maxlen=60); self.h  = deque(maxlen=52)
+        self.l  = deque(maxlen=52); self.v  = deque(maxlen=20)
+        self.tp = deque(maxlen=20)
+        self.sa0 = deque(maxlen=27); self.sb0 = deque(maxlen=27)
+        self.rows = deque(maxlen=TAIL); self.dates = deque(maxlen=TAIL)
+
+    # ── 한 봉 갱신 ──────────────────────────────
+    def update(self, date, h, l, c, v):
+        if c != c: return                     # analyze_frame 의 dropna(subset=['C'])
+        self.n += 1; self.last_date = date
+        self.c.append(c); self.h.append(h); self.l.append(l); self.v.append(v)
+        self.tp.append((h+l+c)/3)
+        r = {'H': h, 'L': l, 'C': c, 'V': v}
+
+        # 이동평균
+        for p in (5, 20, 60):
+            r[f'ma{p}'] = _mean(self.c, p)
+
+        # 일목균형표
+        def mid(p):
+            hh, ll = _last(self.h, p), _last(self.l, p)
+            if hh is None or _hasnan(hh) or _hasnan(ll): return NAN
+            return (max(hh) + min(ll)) / 2
+        tk, kj, sb = mid(9), mid(26), mid(52)
+        self.sa0.append((tk+kj)/2); self.sb0.append(sb)
+        full = len(self.sa0) == self.sa0.maxlen
+        r['sa'] = self.sa0[0] if full else NAN
+        r['sb'] = self.sb0[0] if full else NAN
+
+        # MACD (adjust=False — 첫 값으로 시작)
+        if self.e12 != self.e12:
+            self.e12 = self.e26 = c; self.e9 = 0.0
+        else:
+            self.e12 += _A12*(c - self.e12); self.e26 += _A26*(c - self.e26)
+            self.e9  += _A9*((self.e12 - self.e26) - self.e9)
+        r['mh'] = (self.e12 - self.e26) - self.e9
+
+        # RSI (adjust=True 가중평균, min_periods=14)
+        d = c - self.prev_c; self.prev_c = c
+        if d == d:
+            g, lo = max(d, 0.0), max(-d, 0.0)
+            w = (1-_A_RSI)*self.den; self.den = w + 1; self.cnt += 1
+            self.ag = g if self.cnt == 1 else (w*self.ag + g)/self.den
+            self.al = lo if self.cnt == 1 else (w*self.al + lo)/self.den
+        r['RSI'] = (100 - 100/(1 + self.ag/_nz(self.al))
+                    if self.cnt >= 14 else NAN)
+
+        # CCI
+        tp = _last(self.tp, 20)
+        if tp is None: r['CCI'] = NAN
+        else:
+            m = sum(tp)/20; mad = sum(abs(x - m) for x in tp)/20
+            r['CCI'] = (tp[-1] - m)/(0.015*_nz(mad))
+
+        # BB
+        cc = _last(self.c, 20)
+        if cc is None: r['bbu'] = r['bbl'] = r['bbw'] = NAN
+        else:
+            bm = sum(cc)/20; sd = math.sqrt(sum((x - bm)**2 for x in cc)/19)
+            r['bbu'], r['bbl'], r['bbw'] = bm+2*sd, bm-2*sd, 4*sd/bm*100
+
+        # 거래량 비율
+        r['vr'] = v / _mean(self.v, 20)
+
+        if not any(math.isnan(r[k]) for k in NEED):
+            self.rows.append([r[k] for k in KEYS]); self.dates.append(date)
+
+    def extend(self, dates, H, L, C, V):
+        """날짜('YYYY-MM-DD') · H/L/C/V 시퀀스의 봉을 차례로 반영"""
+        for a in zip(dates, H, L, C, V):
+            self.update(*a)
+        return self
+
+    # ── 결과 ────────────────────────────────────
+    def tail(self):
+        """summarize 에 넘길 결측 제거된 마지막 지표 행 (봉 수 부족 시 빈 프레임)"""
+        if self.n < MIN_BARS:
+            return pd.DataFrame(columns=KEYS)
+        return pd.DataFrame(np.array(self.rows, dtype=float).reshape(-1, len(KEYS)),
+                            columns=KEYS,
+                            index=pd.DatetimeIndex(np.array(self.dates, 'datetime64[D]')))
+
+    # ── 직렬화 ──────────────────────────────────
+    # 머리(JSON: 정수 · 날짜 · 버퍼 길이) + float64 본문 — float 를 JSON 으로 쓰면 느림
+    _INTS   = ['n','last_date','cnt']
+    _FLOATS = ['prev_c','e12','e26','e9','ag','al','den']
+    _BUFS   = ['c','h','l','v','tp','sa0','sb0']
+
+    def dumps(self):
+        head = {k: getattr(self, k) for k in self._INTS}
+        head['dates'] = list(self.dates)
+        head['lens']  = [len(getattr(self, k)) for k in self._BUFS]
+        vals = [getattr(self, k) for k in self._FLOATS]
+        for k in self._BUFS: vals.extend(getattr(self, k))
+        for r in self.rows:  vals.extend(r)
+        hb = json.dumps(head).encode()
+        return len(hb).to_bytes(4, 'little') + hb + np.array(vals, float).tobytes()
+
+    @classmethod
+    def loads(cls, b):
+        k = int.from_bytes(b[:4], 'little')
+        head = json.loads(b[4:4+k]); vals = np.frombuffer(b[4+k:], float).tolist()
+        s = cls()
+        for f in cls._INTS: setattr(s, f, head[f])
+        i = len(cls._FLOATS)
+        for f, v in zip(cls._FLOATS, vals): setattr(s, f, v)
+        for f, n in zip(cls._BUFS, head['lens']):
+            getattr(s, f).extend(vals[i:i+n]); i += n
+        w = len(KEYS)
+        s.rows.extend(vals[j:j+w] for j in range(i, len(vals), w))
+        s.dates.extend(head['dates'])
+        return s
+
+    def copy(self):
+        s = IndicatorState()
+        for k in self._INTS + self._FLOATS: setattr(s, k, getattr(self, k))
+        for k in self._BUFS + ['rows','dates']:
+            getattr(s, k).extend(getattr(self, k))
+        return s
+
+
+# ─────────────────────────────────────────────
+# 초기 상태 (패널 엔진으로 한 번에)
+# ─────────────────────────────────────────────
+
+def _ewm_last(a, **kw):
+    return pd.DataFrame(a, copy=False).ewm(**kw).mean().to_numpy()[-1]
+
+def states_from_frames(frames):
+    """{종목: OHLCV} → {종목: IndicatorState} — 전체 이력을 벡터화로 계산해 상태만 추출"""
+    names, idxs, P = build_panel(frames, min_bars=1)
+    if not names: return {}
+    X = panel_indicators(P)
+    C = P['C']; n = len(C)
+    e12 = _ewm_last(C, span=12, adjust=False)
+    e26 = _ewm_last(C, span=26, adjust=False)
+    macd = (pd.DataFrame(C).ewm(span=12, adjust=False).mean()
+            - pd.DataFrame(C).ewm(span=26, adjust=False).mean())
+    e9 = macd.ewm(span=9, adjust=False).mean().to_numpy()[-1]
+    d = np.diff(C, axis=0, prepend=np.nan)
+    ag = _ewm_last(np.clip(d, 0, None), com=13)
+    al = _ewm_last(-np.clip(d, None, 0), com=13)
+    tp = (P['H']+P['L']+C)/3
+    valid = np.logical_and.reduce([~np.isnan(X[k]) for k in NEED])
+
+    out = {}
+    for j, (t, ix) in enumerate(zip(names, idxs)):
+        s = IndicatorState(); L = len(ix)
+        s.n = L; s.last_date = ix[-1].strftime("%Y-%m-%d"); s.prev_c = float(C[-1, j])
+        s.e12, s.e26, s.e9 = float(e12[j]), float(e26[j]), float(e9[j])
+        s.cnt = L - 1; s.den = (1 - (1-_A_RSI)**s.cnt)/_A_RSI
+        s.ag, s.al = float(ag[j]), float(al[j])
+        for buf, a in ((s.c, C), (s.h, P['H']), (s.l, P['L']), (s.v, P['V']),
+                       (s.tp, tp), (s.sa0, X['sa0']), (s.sb0, X['sb0'])):
+            buf.extend(a[max(n-L, n-buf.maxlen):, j].tolist())
+        rows = np.flatnonzero(valid[:, j])[-TAIL:]
+        s.rows.extend(np.column_stack([X[k][rows, j] for k in KEYS]).tolist())
+        s.dates.extend(ix[rows - (n-L)].strftime("%Y-%m-%d").tolist())
+        out[t] = s
+    return out
+
+
+# ─────────────────────────────────────────────
+# 저장소 연동
+# ─────────────────────────────────────────────
+
+def _arrays(f):
+    """OHLCV 프레임 → (날짜 문자열, H, L, C, V) — 종가 결측 행 제거"""
+    ix = f.index
+    H, L, C, V = (f[k].to_numpy(dtype=float) for k in ('High','Low','Close','Volume'))
+    ok = ~np.isnan(C)
+    if not ok.all():
+        ix, H, L, C, V = ix[ok], H[ok], L[ok], C[ok], V[ok]
+    return ix.to_numpy().astype('datetime64[D]').astype(str), H, L, C, V
+
+def online_tails(frames, store):
+    """
+    {종목: OHLCV} → {종목: summarize 용 꼬리 프레임}
+    저장된 상태를 마지막 봉 직전까지 따라잡아 저장하고(마지막 봉은 장중 수정될 수 있음),
+    복사본에 마지막 봉을 더해 결과를 만든다. 상태가 이력과 어긋나면 새로 만든다.
+    """
+    arrs = {}
+    for t, f in frames.items():
+        if f is None or not len(f): continue
+        a = _arrays(f)
+        if len(a[0]): arrs[t] = a
+    saved = store.get_states(list(arrs))
+    states, redo = {}, {}
+    for t, (ds, *hlcv) in arrs.items():
+        s = IndicatorState.loads(saved[t]) if t in saved else None
+        k = len(ds) - 1                               # 마지막 봉 제외
+        i = np.searchsorted(ds[:k], s.last_date) if s and s.last_date else k
+        if i >= k or ds[i] != s.last_date:
+            if k: redo[t] = frames[t]
+            continue
+        states[t] = s.extend(
+            ds[i+1:k], *(x[i+1:k].tolist() for x in hlcv))
+    if redo:
+        states.update(states_from_frames(
+            {t: f[f.index < pd.Timestamp(str(arrs[t][0][-1]))] for t, f in redo.items()}))
+    store.put_states({t: (s.last_date, s.dumps()) for t, s in states.items()})
+
+    out = {}
+    for t, s in states.items():
+        ds, *hlcv = arrs[t]
+        out[t] = s.copy().extend(ds[-1:], *(x[-1:].tolist() for x in hlcv)).tail()
+    return out
@@ -0,0 +1,236 @@
+"""
+패널(날짜 × 종목) 지표 엔진
+종목별 일봉을 2-D 배열로 정렬해 지표를 유니버스 전체에 대해 한 번씩 계산한다.
+
+정렬 방식
+  종목마다 상장일·결측일이 달라 날짜 합집합으로 맞추면 롤링 창에 구멍이 생긴다.
+  그래서 각 종목의 봉을 "최신 봉 기준 오른쪽 정렬" 하고 앞쪽을 NaN 으로 채운다.
+  롤링 · EWM · shift 는 모두 종목 자신의 봉 순서만 보므로 종목별 계산과 같은 값이 나온다.
+
+저장 형식
+  dtype=np.float32 이면 OHLCV 와 모든 파생 지표 배열을 float32 로 보관한다 (메모리 절반).
+  계산 중간값은 pandas 롤링 · EWM 이 float64 로 처리하므로 오차는 저장 반올림 수준 (F32_RTOL).
+  save_panel / load_panel 은 OHLCV 패널을 연속 .npy 파일로 두고 memmap 으로 연다 —
+  여러 계산 프로세스가 같은 페이지를 복사 없이 공유한다.
+
+꼬리 전용 창 (tail 방식)
+  신호는 마지막 몇 행만 쓰므로 최근 tail_bars() 봉만 받고 계산한다.
+  유한 창 지표(MA · 일목 · CCI · BB · 거래량)는 ICH_SPAN + keep 봉이면 전체 이력과 값이 같고,
+  EWM(MACD · RSI)은 창 앞쪽 이력의 영향이 (1-α)^k 로 줄어든다 — 가장 느린 것은 RSI(α=1/14).
+  마지막 5행의 EWM 지표가 전체 이력 계산과 TAIL_TOL(F32_SCALE 척도) 이내가 되는 봉 수를 쓴다.
+"""
+
+import json
+import math
+import os
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from gescan.rolling import rolling_mad
+
+NEED = ['sa','sb','RSI','CCI','bbw','mh']   # 신호 계산에 필요한 지표 (결측 제거 기준)
+KEYS = ['H','L','C','V','ma5','ma20','ma60','sa','sb','mh',
+        'RSI','CCI','bbu','bbl','bbw','vr']
+# float32 패널 허용 오차 — |x64 - x32| ≤ F32_RTOL · max(|x64|, 척도)
+# 척도: RSI · CCI 는 100 (0 근처에서 상대 오차가 무의미), MACD 히스토그램은 종가, 나머지는 0
+F32_RTOL = 5e-5
+F32_SCALE = {'RSI': 100.0, 'CCI': 100.0}
+ICH_SPAN  = 52 + 26 - 1    # 선행스팬 B 첫 값까지 필요한 봉 수
+EWM_ALPHA = 1/14           # 가장 느리게 수렴하는 EWM (RSI com=13)
+TAIL_TOL  = 1e-4           # tail 방식 허용 오차 (마지막 5행, 전체 이력 계산 대비)
+
+
+def prep(raw):
+    """analyze_frame 과 같은 전처리 → H/L/C/V 프레임"""
+    raw = raw.copy()
+    if isinstance(raw.columns, pd.MultiIndex):
+        raw.columns = raw.columns.get_level_values(0)
+    raw.columns = [str(c).strip() for c in raw.columns]
+    df = raw[['High','Low','Close','Volume']]
+    df.columns = ['H','L','C','V']
+    return df.dropna(subset=['C']).sort_index()
+
+
+def build_panel(frames, min_bars=80, dtype=np.float64):
+    """{종목: OHLCV} → (종목 목록, 종목별 날짜 인덱스, {H,L,C,V: (n × m) 배열})"""
+    names, dfs = [], []
+    for t, raw in frames.items():
+        if raw is None or len(raw) < min_bars: continue
+        names.append(t); dfs.append(prep(raw))
+    n = max((len(d) for d in dfs), default=0); m = len(dfs)
+    A = np.full((4, n, m), np.nan, dtype=dtype)      # H · L · C · V 연속 블록
+    for j, d in enumerate(dfs):
+        A[:, n-len(d):, j] = d[['H','L','C','V']].to_numpy(dtype=dtype).T
+    return names, [d.index for d in dfs], dict(zip(['H','L','C','V'], A))
+
+
+# ─────────────────────────────────────────────
+# 2-D 지표 (열 = 종목)
+# ─────────────────────────────────────────────
+
+def _roll(a, p):
+    return pd.DataFrame(a, copy=False).rolling(p)
+
+def _ewm(a, **kw):
+    return pd.DataFrame(a, copy=False).ewm(**kw).mean().to_numpy()
+
+def _nz(a):
+    return np.where(a == 0, np.nan, a)
+
+def panel_indicators(P):
+    """analyze_frame 과 같은 지표를 패널 전체에 대해 계산 (결과는 P 와 같은 dtype)"""
+    H, L, C, V = P['H'], P['L'], P['C'], P['V']
+    X = dict(P)
+    if C.dtype != np.float64:
+        X = _Cast(X, C.dtype)
+
+    # 이동평균
+    for p in (5, 20, 60):
+        X[f'ma{p}'] = _roll(C, p).mean().to_numpy()
+
+    # 일목균형표
+    def mid(p):
+        return (_roll(H, p).max().to_numpy() + _roll(L, p).min().to_numpy()) / 2
+    tk, kj, sb = mid(9), mid(26), mid(52)
+    X['sa0'], X['sb0'] = (tk+kj)/2, sb          # 선행스팬 (shift 전)
+    X['sa'] = _shift(X['sa0'], 26)
+    X['sb'] = _shift(X['sb0'], 26)
+
+    # MACD
+    macd = _ewm(C, span=12, adjust=False) - _ewm(C, span=26, adjust=False)
+    X['mh'] = macd - _ewm(macd, span=9, adjust=False)
+
+    # RSI
+    d = np.diff(C, axis=0, prepend=np.nan)
+    ag = _ewm(np.clip(d, 0, None), com=13, min_periods=14)
+    al = _ewm(-np.clip(d, None, 0), com=13, min_periods=14)
+    X['RSI'] = 100 - 100/(1 + ag/_nz(al))
+
+    # CCI
+    tp = (H+L+C)/3
+    ma = _roll(tp, 20).mean().to_numpy()
+    X['CCI'] = (tp-ma)/(0.015*_nz(rolling_mad(tp, 20)))
+
+    # BB
+    r = _roll(C, 20); bm = r.mean().to_numpy(); sd = r.std().to_numpy()
+    X['bbu'], X['bbl'], X['bbw'] = bm+2*sd, bm-2*sd, 4*sd/bm*100
+
+    # 거래량 비율
+    X['vr'] = V / _roll(V, 20).mean().to_numpy()
+    return dict(X)
+
+class _Cast(dict):
+    """넣는 배열을 dtype 으로 바꿔 보관 (float32 패널의 파생 지표)"""
+    def __init__(self, d, dtype):
+        super().__init__(d); self.dtype = dtype
+    def __setitem__(self, k, v):
+        super().__setitem__(k, np.asarray(v).astype(self.dtype, copy=False))
+
+def _shift(a, k):
+    out = np.full_like(a, np.nan)
+    out[k:] = a[:-k]
+    return out
+
+
+# ─────────────────────────────────────────────
+# 종목별 꼬리 프레임
+# ─────────────────────────────────────────────
+
+def panel_tails(frames, keep=20, min_bars=80, dtype=np.float64):
+    """
+    {종목: OHLCV} → {종목: 결측 제거된 마지막 keep 개 지표 행}
+    summarize 가 쓰는 last~p4 와 BB 폭 20봉 창만 잘라 돌려준다.
+    """
+    return tails_of(*build_panel(frames, min_bars, dtype), keep)
+
+def tail_error(a, b, last=None):
+    """
+    꼬리 프레임 두 벌의 지표별 최대 오차 (F32_RTOL · TAIL_TOL 과 비교할 값)
+    last 를 주면 마지막 last 행만 비교
+    """
+    err = dict.fromkeys(KEYS, 0.0)
+    for t in a.keys() & b.keys():
+        x, y = a[t], b[t].astype(float)
+        if last: x, y = x.iloc[-last:], y.iloc[-last:]
+        for k in KEYS:
+            s = x['C'].abs() if k == 'mh' else F32_SCALE.get(k, 0.0)
+            e = ((x[k] - y[k]).abs() / np.maximum(x[k].abs(), s)).max()
+            if e == e: err[k] = max(err[k], float(e))
+    return err
+
+def tails_of(names, idxs, P, keep=20):
+    """build_panel / load_panel 결과 → panel_tails 와 같은 꼬리 프레임"""
+    if not names: return {}
+    X = panel_indicators(P)
+    n = len(P['C'])
+    valid = np.logical_and.reduce([~np.isnan(X[k]) for k in NEED])
+    out = {}
+    for j, (t, ix) in enumerate(zip(names, idxs)):
+        rows = np.flatnonzero(valid[:, j])[-keep:]
+        out[t] = pd.DataFrame({k: X[k][rows, j] for k in KEYS},
+                              index=ix[rows - (n-len(ix))])
+    return out
+
+
+# ─────────────────────────────────────────────
+# 꼬리 전용 창
+# ─────────────────────────────────────────────
+
+def tail_bars(tol=TAIL_TOL, keep=20):
+    """tail 방식이 받고 계산하는 봉 수 — 유한 창 (ICH_SPAN + keep) · EWM 수렴 (마지막 5행) 중 큰 값"""
+    warm = math.ceil(math.log(tol) / math.log(1 - EWM_ALPHA)) + 5
+    return max(ICH_SPAN + keep, warm)
+
+TAIL_BARS = tail_bars()
+
+def tail_period(bars=TAIL_BARS):
+    """봉 수 → 받을 기간 ('196d' 형식, 주말 · 공휴일 여유 포함)"""
+    return f"{math.ceil(bars * 7 / 5) + 14}d"
+
+def trim_tail(frames, bars=TAIL_BARS):
+    """{종목: OHLCV} → 마지막 bars 봉만"""
+    return {t: (f.iloc[-bars:] if f is not None else None) for t, f in frames.items()}
+
+
+# ─────────────────────────────────────────────
+# memmap 패널 파일 (프로세스 간 공유)
+# ─────────────────────────────────────────────
+
+class PanelRef(NamedTuple):
+    """계산 프로세스에 넘기는 패널 파일 참조 — 프레임 대신 경로만 직렬화된다"""
+    path: str
+    tickers: tuple
+
+
+def save_panel(path, names, idxs, P, dtype=np.float32):
+    """
+    build_panel 결과 → path/ohlcv.npy (4 × n × m, 연속) · dates.npy (날짜, 종목 순으로 이어 붙임)
+    · meta.json (종목 · 이력 길이)
+    """
+    os.makedirs(path, exist_ok=True)
+    A = np.lib.format.open_memmap(os.path.join(path, "ohlcv.npy"), mode="w+", dtype=dtype,
+                                  shape=(4,) + P['C'].shape)
+    for i, k in enumerate(['H','L','C','V']): A[i] = P[k]
+    A.flush(); del A
+    d = np.concatenate([ix.to_numpy().astype('datetime64[D]') for ix in idxs]) \
+        if idxs else np.array([], dtype='datetime64[D]')
+    np.save(os.path.join(path, "dates.npy"), d.astype(np.int32))
+    with open(os.path.join(path, "meta.json"), "w") as f:
+        json.dump({"names": list(names), "lens": [len(ix) for ix in idxs]}, f)
+    return path
+
+def load_panel(path):
+    """save_panel 파일 → build_panel 과 같은 (종목, 날짜 인덱스, {H,L,C,V}) — 배열은 읽기 전용 memmap"""
+    with open(os.path.join(path, "meta.json")) as f: meta = json.load(f)
+    A = np.load(os.path.join(path, "ohlcv.npy"), mmap_mode="r")
+    d = np.load(os.path.join(path, "dates.npy")).astype('datetime64[D]')
+    cut = np.cumsum([0] + meta["lens"])
+    idxs = [pd.DatetimeIndex(d[a:b].astype('datetime64[ns]'), name="Date")
+            for a, b in zip(cut[:-1], cut[1:])]
+    return meta["names"], idxs, dict(zip(['H','L','C','V'], A))
+
+def mapped_tails(ref, keep=20):
+    """PanelRef → panel_tails 와 같은 꼬리 프레임 (OHLCV 는 memmap 에서 바로 읽음)"""
+    return tails_of(*load_panel(ref.path), keep)
@@ -0,0 +1,229 @@
+"""
+2단계 스캔 파이프라인
+I/O 스레드 풀(다운로드 · 캐시) → 제한 큐 → 계산 프로세스 풀(지표 · 신호)
+
+GIL 때문에 같은 스레드 풀에서 다운로드와 pandas 계산을 섞으면 작업자를 늘려도
+경합만 늘어난다. 두 단계를 나누고 각자 동시성을 따로 정한다.
+  - io_workers  : 청크 다운로드/캐시 작업 동시 실행 수
+  - cpu_workers : 계산 프로세스 수 (0 이면 호출 스레드에서 배치 단위로 계산)
+큐가 가득 차면 다운로드가 기다리므로(backpressure) 메모리가 일정하게 유지된다.
+mode="tail" 이면 받은 프레임을 최근 gescan.panel.TAIL_BARS 봉으로 잘라 계산 단계로 넘긴다.
+mmap=True(panel · tail 방식 · 프로세스 풀)면 배치를 float32 memmap 패널 파일로 써서 경로만 넘긴다 —
+작업자는 프레임을 역직렬화해 복사하지 않고 같은 페이지를 공유해 읽는다 (gescan.panel.save_panel).
+tfs(상위 시간대)를 주면 같은 일봉 배치를 주봉 · 월봉으로 묶어 신호를 더한다 (memmap 은 쓰지 않음).
+reuse=True 면 마지막 봉이 직전 스캔과 같은 종목은 계산 단계로 보내지 않고 직전 결과를 쓴다 (gescan.diff).
+memo(gescan.memo.MemoScope) 를 넘기면 유효한 메모 결과가 있는 종목은 받지도 계산하지도 않는다.
+health(gescan.health.FetchHealth) 를 넘기면 음성 캐시의 불량 종목은 요청하지 않고, 요청은 차단기를 거친다.
+trace(gescan.trace.Trace) 를 넘기면 다운로드 · 계산 단계 시간, 빈 프레임 수, 대기열 깊이를 기록한다.
+계산 작업자가 죽으면(메모리 부족 등) 풀을 새로 만들어 그 배치를 한 번 더 계산하고,
+또 실패하면 결과 없음으로 내보낸다 — 계산 실패는 trace 오류로 남는다.
+"""
+
+import multiprocessing as mp
+import os
+import queue
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import (FIRST_COMPLETED, ProcessPoolExecutor,
+                                ThreadPoolExecutor, wait)
+from concurrent.futures.process import BrokenProcessPool
+
+from gescan.analysis import analyze_many
+from gescan.diff import save_rows, split_unchanged
+from gescan.fetch import chunked
+from gescan.panel import PanelRef, build_panel, save_panel, trim_tail
+from gescan.trace import Trace
+
+
+def make_pool(cpu_workers):
+    """계산용 프로세스 풀 (ComputePool) — 0 이면 None"""
+    if cpu_workers <= 0: return None
+    return ComputePool(cpu_workers)
+
+
+class ComputePool:
+    """
+    계산 프로세스 풀 — 서버 스레드를 fork 하지 않도록 spawn 사용
+    작업자가 죽어 풀이 깨지면(BrokenProcessPool) rebuild() 로 같은 크기의 풀을 새로 만든다.
+    오래 두고 쓰는 풀(화면의 cache_resource)도 다음 스캔부터 정상으로 돌아온다.
+    """
+
+    def __init__(self, workers):
+        self.workers = workers; self.rebuilds = 0
+        self._lock = threading.Lock(); self.ex = self._new()
+
+    def _new(self):
+        return ProcessPoolExecutor(self.workers, mp_context=mp.get_context("spawn"))
+
+    def submit(self, fn, *args):
+        """→ (future, 제출한 실행기) — 깨진 풀이면 새로 만들어 제출"""
+        ex = self.ex
+        try: return ex.submit(fn, *args), ex
+        except BrokenProcessPool:
+            self.rebuild(ex); ex = self.ex
+            return ex.submit(fn, *args), ex
+
+    def rebuild(self, broken):
+        """broken 실행기를 새 풀로 교체 → 새로 만들었으면 True (다른 배치가 이미 바꿨으면 False)"""
+        with self._lock:
+            if self.ex is not broken: return False
+            broken.shutdown(wait=False, cancel_futures=True)
+            self.ex = self._new(); self.rebuilds += 1
+            return True
+
+    def shutdown(self, wait=False, cancel_futures=True):
+        self.ex.shutdown(wait=wait, cancel_futures=cancel_futures)
+
+
+def run_pipeline(tickers, meta, currency, fetch, io_workers=4, cpu_workers=0,
+                 batch=50, mode="panel", store=None, qsize=None, pool=None,
+                 trace=None, reuse=False, dtype=None, mmap=False, tfs=(), memo=None, health=None):
+    """
+    (배치 종목 목록, 결과 행 목록) 을 계산이 끝나는 순서대로 내보냄
+    fetch(part) → (종목, 프레임 | None) 이터러블 (iter_download / iter_cached)
+    pool(make_pool 결과)을 넘기면 재사용하고, 없으면 cpu_workers 로 만들어 끝날 때 닫는다.
+    reuse(store 필요) 면 바뀌지 않은 종목은 직전 결과 행으로 먼저 내보내고,
+    계산한 종목은 결과를 마지막 봉 지문과 함께 store 에 저장한다.
+    dtype : panel 방식 배열 dtype (np.float32 등) · mmap : 위 설명 (dtype 기본 float32)
+    memo  : 메모 적중 종목은 맨 먼저 내보내고, 계산 · 재사용한 결과는 메모에 넣는다
+    health: 불량 종목은 결과 없음(None)으로 먼저 내보내고, 받은 결과로 음성 캐시를 고친다
+    """
+    tickers = list(dict.fromkeys(tickers))
+    restamp = lambda got: [r._replace(name=meta[t]['name'], sector=meta[t].get('sector', ''),
+                                      currency=currency) for t, r in got.items()]
+    if memo is not None:
+        hit = memo.get(tickers)
+        if trace is not None: trace.count("메모 적중", len(hit))
+        if hit:
+            yield list(hit), restamp(hit)
+            tickers = [t for t in tickers if t not in hit]
+    if health is not None:
+        bad = health.skip(tickers)
+        if trace is not None: trace.count("불량 제외", len(bad))
+        if bad:
+            yield list(bad), [None]*len(bad)
+            tickers = [t for t in tickers if t not in bad]
+    parts = list(chunked(tickers, batch))
+    reuse = reuse and store is not None
+    if not parts: return
+    qsize = qsize or max(2, 2*max(cpu_workers, 1))
+    q = queue.Queue(maxsize=qsize); stop = threading.Event()
+
+    def io_job(part):
+        a = time.perf_counter()
+        if health is not None:
+            got, systemic = health.fetch(fetch, part, stop)
+        else:
+            try:    got, systemic = dict(fetch(part)), False
+            except Exception: got, systemic = {}, False
+        item = (part, {t: got.get(t) for t in part}, systemic)
+        if trace is not None:
+            trace.add("다운로드", time.perf_counter() - a, tuple(part), len(part))
+            trace.count("빈 프레임", sum(f is None for f in item[1].values()))
+        while not stop.is_set():
+            try: q.put(item, timeout=0.2); return
+            except queue.Full: continue
+
+    own = pool is None
+    if own: pool = make_pool(cpu_workers)
+    # memmap 패널에는 일봉 프레임이 없어 상위 시간대를 묶을 수 없음
+    tmp = (_shm_dir() if mmap and mode in ("panel", "tail") and pool is not None and not tfs
+           else None)
+    seq = 0; mdt = dtype or 'float32'
+    io = ThreadPoolExecutor(max(1, io_workers), thread_name_prefix="gescan-io")
+    try:
+        for part in parts: io.submit(io_job, part)
+        left = len(parts); pending = {}
+        while left or pending:
+            # 큐 → 계산 단계 (진행 중 작업 수 제한)
+            while left and (pool is None or len(pending) < qsize):
+                if trace is not None: trace.depth.append(q.qsize())
+                try: part, frames, systemic = q.get(timeout=0.05 if pending else None)
+                except queue.Empty: break
+                left -= 1
+                if health is not None:
+                    noted = health.note(frames, systemic)
+                    if trace is not None:
+                        trace.count("불량 기록", len(noted))
+                        if systemic: trace.count("차단기", 1)
+                stamps = None
+                bars = {t: f.index[-1] for t, f in frames.items()
+                        if memo is not None and f is not None and len(f)}
+                if reuse:
+                    kept, frames, stamps = split_unchanged(frames, store, "".join(tfs))
+                    if trace is not None: trace.count("재사용", len(kept))
+                    if kept:
+                        if memo is not None: memo.put(kept, bars)
+                        yield list(kept), restamp(kept)
+                    if not frames: continue
+                    part = list(frames)
+                if mode == "tail" and not tfs: frames = trim_tail(frames)   # 시간대는 전체 일봉 필요
+                sub = {t: meta[t] for t in part}
+                if tmp is not None:
+                    seq += 1
+                    frames = PanelRef(save_panel(os.path.join(tmp, str(seq)),
+                                                 *build_panel(frames, dtype=mdt), dtype=mdt),
+                                      tuple(part))
+                args = (frames, sub, currency, mode, store, trace is not None, dtype, tuple(tfs))
+                if pool is None:
+                    rows = _done(_safe(*args), trace)
+                    if stamps: save_rows(store, part, rows, stamps)
+                    if memo is not None: memo.put(dict(zip(part, rows)), bars)
+                    yield part, rows
+                else:
+                    fut, ex = pool.submit(_safe, *args)
+                    pending[fut] = part, stamps, frames, bars, args, ex, 0
+            if not pending: continue
+            done, _ = wait(pending, timeout=0.05, return_when=FIRST_COMPLETED)
+            for f in done:
+                part, stamps, frames, bars, args, ex, tries = pending.pop(f)
+                try:    res = f.result()
+                except BrokenProcessPool as e:
+                    # 작업자가 죽음 → 풀을 새로 만들어 한 번 더 (두 번째도 실패하면 결과 없음)
+                    if pool.rebuild(ex) and trace is not None: trace.count("계산 풀 재시작")
+                    if not tries:
+                        fut, ex = pool.submit(_safe, *args)
+                        pending[fut] = part, stamps, frames, bars, args, ex, 1
+                        continue
+                    res = _failed(part, e, trace)
+                except Exception as e:
+                    res = _failed(part, e, trace)
+                if isinstance(frames, PanelRef): shutil.rmtree(frames.path, ignore_errors=True)
+                rows = _done(res, trace)
+                if stamps: save_rows(store, part, rows, stamps)
+                if memo is not None: memo.put(dict(zip(part, rows)), bars)
+                yield part, rows
+    finally:
+        stop.set()
+        if tmp is not None: shutil.rmtree(tmp, ignore_errors=True)
+        io.shutdown(wait=False, cancel_futures=True)
+        if own and pool is not None: pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _shm_dir():
+    """memmap 패널 임시 디렉터리 — /dev/shm 이 있으면 그 아래(디스크 쓰기 없음)"""
+    return tempfile.mkdtemp(prefix="gescan-panel-",
+                            dir="/dev/shm" if os.path.isdir("/dev/shm") else None)
+
+def _safe(frames, meta, currency, mode, store, traced=False, dtype=None, tfs=()):
+    """계산 작업 — (결과 행, 계측 기록 | None) · 프로세스 경계를 넘도록 기록은 state() 로 돌려줌"""
+    tr = Trace() if traced else None
+    try:    rows = analyze_many(frames, meta, currency, mode, store, tr, dtype, tfs)
+    except Exception as e:
+        n = len(frames.tickers) if isinstance(frames, PanelRef) else len(frames)
+        rows = [None]*n
+        if tr is not None: tr.fail(f"<{mode}>", e); tr.count("계산 실패", n)
+    return rows, tr and tr.state()
+
+def _failed(part, e, trace):
+    """계산 작업 자체가 실패한 배치 → 결과 없음 (trace 에 오류 · 종목 수)"""
+    if trace is not None:
+        trace.fail(f"<계산:{part[0]}…>", e); trace.count("계산 실패", len(part))
+    return [None]*len(part), None
+
+def _done(res, trace):
+    rows, st = res
+    if trace is not None and st is not None: trace.merge(st)
+    return rows
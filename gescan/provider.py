@@ -0,0 +1,161 @@
+"""
+시세 공급자 (OHLCV)
+지표 · 신호 코드는 공급자를 모른다 — 공급자는 종목 목록과 기간을 받아 {종목: OHLCV 프레임} 만 돌려준다.
+download() 형식은 fetch.download_chunk 와 같아서 iter_cached 의 download 인자로 그대로 쓸 수 있다.
+
+  YahooProvider : 기존 yf.download 배치 다운로드 (기본)
+  FileProvider  : 로컬 디렉터리의 종목별 파일 <종목>.parquet | <종목>.csv (memory_map 으로 읽음)
+                  부하 테스트 · 벤치마크 · 인터넷 없는 환경 · 다른 데이터 공급처 파일용
+
+  python -m gescan.provider export DIR                 # 로컬 캐시(BarStore) 일봉 → 파일
+  python -m gescan.provider synth DIR -n 3000 -P 5y    # 합성 데이터 (gescan.bench 와 같은 시드)
+"""
+
+import argparse
+import os
+import sys
+
+import pandas as pd
+
+from gescan.fetch import OHLCV, chunked, clean_frame, download_chunk
+from gescan.store import BarStore, period_start
+
+FILE_FORMATS = (".parquet", ".csv")
+
+
+class Provider:
+    """공급자 공통 형식 — remote=False 면 로컬 캐시(BarStore)를 거치지 않는다"""
+    name = ""
+    remote = True
+
+    def download(self, tickers, period="18mo", interval="1d", timeout=15, threads=True,
+                 start=None):
+        """{종목: OHLCV 프레임} — 없는 종목은 빠짐 (start 가 있으면 period 대신 사용)"""
+        raise NotImplementedError
+
+    def iter(self, tickers, chunk=50, period="18mo", interval="1d", start=None):
+        """(종목, 프레임 | None) 을 청크 순서대로 — iter_download 대체"""
+        for part in chunked(list(tickers), chunk):
+            got = self.download(part, period=period, interval=interval, start=start)
+            for t in part:
+                yield t, got.get(t)
+
+
+class YahooProvider(Provider):
+    name = "yahoo"
+
+    def download(self, tickers, period="18mo", interval="1d", timeout=15, threads=True,
+                 start=None):
+        return download_chunk(tickers, period, interval, timeout, threads, start)
+
+
+class FileProvider(Provider):
+    """
+    root/<종목>.parquet 또는 root/<종목>.csv (parquet 우선, pyarrow 필요)
+    날짜 인덱스(첫 열 또는 Date 열) + Open/High/Low/Close/Volume (대소문자 무관), 일봉만
+    asof : 이 날짜까지의 봉만 읽음 (없으면 파일 끝까지) — period 는 그 안의 마지막 봉부터 거꾸로
+    """
+    name = "file"
+    remote = False
+
+    def __init__(self, root, asof=None):
+        if not os.path.isdir(root):
+            raise ValueError(f"데이터 디렉터리가 없음: {root}")
+        self.root = root
+        self.asof = pd.Timestamp(asof) if asof is not None else None
+
+    def path(self, ticker):
+        for ext in FILE_FORMATS:
+            p = os.path.join(self.root, ticker + ext)
+            if os.path.exists(p): return p
+        return None
+
+    def tickers(self):
+        """디렉터리에 있는 종목 (이름순)"""
+        return sorted({f[:-len(e)] for f in os.listdir(self.root)
+                       for e in FILE_FORMATS if f.endswith(e)})
+
+    def read(self, ticker):
+        p = self.path(ticker)
+        if p is None: return None
+        if p.endswith(".parquet"):
+            df = pd.read_parquet(p, memory_map=True)
+        else:
+            df = pd.read_csv(p, index_col=0, parse_dates=True, memory_map=True)
+        if not isinstance(df.index, pd.DatetimeIndex):
+            dc = next((c for c in df.columns if str(c).lower() in ("date", "datetime")), None)
+            if dc is None: return None
+            df = df.set_index(pd.to_datetime(df.pop(dc)))
+        df.index.name = "Date"
+        return df.rename(columns={c: str(c).strip().capitalize() for c in df.columns})
+
+    def download(self, tickers, period="18mo", interval="1d", timeout=15, threads=True,
+                 start=None):
+        if interval != "1d":
+            raise ValueError("파일 공급자는 일봉(1d)만 지원")
+        out = {}
+        for t in tickers:
+            try: df = self.read(t)
+            except (OSError, ValueError): continue
+            if df is None: continue
+            if self.asof is not None: df = df[df.index <= self.asof]
+            if not len(df): continue
+            since = (pd.Timestamp(start) if start is not None else
+                     period_start(period, end=df.index.max()))
+            f = clean_frame(df[df.index >= since])
+            if f is not None: out[t] = f
+        return out
+
+
+YAHOO = YahooProvider()
+
+def get_provider(spec=None, asof=None):
+    """'yahoo' | None → YahooProvider, 그 밖의 문자열은 FileProvider 디렉터리 (asof: 기준일)"""
+    if isinstance(spec, Provider): return spec
+    return YAHOO if spec in (None, "yahoo") else FileProvider(spec, asof)
+
+
+# ─────────────────────────────────────────────
+# 파일 만들기
+# ─────────────────────────────────────────────
+
+def write_frames(root, frames, fmt="csv"):
+    """{종목: OHLCV} → root/<종목>.<fmt> (parquet 은 pyarrow 필요) → 쓴 파일 수"""
+    os.makedirs(root, exist_ok=True)
+    for t, f in frames.items():
+        f = f.reindex(columns=OHLCV).rename_axis("Date")
+        p = os.path.join(root, f"{t}.{fmt}")
+        if fmt == "parquet": f.to_parquet(p)
+        elif fmt == "csv":   f.to_csv(p)
+        else: raise ValueError(f"지원하지 않는 형식: {fmt}")
+    return len(frames)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m gescan.provider",
+                                 description="파일 공급자용 종목별 OHLCV 파일 만들기")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    ex = sub.add_parser("export", help="로컬 캐시(BarStore) 일봉 → 파일")
+    ex.add_argument("dir"); ex.add_argument("tickers", nargs="*", help="기본: 캐시 전체")
+    sy = sub.add_parser("synth", help="합성 OHLCV (gescan.bench.synth_frames)")
+    sy.add_argument("dir")
+    sy.add_argument("-n", "--tickers", type=int, default=500)
+    sy.add_argument("-P", "--period", choices=("18mo", "5y"), default="5y")
+    sy.add_argument("--seed", type=int, default=0)
+    for p in (ex, sy):
+        p.add_argument("--format", choices=("csv", "parquet"), default="csv")
+    a = ap.parse_args(argv)
+
+    if a.cmd == "export":
+        store = BarStore()
+        tl = a.tickers or store.tickers()
+        n = sum(write_frames(a.dir, store.load(part), a.format) for part in chunked(tl, 500))
+    else:
+        from gescan.bench import PERIODS, synth_frames
+        n = write_frames(a.dir, synth_frames(a.tickers, PERIODS[a.period], a.seed), a.format)
+    print(f"{n}개 종목 → {a.dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,246 @@
+"""
+결과 조건 검색 (스크리닝)
+끝난 스캔의 수치 결과 프레임에 조건식을 벡터로 적용한다 — 다시 스캔하거나 표시 문자열을 읽지 않는다.
+
+    s = Screener(df)
+    s("score >= 4 and rsi < 45 and vol_ratio > 1.5 and ichimoku == breakout_up")
+    s("sig == '매수' and sector in ['Technology', 'Energy']", by="rsi")
+
+조건식 : 파이썬 식 일부만 허용 — and · or · not · 비교(연쇄 가능) · in / not in · 숫자 · 문자열 · 목록
+열     : Result 필드(score · rsi · vr · ich · sig …) 와 별칭(ALIASES)
+결측   : 계산 안 한 시간대 총점(score_w · score_m)은 어떤 비교에도 맞지 않는다
+종류   : 숫자 열은 숫자 · 문자 열은 문자열과만 비교하고, 코드 열은 크기 비교(< · > 등)를 받지 않는다
+코드값 : 코드 열과 비교하는 이름은 그 열의 코드 이름(NAMES, 예: ich == breakout_up),
+         문자열은 라벨 부분 일치(예: sig == '매수' → 적극매수 · 매수관심)
+색인   : 자주 쓰는 수치 열(INDEXED)은 한 번 정렬해 두고 범위 비교를 이진 탐색으로 답한다
+저장   : save_screen(이름, 조건식) → ~/.cache/gescan/screens.json (BUILTIN 은 항상 포함)
+"""
+
+import ast
+import json
+import operator
+import os
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from gescan.record import BB_POS, BB_SQ, CCI_Z, ICH, MA_X, RSI_Z, SIGNALS
+from gescan.store import DEFAULT_DIR
+
+SCREENS_PATH = os.path.join(DEFAULT_DIR, "screens.json")
+
+ALIASES = {"vol_ratio": "vr", "volume_ratio": "vr", "ichimoku": "ich", "signal": "sig",
+           "change": "chg", "disparity": "disp", "rsi_zone": "rsi_z", "cci_zone": "cci_z",
+           "signal_w": "sig_w", "signal_m": "sig_m"}
+
+# 코드 이름 (record 코드표와 같은 순서)
+_SIG = ["strong_buy", "buy_watch", "entry_ready", "bottom_search", "hold", "trend_up",
+        "cloud_inside", "wait", "cloud_caution", "falling_fast", "trend_down", "sell_watch",
+        "strong_sell"]
+_ICH = ["above_cloud", "breakout_up", "entering_up", "in_cloud", "entering_down",
+        "below_cloud", "breakout_down"]
+_MA  = ["below", "above", "golden_cross", "dead_cross"]
+_RSI = ["oversold", "watch", "neutral", "caution", "overbought"]
+_CCI = ["oversold_exit", "zero_cross", "overbought_exit", "zero_dead", "overbought",
+        "oversold", "neutral"]
+# 열 → (코드 이름, 라벨)
+NAMES = {**dict.fromkeys(("sig", "sig_w", "sig_m"), (_SIG, SIGNALS)),
+         "ich": (_ICH, ICH), **dict.fromkeys(("ma5", "ma20", "ma60"), (_MA, MA_X)),
+         "rsi_z": (_RSI, RSI_Z), "cci_z": (_CCI, CCI_Z),
+         "bb_sq": (["squeeze", "expand", "normal"], BB_SQ),
+         "bb_pos": (["upper", "lower", "inside"], BB_POS)}
+
+INDEXED = ("score", "rsi", "cci", "vr", "chg", "disp", "price")
+
+BUILTIN = {
+    "눌림목 매수": "score >= 4 and rsi < 45 and vol_ratio > 1.5",
+    "일목 상향돌파": "ichimoku == breakout_up and vol_ratio >= 1",
+    "과매도 반등": "cci_z in (oversold_exit, zero_cross) and rsi < 40",
+    "BB 수축 구름 위": "bb_sq == squeeze and ich in (above_cloud, breakout_up)",
+}
+
+_CMP = {ast.Eq: operator.eq, ast.NotEq: operator.ne, ast.Lt: operator.lt,
+        ast.LtE: operator.le, ast.Gt: operator.gt, ast.GtE: operator.ge}
+_FLIP = {ast.Lt: ast.Gt, ast.LtE: ast.GtE, ast.Gt: ast.Lt, ast.GtE: ast.LtE,
+         ast.Eq: ast.Eq, ast.NotEq: ast.NotEq}
+_NODES = (ast.Expression, ast.BoolOp, ast.And, ast.Or, ast.UnaryOp, ast.Not, ast.USub,
+          ast.Compare, ast.Name, ast.Load, ast.Constant, ast.List, ast.Tuple, ast.Set,
+          ast.In, ast.NotIn, *_CMP)
+
+
+@lru_cache(maxsize=256)
+def parse(q):
+    """조건식 → 검사된 AST (허용하지 않는 구문은 ValueError)"""
+    try: tree = ast.parse(q.strip(), mode="eval")
+    except SyntaxError as e: raise ValueError(f"조건식 문법 오류: {e.msg}") from None
+    for n in ast.walk(tree):
+        if not isinstance(n, _NODES):
+            raise ValueError(f"조건식에 쓸 수 없는 구문: {type(n).__name__}")
+    return tree.body
+
+
+class Screener:
+    """수치 결과 프레임 하나에 대한 조건 검색 — 정렬 색인은 만들 때 한 번"""
+
+    def __init__(self, df):
+        self.df = df; self.n = len(df)
+        self._cols = {}; self._idx = {}
+        for k in INDEXED:
+            if k not in df: continue
+            v = df[k].to_numpy(dtype=float); o = np.argsort(v, kind="stable")
+            self._idx[k] = (v[o], o, int((~np.isnan(v)).sum()))   # NaN 은 뒤로 · 제외
+
+    def __call__(self, q, by=None, ascending=False):
+        """조건에 맞는 행 (기본 결과 순서 = 총점 내림차순, by 를 주면 그 열 순서)"""
+        m = self.mask(q) if q and q.strip() else np.ones(self.n, bool)
+        if by is None: return self.df[m]
+        k = ALIASES.get(by, by)
+        if k not in self._idx: return self.df[m].sort_values(k, ascending=ascending, kind="stable")
+        v, o, nn = self._idx[k]
+        o = o[:nn] if ascending else o[:nn][::-1]
+        return self.df.iloc[o[m[o]]]
+
+    def mask(self, q):
+        m = self._eval(parse(q))
+        if not isinstance(m, np.ndarray) or m.dtype != bool:
+            raise ValueError("조건식은 비교(예: score >= 4)여야 함")
+        return m
+
+    # ─ 평가 ─
+
+    def col(self, name):
+        k = ALIASES.get(name, name)
+        if k not in self._cols:
+            if k not in self.df: raise ValueError(f"모르는 열: {name}")
+            c = self.df[k]     # 결측 가능 정수(시간대 총점)는 NaN 으로 — 어떤 비교에도 맞지 않음
+            self._cols[k] = (c.to_numpy(dtype=float, na_value=np.nan)
+                             if c.hasnans and pd.api.types.is_integer_dtype(c) else c.to_numpy())
+        return self._cols[k]
+
+    def _is_col(self, node):
+        return isinstance(node, ast.Name) and ALIASES.get(node.id, node.id) in self.df
+
+    def _eval(self, node):
+        if isinstance(node, ast.BoolOp):
+            ms = [self._eval(v) for v in node.values]
+            return np.logical_and.reduce(ms) if isinstance(node.op, ast.And) \
+                else np.logical_or.reduce(ms)
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+            return ~self._eval(node.operand)
+        if isinstance(node, ast.Compare):
+            terms = [node.left, *node.comparators]
+            return np.logical_and.reduce([self._cmp(a, op, b) for a, op, b in
+                                          zip(terms, node.ops, terms[1:])])
+        if self._is_col(node):
+            v = self.col(node.id)
+            if v.dtype == bool: return v
+        raise ValueError(f"비교가 아닌 조건: {ast.unparse(node)}")
+
+    def _cmp(self, a, op, b):
+        if not self._is_col(a):
+            if isinstance(op, (ast.In, ast.NotIn)) or not self._is_col(b):
+                raise ValueError(f"비교 한쪽은 열이어야 함: {ast.unparse(a)}")
+            a, b, op = b, a, _FLIP[type(op)]()
+        k = ALIASES.get(a.id, a.id)
+        order = isinstance(op, (ast.Lt, ast.LtE, ast.Gt, ast.GtE))
+        if order and k in NAMES:
+            raise ValueError(f"코드 열은 크기 비교 불가 (== · != · in 사용): {a.id}")
+        if self._is_col(b):
+            kb = ALIASES.get(b.id, b.id)
+            if order and kb in NAMES:
+                raise ValueError(f"코드 열은 크기 비교 불가 (== · != · in 사용): {b.id}")
+            if self._numeric(k) != self._numeric(kb):
+                raise ValueError(f"숫자 열과 문자 열은 비교 불가: {a.id} · {b.id}")
+            return _CMP[type(op)](self.col(a.id), self.col(b.id))
+        v = self._value(b, k)
+        self._check(k, v, b)
+        member = isinstance(op, (ast.In, ast.NotIn))
+        if member != isinstance(v, list):
+            raise ValueError(f"목록은 in · not in 으로만 비교: {ast.unparse(b)}")
+        if member or isinstance(v, set):
+            if not isinstance(op, (ast.In, ast.NotIn, ast.Eq, ast.NotEq)):
+                raise ValueError(f"여러 코드에 맞는 값은 == · != · in 으로만 비교: {ast.unparse(b)}")
+            vs = [x for y in (v if member else [v]) for x in (y if isinstance(y, set) else [y])]
+            m = np.isin(self.col(a.id), vs)
+            return ~m if isinstance(op, (ast.NotIn, ast.NotEq)) else m
+        if k in self._idx and isinstance(v, (int, float)) and not isinstance(op, ast.NotEq):
+            return self._range(k, type(op), v)
+        return _CMP[type(op)](self.col(a.id), v)
+
+    def _numeric(self, k):
+        return self.df[k].dtype.kind in "iufb"
+
+    def _check(self, k, v, node):
+        """비교 값 종류가 열 종류와 맞는지 (숫자 열 ↔ 숫자 · 코드, 문자 열 ↔ 문자열)"""
+        for x in (v if isinstance(v, list) else [v]):
+            if isinstance(x, set): continue                         # 라벨로 찾은 코드
+            if isinstance(x, str) == self._numeric(k):
+                raise ValueError(f"{k} 는 {'숫자' if self._numeric(k) else '문자'} 열 — "
+                                 f"맞지 않는 값: {ast.unparse(node)}")
+
+    def _range(self, k, op, x):
+        """정렬 색인으로 범위 비교 → 불리언 마스크"""
+        v, o, nn = self._idx[k]; s = v[:nn]
+        lo = np.searchsorted(s, x, "left"); hi = np.searchsorted(s, x, "right")
+        sl = {ast.Lt: slice(0, lo), ast.LtE: slice(0, hi), ast.Gt: slice(hi, nn),
+              ast.GtE: slice(lo, nn), ast.Eq: slice(lo, hi)}[op]
+        m = np.zeros(self.n, bool); m[o[sl]] = True
+        return m
+
+    def _value(self, node, k):
+        """비교 상대 → 숫자 · 문자열 · 코드 (여러 코드면 set) · 목록"""
+        if isinstance(node, (ast.List, ast.Tuple, ast.Set)):
+            return [self._value(e, k) for e in node.elts]
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+            v = self._value(node.operand, k)
+            if isinstance(v, (int, float)): return -v
+        if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
+            return node.value
+        names, labels = NAMES.get(k, (None, None))
+        if isinstance(node, ast.Name):
+            if names and node.id in names: return names.index(node.id)
+            raise ValueError(f"{k} 에 없는 값: {node.id}" + (f" ({', '.join(names)})" if names else ""))
+        if isinstance(node, ast.Constant) and isinstance(node.value, str):
+            if labels is None: return node.value
+            hit = {i for i, s in enumerate(labels) if node.value in s}
+            if not hit: raise ValueError(f"{k} 라벨에 없는 값: {node.value!r}")
+            return next(iter(hit)) if len(hit) == 1 else hit
+        raise ValueError(f"쓸 수 없는 값: {ast.unparse(node)}")
+
+
+# ─────────────────────────────────────────────
+# 저장된 조건
+# ─────────────────────────────────────────────
+
+def load_screens(path=SCREENS_PATH):
+    """{이름: 조건식} — BUILTIN + 저장된 조건"""
+    try:
+        with open(path, encoding="utf-8") as f: saved = json.load(f)
+    except (OSError, ValueError):
+        saved = {}
+    return {**BUILTIN, **saved}
+
+def save_screen(name, q, path=SCREENS_PATH):
+    """조건식을 검사한 뒤 이름으로 저장 (같은 이름은 덮어씀)"""
+    parse(q)
+    try:
+        with open(path, encoding="utf-8") as f: saved = json.load(f)
+    except (OSError, ValueError):
+        saved = {}
+    saved[name] = q.strip()
+    _write(saved, path)
+
+def delete_screen(name, path=SCREENS_PATH):
+    try:
+        with open(path, encoding="utf-8") as f: saved = json.load(f)
+    except (OSError, ValueError):
+        return
+    if saved.pop(name, None) is not None: _write(saved, path)
+
+def _write(saved, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(saved, f, ensure_ascii=False, indent=1)
+    os.replace(tmp, path)
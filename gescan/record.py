@@ -0,0 +1,141 @@
+"""
+스캔 결과 레코드
+분석 결과는 수치 + 정수 코드로만 들고 있고, 표시 문자열(이모지 라벨 · 반올림 · 통화)은
+화면/파일로 내보낼 때 render() 에서 한 번에 만든다.
+필터 · 메트릭은 문자열 검색 대신 코드 비교(isin)로 한다.
+"""
+
+from typing import NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+# ─────────────────────────────────────────────
+# 코드표 (값 = 리스트 위치)
+# ─────────────────────────────────────────────
+
+SIGNALS = ["🔥 적극매수", "📈 매수관심", "🌱 진입준비", "🔄 바닥탐색", "🛡️ 홀딩유지",
+           "🔼 추세상승", "🌫️ 구름대내부", "⏸️ 관망", "⚠️ 구름대주의", "🔻 하락가속",
+           "🔽 추세하락", "📉 매도관심", "🧊 적극매도"]
+ICH     = ["📈 구름대 위", "🔥 상향돌파", "🌱 구름대상승진입", "🌫️ 구름대 내부",
+           "⚠️ 구름대하락진입", "📉 구름대 아래", "🧊 하향이탈"]
+ICH_UP, ICH_DN = 1, 6          # n일전 표시가 붙는 상태
+MA_X    = ["📉↓", "📈↑", "🔥GC", "🧊DC"]
+RSI_Z   = ["🟢과매도", "🔵관심", "⚪중립", "🟡주의", "🔴과매수"]
+CCI_Z   = ["🟢과매도탈출", "🔵제로크로스", "🟡과매수탈출", "🔴제로데드",
+           "⚡과매수", "💧과매도", "➖중립"]
+BB_SQ   = ["⚡수축", "💥팽창", "➖보통"]
+BB_POS  = ["상단", "하단", "내부"]
+
+SIG_CODE = {s: i for i, s in enumerate(SIGNALS)}
+
+COLS = ['티커','종목명','섹터','등락률','현재가','이격률','총점','신호',
+        '일목','MA크로스','RSI','CCI','BB','거래량','차트']
+TF_COLS = {'sig_w': '주봉', 'sig_m': '월봉'}   # 상위 시간대 신호 (계산한 경우에만 '신호' 뒤에 표시)
+
+
+def sig_codes(*kws):
+    """키워드를 포함하는 신호 코드 집합 (예: sig_codes('매도') → 매도관심 · 적극매도)"""
+    return frozenset(i for i, s in enumerate(SIGNALS) if any(k in s for k in kws))
+
+def ich_label(code, days=0):
+    return f"{ICH[code]}({days}일전)" if code in (ICH_UP, ICH_DN) and days else ICH[code]
+
+
+class Result(NamedTuple):
+    """종목 하나의 결과 (퍼센트 값은 % 단위, 반올림 전 원값)"""
+    ticker: str
+    name: str
+    sector: str
+    currency: str
+    chg: float        # 전일 대비 등락률
+    price: float      # 종가
+    disp: float       # 20일선 이격률
+    score: int        # 총점
+    sig: int          # SIGNALS
+    ich: int          # ICH
+    ich_days: int     # 돌파/이탈 후 일수 (0: 해당 없음)
+    ma5: int          # MA_X
+    ma20: int
+    ma60: int
+    rsi: float
+    rsi_z: int        # RSI_Z
+    cci: float
+    cci_z: int        # CCI_Z
+    bb_sq: int        # BB_SQ
+    bb_pos: int       # BB_POS
+    vr: float         # 20일 평균 대비 거래량 (없으면 NaN)
+    sig_w: int = -1   # 주봉 SIGNALS (-1: 계산 안 함 · 봉 부족) — gescan.timeframe
+    score_w: Optional[int] = None   # 주봉 총점 (None: 계산 안 함 — -1 은 실제 총점일 수 있음)
+    sig_m: int = -1   # 월봉 SIGNALS
+    score_m: Optional[int] = None
+
+
+FIELDS = list(Result._fields)
+DTYPES = {**{k: 'int8' for k in ('sig','ich','ich_days','ma5','ma20','ma60',
+                                  'rsi_z','cci_z','bb_sq','bb_pos','sig_w','sig_m')},
+          'score': 'int16', 'score_w': 'Int16', 'score_m': 'Int16',   # 시간대 총점은 결측 가능
+          **{k: 'float64' for k in ('chg','price','disp','rsi','cci','vr')}}
+
+
+def to_frame(rows):
+    """Result 목록 → 수치 DataFrame (코드는 int8, 계산 안 한 시간대 총점은 <NA>)"""
+    df = pd.DataFrame(list(rows), columns=FIELDS)
+    for k in TF_COLS:      # 시간대 신호가 없는 행의 총점은 결측 (이전 형식의 -1 포함)
+        df.loc[df[k] < 0, 'score' + k[3:]] = None
+    return df.astype(DTYPES)
+
+def from_values(values):
+    """저장된 행 목록 → 수치 DataFrame — 필드가 늘기 전 행은 기본값으로 채움"""
+    return to_frame(Result(*v) for v in values)
+
+def to_values(df):
+    """수치 DataFrame → JSON 으로 쓸 수 있는 행 목록 (from_values 의 반대, 결측은 None)"""
+    v = df[FIELDS].astype(object)
+    return v.where(v.notna(), None).values.tolist()
+
+
+# ─────────────────────────────────────────────
+# 표시 문자열 (화면 · 파일 내보내기 시점에만)
+# ─────────────────────────────────────────────
+
+def _pct(a):
+    return [f"{'+' if x>=0 else ''}{x}%" for x in a]
+
+def _lab(table, codes):
+    return np.array(table, dtype=object)[np.asarray(codes, dtype=int)]
+
+def tf_label(codes, scores):
+    lab = np.array(["", *SIGNALS], dtype=object)[np.asarray(codes, dtype=int) + 1]
+    return [f"{l} ({s})" if l else "" for l, s in zip(lab, list(scores))]
+
+def render(df):
+    """
+    수치 결과 프레임 → 표시용 DataFrame(COLS) — 반올림 · 라벨은 기존 결과 행과 같은 형식
+    상위 시간대 신호가 하나라도 있으면 '신호' 뒤에 주봉 · 월봉 열 추가
+    """
+    tfc = [k for k in TF_COLS if k in df and (df[k] >= 0).any()]
+    cols = COLS[:8] + [TF_COLS[k] for k in tfc] + COLS[8:]
+    if df.empty:
+        return pd.DataFrame(columns=COLS)
+    f = lambda k: df[k].to_numpy(dtype=float)
+    rv = np.round(f('rsi'), 1); cv = np.round(f('cci'), 1)
+    vr = np.round(f('vr'), 1); vr[np.isnan(vr)] = 1.0
+    tk = df['ticker'].tolist()
+    return pd.DataFrame({
+        '티커': tk, '종목명': df['name'].tolist(), '섹터': df['sector'].tolist(),
+        '등락률': _pct(np.round(f('chg'), 2)),
+        '현재가': [f"{p} {c}" for p, c in zip(np.round(f('price'), 2), df['currency'])],
+        '이격률': _pct(np.round(f('disp'), 2)),
+        '총점': df['score'].to_numpy(dtype=int),
+        '신호': _lab(SIGNALS, df['sig']),
+        '일목': [ich_label(c, d) for c, d in zip(df['ich'].tolist(), df['ich_days'].tolist())],
+        'MA크로스': [f"5:{MA_X[a]} 20:{MA_X[b]} 60:{MA_X[c]}" for a, b, c in
+                   zip(df['ma5'].tolist(), df['ma20'].tolist(), df['ma60'].tolist())],
+        'RSI': [f"{v} {z}" for v, z in zip(rv, _lab(RSI_Z, df['rsi_z']))],
+        'CCI': [f"{v} {z}" for v, z in zip(cv, _lab(CCI_Z, df['cci_z']))],
+        'BB': [f"{s}/{p}" for s, p in zip(_lab(BB_SQ, df['bb_sq']), _lab(BB_POS, df['bb_pos']))],
+        '거래량': [f"{v}배 📈" if v>=2 else f"{v}배 📉" if v<0.5 else f"{v}배" for v in vr],
+        '차트': [f"https://finance.yahoo.com/chart/{t}" for t in tk],
+        **{TF_COLS[k]: tf_label(df[k], df['score' + k[3:]]) for k in tfc},
+    }, columns=cols)
@@ -0,0 +1,67 @@
+"""
+스캔 결과 누적기
+Result 가 들어올 때마다 총점 내림차순 위치에 끼워 넣고(동점은 도착 순), 신호 코드별 개수를 누적한다.
+매 종목마다 DataFrame 재생성 · 정렬 · 문자열 집계를 하지 않아도 된다.
+prev 에 직전 스캔 결과를 두면 changes() 로 바뀐 종목만 볼 수 있다 (gescan.diff).
+"""
+
+from bisect import bisect_right
+from collections import Counter
+
+import numpy as np
+
+from gescan.diff import diff
+from gescan.record import sig_codes, to_frame
+
+# 진단 현황 메트릭 (라벨, 해당 신호 코드)
+METRICS = [
+    ("매수계열",   sig_codes("적극매수", "매수관심")),
+    ("진입/바닥",  sig_codes("진입준비", "바닥탐색")),
+    ("구름대주의", sig_codes("구름대주의")),
+    ("하락계열",   sig_codes("하락가속", "추세하락", "적극매도")),
+    ("매도관심↓",  sig_codes("매도관심", "적극매도")),
+]
+
+
+def metric_counts(sig_counts):
+    """{신호 코드: 개수} → {메트릭 라벨: 개수} — 신호 종류는 13개뿐이라 상수 시간"""
+    out = {"전체": sum(sig_counts.values())}
+    for lbl, codes in METRICS:
+        out[lbl] = sum(n for s, n in sig_counts.items() if s in codes)
+    return out
+
+def frame_metrics(df):
+    """수치 결과 프레임 → 메트릭 (신호 코드 bincount)"""
+    cnt = np.bincount(df['sig'].to_numpy(dtype=int), minlength=1) if len(df) else []
+    return metric_counts({i: int(n) for i, n in enumerate(cnt) if n})
+
+
+class ResultView:
+    def __init__(self, prev=None):
+        self.rows = []; self._keys = []
+        self.sig_counts = Counter()
+        self.prev = prev        # 직전 스캔 수치 결과 (없으면 None)
+        self.health = None      # gescan.health.FetchHealth (불량 제외 · 차단기 횟수)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def add(self, row):
+        k = -row.score
+        i = bisect_right(self._keys, k)
+        self._keys.insert(i, k); self.rows.insert(i, row)
+        self.sig_counts[row.sig] += 1
+
+    def extend(self, rows):
+        for r in rows: self.add(r)
+
+    def metrics(self):
+        return metric_counts(self.sig_counts)
+
+    def frame(self):
+        """정렬된 수치 결과 DataFrame (재정렬 없음) — 표시용은 record.render"""
+        return to_frame(self.rows)
+
+    def changes(self):
+        """직전 스캔 대비 바뀐 종목 (gescan.diff.diff) — 직전 결과가 없으면 None"""
+        return None if self.prev is None else diff(self.prev, self.frame())
@@ -0,0 +1,36 @@
+"""
+롤링 분산도 프리미티브
+창 뷰(stride trick)로 파이썬 콜백 없이 계산 — 1-D Series 와 2-D 패널 모두 지원
+"""
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def windows(a, p):
+    """(n, …) 배열 → (n-p+1, …, p) 창 뷰 (복사 없음)"""
+    return sliding_window_view(a, p, axis=0)
+
+
+def rolling_mad(x, p, block=256):
+    """
+    롤링 평균절대편차 mean(|x - mean(x)|)
+    tp.rolling(p).apply(lambda x: np.abs(x-x.mean()).mean(), raw=True) 와 같은 값.
+    창 안에 NaN 이 있으면 NaN. 2-D 는 메모리 때문에 열 block 개씩 처리.
+    """
+    if isinstance(x, pd.Series):
+        return pd.Series(rolling_mad(x.to_numpy(dtype=float), p, block),
+                         index=x.index, name=x.name)
+    if isinstance(x, pd.DataFrame):
+        return pd.DataFrame(rolling_mad(x.to_numpy(dtype=float), p, block),
+                            index=x.index, columns=x.columns)
+    a = np.asarray(x, dtype=float)
+    if a.ndim == 1:
+        return rolling_mad(a[:, None], p, block)[:, 0]
+    out = np.full(a.shape, np.nan)
+    if len(a) < p: return out
+    for j in range(0, a.shape[1], block):
+        w = windows(a[:, j:j+block], p)
+        out[p-1:, j:j+block] = np.abs(w - w.mean(-1, keepdims=True)).mean(-1)
+    return out
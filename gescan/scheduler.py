@@ -0,0 +1,136 @@
+"""
+적응형 비동기 요청 스케줄러 (Yahoo)
+고정 작업자 수 대신 토큰 버킷 속도 제한 + AIMD 동시성 제어로 안전한 최대 요청률을 찾는다.
+
+  - 토큰 버킷 : 초당 요청 수 상한 (rate) — 정상 응답마다 +0.2, 차단/타임아웃 시 절반
+  - AIMD      : 동시 요청 수 (limit) — 성공 시 +1/limit, 혼잡 신호(429 · 타임아웃 · 빈 프레임 ·
+                네트워크 오류) 시 ×0.5. 한 번의 혼잡에 여러 실패가 몰려도 1초에 한 번만 줄인다
+  - 재시도    : 지수 백오프 + 지터, 최대 retries 회 (빈 프레임은 상장폐지일 수 있어 empty_retries 회)
+
+요청 단위는 종목 하나의 Ticker.history (gescan.fetch.history) — 실패 종류를 예외로 알 수 있다.
+이벤트 루프는 전용 스레드에서 돌고, 동기 코드에서는 download()/iter() 로 쓴다.
+"""
+
+import asyncio
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from gescan.fetch import backoff, classify, history
+
+
+class TokenBucket:
+    def __init__(self, rate, burst, lo, hi, inc=0.2, hold=1.0):
+        self.rate, self.burst, self.lo, self.hi = rate, burst, lo, hi
+        self.inc, self.hold, self.cut_at = inc, hold, 0.0
+        self.tokens = burst; self.t = time.monotonic()
+
+    async def take(self):
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.t)*self.rate)
+            self.t = now
+            if self.tokens >= 1:
+                self.tokens -= 1; return
+            await asyncio.sleep((1 - self.tokens)/self.rate)
+
+    def ok(self):
+        self.rate = min(self.hi, self.rate + self.inc)
+
+    def congest(self):
+        now = time.monotonic()
+        if now - self.cut_at >= self.hold:
+            self.rate = max(self.lo, self.rate*0.5); self.cut_at = now
+
+
+class AIMDLimiter:
+    def __init__(self, start, lo, hi, dec=0.5, hold=1.0):
+        self.limit, self.lo, self.hi, self.dec, self.hold = float(start), lo, hi, dec, hold
+        self.inflight = 0; self.cut_at = 0.0; self.cond = None
+
+    async def acquire(self):
+        if self.cond is None: self.cond = asyncio.Condition()
+        async with self.cond:
+            await self.cond.wait_for(lambda: self.inflight < int(self.limit))
+            self.inflight += 1
+
+    async def release(self, ok):
+        async with self.cond:
+            self.inflight -= 1
+            now = time.monotonic()
+            if ok:
+                self.limit = min(self.hi, self.limit + 1/self.limit)
+            elif now - self.cut_at >= self.hold:
+                self.limit = max(self.lo, self.limit*self.dec); self.cut_at = now
+            self.cond.notify_all()
+
+
+class FetchScheduler:
+    """
+    여러 I/O 작업자가 공유하는 요청 스케줄러 (속도 · 동시성 상태는 인스턴스 전체 공유)
+    stats  : 결과 종류별 건수 (ok/throttle/timeout/empty/error/retry)
+    failed : 최종 실패 종목 → 마지막 실패 종류
+    """
+
+    def __init__(self, rate=4.0, max_rate=20.0, burst=8, conc=4, max_conc=16,
+                 retries=3, empty_retries=1, base_delay=1.0, max_delay=30.0, timeout=15):
+        self.bucket = TokenBucket(rate, burst, 0.5, max_rate)
+        self.limiter = AIMDLimiter(conc, 1, max_conc)
+        self.retries, self.empty_retries = retries, empty_retries
+        self.base_delay, self.max_delay, self.timeout = base_delay, max_delay, timeout
+        self.stats = Counter(); self.failed = {}
+        self.loop = asyncio.new_event_loop()
+        self.loop.set_default_executor(
+            ThreadPoolExecutor(max_conc, thread_name_prefix="gescan-yf"))
+        threading.Thread(target=self.loop.run_forever, daemon=True,
+                         name="gescan-sched").start()
+
+    # ── 요청 한 건 ──────────────────────────────
+    def _history(self, t, period, interval, start):
+        return history(t, period, interval, self.timeout, start)
+
+    async def _one(self, t, period, interval, start):
+        for attempt in range(self.retries + 1):
+            await self.limiter.acquire()
+            await self.bucket.take()
+            f = None
+            try:
+                f = await asyncio.get_running_loop().run_in_executor(
+                    None, self._history, t, period, interval, start)
+                kind = 'ok' if f is not None else 'empty'
+            except Exception as e:
+                kind = classify(e)
+            await self.limiter.release(kind == 'ok')
+            self.stats[kind] += 1
+            if kind == 'ok':
+                self.bucket.ok(); self.failed.pop(t, None)
+                return t, f
+            if kind in ('throttle', 'timeout'): self.bucket.congest()
+            lim = self.empty_retries if kind == 'empty' else self.retries
+            if attempt >= lim: break
+            self.stats['retry'] += 1
+            await asyncio.sleep(backoff(attempt, kind, self.base_delay, self.max_delay))
+        self.failed[t] = kind
+        return t, None
+
+    # ── 동기 인터페이스 ──────────────────────────
+    def iter(self, tickers, period="18mo", interval="1d", start=None):
+        """(종목, 프레임 | None) 을 끝나는 순서대로 — iter_download 대체"""
+        tickers = list(dict.fromkeys(tickers))
+        futs = [asyncio.run_coroutine_threadsafe(
+                    self._one(t, period, interval, start), self.loop) for t in tickers]
+        for f in as_completed(futs):
+            yield f.result()
+
+    def download(self, tickers, period="18mo", interval="1d", timeout=None,
+                 threads=None, start=None):
+        """download_chunk 와 같은 {종목: 프레임} (iter_cached 의 download 인자로 사용)"""
+        return {t: f for t, f in self.iter(tickers, period, interval, start)
+                if f is not None}
+
+    def snapshot(self):
+        """현재 요청률 · 동시성 · 누적 통계"""
+        return {"rate": round(self.bucket.rate, 2),
+                "concurrency": round(self.limiter.limit, 2),
+                **self.stats}
@@ -0,0 +1,92 @@
+"""
+12단계 신호 (한국 스캐너와 동일 로직)
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def calc_signal(last, prev, ich, rsi_v, cci_now, cci_pv, disp):
+    sc = 0; det = {}
+
+    # ① 구름대
+    if   '상향돌파' in ich: s= 3
+    elif '하향이탈' in ich: s=-3
+    elif '상승진입' in ich: s= 1
+    elif '하락진입' in ich: s=-2
+    else:                   s= 0
+    sc+=s; det['구름대']=s
+
+    # ② MACD
+    hn=last['mh']; hp=prev['mh']; sl=hn-hp
+    if   hn>0 and hp<=0: s= 2
+    elif hn<0 and hp>=0: s=-2
+    elif hn<0 and sl>0:  s= 1
+    elif hn>0 and sl<0:  s=-1
+    else:                s= 0
+    sc+=s; det['MACD']=s
+
+    # ③ CCI
+    if   cci_pv<-100 and cci_now>=-100: s= 2
+    elif cci_pv<   0 and cci_now>=   0: s= 1
+    elif cci_pv>   0 and cci_now<=   0: s=-1
+    elif cci_pv> 100 and cci_now<= 100: s=-2
+    else:                               s= 0
+    sc+=s; det['CCI']=s
+
+    # ④ 이격률
+    if   disp> 20: s=-3
+    elif disp> 12: s=-2
+    elif disp>  6: s=-1
+    elif disp>=-3: s= 0
+    elif disp>=-8: s= 1
+    else:          s= 2
+    sc+=s; det['이격률']=s
+
+    # ⑤ 거래량
+    vr = last.get('vr', np.nan)
+    ht = (det['구름대']!=0 or abs(det['MACD'])>=1 or abs(det['CCI'])>=1)
+    if not pd.isna(vr):
+        if   vr>=1.5 and ht: s= 1
+        elif vr< 0.5:        s=-1
+        else:                s= 0
+    else: s=0
+    sc+=s; det['거래량']=s
+
+    # 플래그
+    ab  = '구름대 위'  in ich or '상향돌파' in ich
+    bel = '구름대 아래' in ich or '하향이탈' in ich
+    fe  = '하락진입'   in ich
+    ins = '내부'       in ich
+    cb_o= det['구름대']== 3;  cb_d=det['구름대']==-3
+    mu  = det['MACD']  >= 1;  md  =det['MACD']  <=-1
+    cu  = det['CCI']   >  0;  cd  =det['CCI']   < 0
+    hid = disp>15;  mid= 6<disp<=15;  lod=disp<-10
+
+    if fe:
+        sig="⚠️ 구름대주의"
+    elif sc>=7 and cb_o and mu and cu:
+        sig="🔥 적극매수"
+    elif sc>=4 and not hid and (cb_o or mu or cu) and sum([cb_o,mu,cu])>=2:
+        sig="📈 매수관심"
+    elif sc>=2 and disp<=6 and ht and not fe:
+        sig="🌱 진입준비"
+    elif bel and (mu or cu) and sc>=0:
+        sig="🔄 바닥탐색"
+    elif bel and md and cd:
+        sig="🔻 하락가속"
+    elif sc<=-5 and cb_d and md and cd:
+        sig="🧊 적극매도"
+    elif sc<=-3:
+        sig="📉 매도관심"
+    elif bel and lod:
+        sig="🔽 추세하락"
+    elif ab and hid:
+        sig="🔼 추세상승"
+    elif ab and mid and not ht:
+        sig="🛡️ 홀딩유지"
+    elif ins:
+        sig="🌫️ 구름대내부"
+    else:
+        sig="⏸️ 관망"
+    return sc, sig
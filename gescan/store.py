@@ -0,0 +1,340 @@
+"""
+로컬 OHLCV 캐시 (SQLite)
+(종목, 날짜) 키로 일봉을 저장하고, 다음 스캔부터는 마지막 캐시 날짜 이후만 받아 덧붙인다.
+
+신선도 규칙
+  - 장중      : intraday_ttl(기본 15분) 이내에 받은 데이터면 재사용
+  - 장 마감 후 : 마지막 마감 + settle(기본 30분) 이후에 받았으면 재사용
+이력 범위
+  - 전체 요청 때 요청한 시작일(span)을 기록해, 더 긴 기간(예: 주봉 · 월봉용 10y)을 요청하면
+    캐시가 신선해도 전체를 다시 받는다
+불량 종목
+  - bad 테이블에 받지 못한 종목 · 이유 · 연속 실패 수 · 만료 시각 (gescan.health)
+직전 결과
+  - result 테이블에 종목별 마지막 결과와 마지막 봉 지문(gescan.diff.bar_stamp)을 둔다
+수정주가 감지
+  - 델타 요청은 마지막 두 봉부터 다시 받는다. 겹치는 확정 봉(anchor)의 종가가
+    캐시와 다르면 auto_adjust 로 과거가가 바뀐 것 → 전체 이력 재구축
+"""
+
+import os
+import re
+import sqlite3
+import time
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import pandas as pd
+
+from gescan.fetch import chunked, download_chunk
+
+DEFAULT_DIR = os.environ.get(
+    "GESCAN_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "gescan"))
+
+# 거래소 세션 (시간대, 개장, 마감) — 종목 접미사 기준, 공휴일은 무시
+SESSIONS = {
+    ".DE": ("Europe/Berlin",    (9, 0),  (17, 30)),
+    "":    ("America/New_York", (9, 30), (16, 0)),
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS bars(
+    ticker TEXT NOT NULL, date TEXT NOT NULL,
+    open REAL, high REAL, low REAL, close REAL, volume REAL,
+    PRIMARY KEY (ticker, date)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta(
+    ticker TEXT PRIMARY KEY, fetched_at REAL NOT NULL,
+    last_date TEXT, anchor_date TEXT, anchor_close REAL
+);
+CREATE TABLE IF NOT EXISTS state(
+    ticker TEXT PRIMARY KEY, last_date TEXT, blob BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS span(
+    ticker TEXT PRIMARY KEY, since TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS result(
+    ticker TEXT PRIMARY KEY, stamp TEXT NOT NULL, row TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS bad(
+    ticker TEXT PRIMARY KEY, reason TEXT NOT NULL, count INTEGER NOT NULL,
+    failed_at REAL NOT NULL, until REAL NOT NULL
+);
+"""
+_COLS = ['Open','High','Low','Close','Volume']
+
+
+# ─────────────────────────────────────────────
+# 세션 / 신선도
+# ─────────────────────────────────────────────
+
+def session_of(ticker):
+    for sfx, ses in SESSIONS.items():
+        if sfx and ticker.endswith(sfx): return ses
+    return SESSIONS[""]
+
+def _at(d, hm, tz):
+    return datetime(d.year, d.month, d.day, hm[0], hm[1], tzinfo=tz)
+
+def market_open(ticker, now=None):
+    tzn, op, cl = session_of(ticker); tz = ZoneInfo(tzn)
+    loc = datetime.fromtimestamp(now or time.time(), tz)
+    return loc.weekday() < 5 and _at(loc, op, tz) <= loc < _at(loc, cl, tz)
+
+def last_close(ticker, now=None):
+    """now 이전의 가장 최근 세션 마감 시각 (epoch 초)"""
+    tzn, _, cl = session_of(ticker); tz = ZoneInfo(tzn)
+    loc = datetime.fromtimestamp(now or time.time(), tz)
+    d = loc
+    while d.weekday() >= 5 or _at(d, cl, tz) > loc:
+        d -= timedelta(days=1)
+    return _at(d, cl, tz).timestamp()
+
+def is_fresh(ticker, fetched_at, now=None, intraday_ttl=900, settle=1800):
+    now = now or time.time()
+    if market_open(ticker, now):
+        return now - fetched_at < intraday_ttl
+    return fetched_at >= last_close(ticker, now) + settle
+
+def period_start(period, now=None, end=None):
+    """'18mo' / '5y' / '30d' → 시작 날짜 (yfinance period 와 같은 의미, end 를 주면 그 날짜부터 거꾸로)"""
+    m = re.fullmatch(r"(\d+)(mo|y|d)", period)
+    if not m: raise ValueError(f"지원하지 않는 period: {period}")
+    n, u = int(m.group(1)), m.group(2)
+    today = (pd.Timestamp(end).normalize() if end is not None else
+             pd.Timestamp(datetime.fromtimestamp(now or time.time()).date()))
+    off = {"mo": pd.DateOffset(months=n), "y": pd.DateOffset(years=n),
+           "d": pd.DateOffset(days=n)}[u]
+    return today - off
+
+
+# ─────────────────────────────────────────────
+# 저장소
+# ─────────────────────────────────────────────
+
+class BarStore:
+    def __init__(self, path=None):
+        path = path or os.path.join(DEFAULT_DIR, "bars.sqlite")
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        with self._conn() as c:
+            c.executescript(_SCHEMA)
+
+    def _conn(self):
+        c = sqlite3.connect(self.path, timeout=30)
+        c.execute("PRAGMA journal_mode=WAL")
+        return c
+
+    def info(self, tickers):
+        """{종목: (fetched_at, last_date, anchor_date, anchor_close)}"""
+        out = {}
+        with self._conn() as c:
+            for part in chunked(list(tickers), 500):
+                q = ",".join("?"*len(part))
+                for r in c.execute(
+                        f"SELECT ticker,fetched_at,last_date,anchor_date,anchor_close "
+                        f"FROM meta WHERE ticker IN ({q})", part):
+                    out[r[0]] = r[1:]
+        return out
+
+    def load(self, tickers, since=None):
+        """{종목: OHLCV 프레임} — since 이후 봉만"""
+        since = pd.Timestamp(since).strftime("%Y-%m-%d") if since is not None else ""
+        rows = []
+        with self._conn() as c:
+            for part in chunked(list(tickers), 500):
+                q = ",".join("?"*len(part))
+                rows += c.execute(
+                    f"SELECT ticker,date,open,high,low,close,volume FROM bars "
+                    f"WHERE ticker IN ({q}) AND date>=? ORDER BY ticker,date",
+                    [*part, since]).fetchall()
+        if not rows: return {}
+        df = pd.DataFrame(rows, columns=['ticker','date',*_COLS])
+        df['date'] = pd.to_datetime(df['date'])
+        return {t: g.drop(columns='ticker').set_index('date').rename_axis('Date')
+                for t, g in df.groupby('ticker', sort=False)}
+
+    def put(self, ticker, df, replace=False, now=None, since=None):
+        """봉 upsert (replace=True 면 기존 이력 삭제 후 저장 · since: 요청한 이력 시작일)"""
+        df = df.reindex(columns=_COLS)
+        recs = [(ticker, d.strftime("%Y-%m-%d"), *map(_num, r))
+                for d, r in zip(df.index, df.itertuples(index=False))]
+        with self._conn() as c:
+            if replace:
+                c.execute("DELETE FROM bars WHERE ticker=?", (ticker,))
+                c.execute("DELETE FROM state WHERE ticker=?", (ticker,))
+                c.execute("DELETE FROM result WHERE ticker=?", (ticker,))
+                c.execute("DELETE FROM span WHERE ticker=?", (ticker,))
+            if since is not None:
+                c.execute("INSERT OR REPLACE INTO span VALUES (?,?)",
+                          (ticker, pd.Timestamp(since).strftime("%Y-%m-%d")))
+            c.executemany("INSERT OR REPLACE INTO bars VALUES (?,?,?,?,?,?,?)", recs)
+            tail = c.execute("SELECT date,close FROM bars WHERE ticker=? "
+                             "ORDER BY date DESC LIMIT 2", (ticker,)).fetchall()
+            last = tail[0][0] if tail else None
+            anc  = tail[-1] if tail else (None, None)
+            c.execute("INSERT OR REPLACE INTO meta VALUES (?,?,?,?,?)",
+                      (ticker, now or time.time(), last, *anc))
+
+    def tickers(self):
+        """캐시에 있는 종목 (이름순)"""
+        with self._conn() as c:
+            return [r[0] for r in c.execute("SELECT ticker FROM meta ORDER BY ticker")]
+
+    def touch(self, ticker, now=None):
+        """새 봉 없이 확인만 한 경우 fetched_at 갱신"""
+        with self._conn() as c:
+            c.execute("UPDATE meta SET fetched_at=? WHERE ticker=?",
+                      (now or time.time(), ticker))
+
+    def invalidate(self, tickers):
+        """다음 스캔에서 전체 이력을 다시 받도록 표시 (분할/수정주가 수동 재구축)"""
+        tickers = list(tickers)
+        with self._conn() as c:
+            c.executemany("DELETE FROM meta WHERE ticker=?", [(t,) for t in tickers])
+            c.executemany("DELETE FROM bars WHERE ticker=?", [(t,) for t in tickers])
+            c.executemany("DELETE FROM state WHERE ticker=?", [(t,) for t in tickers])
+            c.executemany("DELETE FROM result WHERE ticker=?", [(t,) for t in tickers])
+            c.executemany("DELETE FROM span WHERE ticker=?", [(t,) for t in tickers])
+
+    def coverage(self, tickers):
+        """{종목: 캐시 이력이 보장하는 시작일 'YYYY-MM-DD'} — 기록된 요청 시작일과 첫 봉 중 이른 쪽"""
+        out = {}
+        with self._conn() as c:
+            for part in chunked(list(tickers), 500):
+                q = ",".join("?"*len(part))
+                out.update(c.execute(f"SELECT ticker,MIN(date) FROM bars "
+                                     f"WHERE ticker IN ({q}) GROUP BY ticker", part))
+                for t, s in c.execute(f"SELECT ticker,since FROM span WHERE ticker IN ({q})",
+                                      part):
+                    out[t] = min(s, out.get(t) or s)
+        return out
+
+    def get_states(self, tickers):
+        """{종목: 직렬화된 지표 상태} — gescan.online.IndicatorState.dumps() 값"""
+        out = {}
+        with self._conn() as c:
+            for part in chunked(list(tickers), 500):
+                q = ",".join("?"*len(part))
+                out.update(c.execute(
+                    f"SELECT ticker,blob FROM state WHERE ticker IN ({q})", part))
+        return out
+
+    def put_states(self, states):
+        """{종목: (마지막 날짜, 직렬화된 지표 상태)} 저장"""
+        recs = [(t, d, b) for t, (d, b) in states.items()]
+        with self._conn() as c:
+            c.executemany("INSERT OR REPLACE INTO state VALUES (?,?,?)", recs)
+
+
+    def get_results(self, tickers):
+        """{종목: (마지막 봉 지문, 직렬화된 Result)} — 직전 스캔 결과"""
+        out = {}
+        with self._conn() as c:
+            for part in chunked(list(tickers), 500):
+                q = ",".join("?"*len(part))
+                for t, st, row in c.execute(
+                        f"SELECT ticker,stamp,row FROM result WHERE ticker IN ({q})", part):
+                    out[t] = (st, row)
+        return out
+
+    def put_results(self, results):
+        """{종목: (마지막 봉 지문, 직렬화된 Result)} 저장"""
+        recs = [(t, st, row) for t, (st, row) in results.items()]
+        with self._conn() as c:
+            c.executemany("INSERT OR REPLACE INTO result VALUES (?,?,?)", recs)
+
+    def get_bad(self, tickers):
+        """{종목: (이유, 연속 실패 수, 실패 시각, 만료 시각)} (만료된 것 포함)"""
+        out = {}
+        with self._conn() as c:
+            for part in chunked(list(tickers), 500):
+                q = ",".join("?"*len(part))
+                for t, *rec in c.execute(f"SELECT ticker,reason,count,failed_at,until "
+                                         f"FROM bad WHERE ticker IN ({q})", part):
+                    out[t] = tuple(rec)
+        return out
+
+    def put_bad(self, records):
+        """{종목: (이유, 연속 실패 수, 실패 시각, 만료 시각)} 저장"""
+        with self._conn() as c:
+            c.executemany("INSERT OR REPLACE INTO bad VALUES (?,?,?,?,?)",
+                          [(t, *rec) for t, rec in records.items()])
+
+    def clear_bad(self, tickers=None):
+        """불량 기록 삭제 (tickers=None 이면 전체) → 지운 수"""
+        with self._conn() as c:
+            if tickers is None: return c.execute("DELETE FROM bad").rowcount
+            return sum(c.execute("DELETE FROM bad WHERE ticker=?", (t,)).rowcount
+                       for t in tickers)
+
+
+def _num(v):
+    return None if pd.isna(v) else float(v)
+
+
+# ─────────────────────────────────────────────
+# 캐시 경유 다운로드
+# ─────────────────────────────────────────────
+
+def iter_cached(tickers, store, chunk=50, period="18mo", interval="1d", timeout=15,
+                threads=True, rebuild=False, tol=1e-4, now=None, download=download_chunk):
+    """
+    iter_download 와 같은 (종목, 프레임 | None) 스트림
+    신선한 캐시 → 델타 요청 → 전체 요청 순으로 내보냄
+    download: download_chunk 와 같은 형식의 청크 다운로더 (FetchScheduler.download 등)
+    """
+    if interval != "1d":
+        raise ValueError("캐시는 일봉(1d)만 지원")
+    now = now or time.time()
+    tickers = list(dict.fromkeys(tickers))
+    since = period_start(period, now)
+    info = {} if rebuild else store.info(tickers)
+
+    cover = {} if rebuild else store.coverage(list(info))
+    short = (since + pd.Timedelta(days=7)).strftime("%Y-%m-%d")   # 휴장일 여유
+
+    fresh, delta, full = [], [], []
+    for t in tickers:
+        i = info.get(t)
+        if i is None or i[2] is None:   full.append(t)
+        elif cover.get(t, "9") > short: full.append(t)    # 요청 기간이 캐시 이력보다 김
+        elif is_fresh(t, i[0], now):    fresh.append(t)
+        else:                           delta.append(t)
+
+    hit = store.load(fresh, since)
+    for t in fresh:
+        yield t, hit.get(t)
+
+    # 델타: anchor(마지막 두 봉 중 앞) 날짜부터 다시 받아 upsert
+    for part in chunked(delta, chunk):
+        start = min(info[t][2] for t in part)
+        got = download(part, interval=interval, timeout=timeout,
+                             threads=threads, start=start)
+        ok = []
+        for t in part:
+            f = got.get(t)
+            _, _, anc_d, anc_c = info[t]
+            if f is None:
+                ok.append(t); continue          # 요청 실패 → 기존 캐시로 대체
+            f = f[f.index >= pd.Timestamp(anc_d)]
+            ref = f['Close'].get(pd.Timestamp(anc_d))
+            if ref is None or pd.isna(ref) or anc_c is None \
+                    or abs(ref/anc_c - 1) > tol:
+                full.append(t); continue         # 과거가 변경 → 재구축
+            if len(f): store.put(t, f, now=now)
+            else:      store.touch(t, now)
+            ok.append(t)
+        hit = store.load(ok, since)
+        for t in ok:
+            yield t, hit.get(t)
+
+    # 전체: 캐시 없음 / 재구축
+    for part in chunked(full, chunk):
+        got = download(part, period=period, interval=interval,
+                             timeout=timeout, threads=threads)
+        for t, f in got.items():
+            store.put(t, f, replace=True, now=now, since=since)
+        hit = store.load(list(got), since)
+        for t in part:
+            yield t, hit.get(t)
@@ -0,0 +1,65 @@
+"""
+상위 시간대 확인 (주봉 · 월봉)
+이미 받은 일봉을 주봉 · 월봉으로 다시 묶어 같은 지표 · 12단계 신호를 계산한다 — 추가 요청 없음.
+일봉 신호를 주봉 · 월봉 신호로 거르는 확인 필터용 (Result 의 sig_w/score_w · sig_m/score_m).
+
+묶기 : 시가 첫 값 · 고가 최대 · 저가 최소 · 종가 마지막 · 거래량 합 (거래 없는 기간은 버림)
+       진행 중인 주 · 달은 마지막 일봉까지로 묶는다
+기간 : 일목(52 + 26봉)을 채우려면 시간대마다 80봉 이상 필요 → 일봉 기간을 늘려 받는다 (HISTORY)
+"""
+
+import numpy as np
+
+from gescan.panel import panel_tails
+from gescan.store import period_start
+
+# 시간대 → (pandas 리샘플 규칙, 라벨)
+TF = {"W": ("W-FRI", "주봉"), "M": ("ME", "월봉")}
+# 시간대별로 80봉을 채우는 일봉 기간
+HISTORY = {"W": "2y", "M": "8y"}
+AGG = {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"}
+
+
+def timeframes(tfs):
+    """'W' · 'M' · 'WM' · ['W','M'] → 순서 고정 튜플 (모르는 시간대는 ValueError)"""
+    tfs = set(tfs or ())
+    bad = tfs - set(TF)
+    if bad: raise ValueError(f"지원하지 않는 시간대: {', '.join(sorted(bad))}")
+    return tuple(k for k in TF if k in tfs)
+
+def history_for(tfs, period="18mo"):
+    """시간대를 계산할 수 있게 늘린 일봉 기간 (period 가 더 길면 그대로)"""
+    return min([period, *(HISTORY[k] for k in timeframes(tfs))], key=period_start)
+
+
+def resample(raw, tf):
+    """일봉 OHLCV → 주봉 · 월봉 OHLCV"""
+    if raw is None or not len(raw): return None
+    agg = {c: f for c, f in AGG.items() if c in raw.columns}
+    return raw.resample(TF[tf][0]).agg(agg).dropna(subset=["Close"])
+
+
+def tf_codes(frames, tfs, dtype=np.float64):
+    """
+    {종목: 일봉 OHLCV} → {종목: {시간대: (신호 코드, 총점)}}
+    시간대마다 묶은 프레임을 panel 방식으로 한 번에 계산 (봉 수가 모자라면 그 시간대는 빠짐)
+    """
+    from gescan.analysis import summarize        # analysis → timeframe 순환 import 방지
+    out = {t: {} for t in frames}
+    for tf in timeframes(tfs):
+        tails = panel_tails({t: resample(f, tf) for t, f in frames.items()}, dtype=dtype)
+        for t, df_f in tails.items():
+            r = summarize(df_f, t, "", "", "")
+            if r is not None: out[t][tf] = (r.sig, r.score)
+    return out
+
+def with_timeframes(rows, codes):
+    """결과 행에 시간대 신호 채우기 (계산 못 한 시간대는 신호 -1 · 총점 None)"""
+    out = []
+    for r in rows:
+        c = codes.get(r.ticker, {}) if r is not None else {}
+        if c:
+            w, m = c.get("W", (-1, None)), c.get("M", (-1, None))
+            r = r._replace(sig_w=w[0], score_w=w[1], sig_m=m[0], score_m=m[1])
+        out.append(r)
+    return out
@@ -0,0 +1,131 @@
+"""
+스캔 계측
+단계별 · 종목별 소요 시간, 재시도/타임아웃/빈 프레임 건수, 대기열 깊이를 모아
+요약 표(p50 · p95 · max, 느린 종목)와 JSONL 기록으로 내보낸다.
+
+단계 이름
+  종목목록 · 다운로드 · 지표 · 일목 · 신호 · 분류(구간 코드) · 표(화면 갱신)
+배치 단위로 재는 단계(다운로드, 패널/증분 지표)는 종목 수로 나눠 종목당 시간으로 본다.
+계산 프로세스에서 잰 기록은 state() 로 돌려받아 merge() 한다.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+# FetchScheduler.stats 키 → 표시 이름
+REQ = {'ok': '요청 성공', 'retry': '재시도', 'throttle': '차단(429)', 'timeout': '타임아웃',
+       'empty': '빈 응답', 'error': '요청 오류'}
+
+DEFAULT_PATH = os.environ.get(
+    "GESCAN_TRACE",
+    os.path.join(os.path.expanduser("~"), ".cache", "gescan", "trace.jsonl"))
+
+
+class Trace:
+    """
+    events : (단계, 종목 | None, 초, 종목 수) 목록
+    counts : 재시도 · 타임아웃 · 빈 프레임 · 오류 등 건수
+    depth  : 계산 단계가 꺼낼 때의 대기열 깊이 표본
+    errors : 종목 → 예외 이름 · 봉 부족(n) (결과가 None 인 이유)
+    """
+
+    def __init__(self):
+        self.events = []; self.counts = Counter(); self.depth = []; self.errors = {}
+        self.t0 = time.time(); self._lock = threading.Lock()
+
+    # ── 기록 ────────────────────────────────────
+    def add(self, stage, secs, ticker=None, n=1):
+        with self._lock: self.events.append((stage, ticker, secs, n))
+
+    @contextmanager
+    def span(self, stage, ticker=None, n=1):
+        a = time.perf_counter()
+        try: yield
+        finally: self.add(stage, time.perf_counter() - a, ticker, n)
+
+    def count(self, key, n=1):
+        if n:
+            with self._lock: self.counts[key] += n
+
+    def fail(self, ticker, e):
+        with self._lock:
+            self.errors[ticker] = type(e).__name__; self.counts['오류'] += 1
+
+    def short(self, ticker, bars):
+        """봉 수 부족으로 계산하지 않은 종목"""
+        with self._lock:
+            self.errors[ticker] = f"봉 부족({bars})"; self.counts['봉 부족'] += 1
+
+    def requests(self, before, after):
+        """스케줄러 stats 의 스캔 전후 차이를 요청 결과 건수로 기록"""
+        for k, v in (Counter(after) - Counter(before)).items():
+            self.count(REQ.get(k, k), v)
+
+    # ── 프로세스 간 전달 ─────────────────────────
+    def state(self):
+        return self.events, dict(self.counts), self.errors
+
+    def merge(self, state):
+        ev, cn, er = state
+        with self._lock:
+            self.events.extend(ev); self.counts.update(cn); self.errors.update(er)
+
+    # ── 요약 ────────────────────────────────────
+    def stages(self):
+        """단계별 종목당 소요 시간 (ms) — 건수 · p50 · p95 · max · 합계(초)"""
+        by = defaultdict(list); tot = Counter(); cnt = Counter()
+        for st, _, s, n in self.events:
+            by[st].append(s/max(n, 1)); tot[st] += s; cnt[st] += n
+        out = []
+        for st, v in by.items():
+            a = np.array(v)*1000
+            out.append({"단계": st, "종목": cnt[st], "p50(ms)": np.percentile(a, 50),
+                        "p95(ms)": np.percentile(a, 95), "max(ms)": a.max(),
+                        "합계(초)": tot[st]})
+        return pd.DataFrame(out, columns=["단계","종목","p50(ms)","p95(ms)","max(ms)","합계(초)"])
+
+    def tickers(self):
+        """종목별 합계 시간(초) — 배치 단계는 종목 수로 나눈 몫을 더함"""
+        t = defaultdict(float)
+        for _, tk, s, n in self.events:
+            if tk is None: continue
+            if isinstance(tk, str): t[tk] += s
+            else:
+                for x in tk: t[x] += s/max(n, 1)
+        return pd.Series(t, dtype=float).sort_values(ascending=False)
+
+    def slowest(self, k=10):
+        s = self.tickers().head(k)
+        return pd.DataFrame({"티커": s.index, "소요(ms)": (s.to_numpy()*1000).round(1)})
+
+    def summary(self, **extra):
+        """JSONL 한 줄용 스캔 요약"""
+        d = np.array(self.depth) if self.depth else np.zeros(1)
+        return {"type": "scan", "ts": self.t0, "wall": round(time.time() - self.t0, 3),
+                **extra,
+                "stages": self.stages().round(3).to_dict("records"),
+                "counts": dict(self.counts),
+                "queue": {"mean": round(float(d.mean()), 2), "max": int(d.max())},
+                "slowest": self.slowest(10).values.tolist(),
+                "errors": self.errors}
+
+    def dump(self, path=DEFAULT_PATH, detail=True, **extra):
+        """JSONL 에 추가 — 종목별 행(detail) + 스캔 요약 한 줄"""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            if detail:
+                per = defaultdict(dict)
+                for stg, tk, s, n in self.events:
+                    if isinstance(tk, str):
+                        per[tk][stg] = round(per[tk].get(stg, 0) + s*1000, 3)
+                for tk, v in per.items():
+                    f.write(json.dumps({"type": "ticker", "ts": self.t0, "ticker": tk,
+                                        "ms": v}, ensure_ascii=False) + "\n")
+            f.write(json.dumps(self.summary(**extra), ensure_ascii=False) + "\n")
@@ -0,0 +1,264 @@
+"""
+종목 목록 (지수 구성 종목)
+Wikipedia 파싱 결과를 검증해 버전별 로컬 스냅샷으로 저장하고, 평소에는 스냅샷을 읽는다.
+  - 스냅샷이 오래되면(기본 7일) 백그라운드로 다시 받아 검증을 통과할 때만 교체
+  - 파싱 실패 · 검증 실패(종목 수 · 티커 형식) 시 기존 스냅샷 유지
+  - 스냅샷이 한 번도 없고 받기도 실패할 때만 하드코딩 폴백 (정보의 source='fallback')
+
+  python -m gescan.universe refresh sp500 dax40     # 수동 / cron 갱신
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+
+import pandas as pd
+
+from gescan.store import DEFAULT_DIR
+
+# ─────────────────────────────────────────────
+# 하드코딩 폴백 종목 목록
+# ─────────────────────────────────────────────
+
+DOW30 = [
+    ("AAPL","Apple"),("AMGN","Amgen"),("AXP","AmEx"),("BA","Boeing"),
+    ("CAT","Caterpillar"),("CRM","Salesforce"),("CSCO","Cisco"),
+    ("CVX","Chevron"),("DIS","Disney"),("DOW","Dow Inc"),
+    ("GS","Goldman"),("HD","Home Depot"),("HON","Honeywell"),
+    ("IBM","IBM"),("INTC","Intel"),("JNJ","J&J"),("JPM","JPMorgan"),
+    ("KO","Coca-Cola"),("MCD","McDonald's"),("MMM","3M"),
+    ("MRK","Merck"),("MSFT","Microsoft"),("NKE","Nike"),
+    ("PG","P&G"),("TRV","Travelers"),("UNH","UnitedHealth"),
+    ("V","Visa"),("VZ","Verizon"),("WBA","Walgreens"),("WMT","Walmart"),
+]
+
+DAX40 = [
+    ("ADS.DE","Adidas"),("AIR.DE","Airbus"),("ALV.DE","Allianz"),
+    ("BAS.DE","BASF"),("BAYN.DE","Bayer"),("BEI.DE","Beiersdorf"),
+    ("BMW.DE","BMW"),("BNR.DE","Brenntag"),("CON.DE","Continental"),
+    ("1COV.DE","Covestro"),("DHER.DE","Delivery Hero"),("DB1.DE","Deutsche Boerse"),
+    ("DBK.DE","Deutsche Bank"),("DHL.DE","DHL Group"),("DTE.DE","Deutsche Telekom"),
+    ("EOAN.DE","E.ON"),("FRE.DE","Fresenius"),("HNR1.DE","Hannover Re"),
+    ("HEI.DE","HeidelbergMaterials"),("HEN3.DE","Henkel"),("IFX.DE","Infineon"),
+    ("INL.DE","Inlining"),("LIN.DE","Linde"),("MBG.DE","Mercedes-Benz"),
+    ("MRK.DE","Merck KGaA"),("MTX.DE","MTU Aero"),("MUV2.DE","Munich Re"),
+    ("PAH3.DE","Porsche Holding"),("RHM.DE","Rheinmetall"),("RWE.DE","RWE"),
+    ("SAP.DE","SAP"),("SHL.DE","Siemens Healthineers"),("SIE.DE","Siemens"),
+    ("SRT3.DE","Sartorius"),("SY1.DE","Symrise"),("VNA.DE","Vonovia"),
+    ("VOW3.DE","Volkswagen"),("ZAL.DE","Zalando"),
+]
+
+NASDAQ100_SAMPLE = [
+    ("AAPL","Apple"),("MSFT","Microsoft"),("NVDA","Nvidia"),("AMZN","Amazon"),
+    ("META","Meta"),("GOOGL","Alphabet A"),("GOOG","Alphabet C"),("TSLA","Tesla"),
+    ("AVGO","Broadcom"),("COST","Costco"),("NFLX","Netflix"),("AMD","AMD"),
+    ("ADBE","Adobe"),("QCOM","Qualcomm"),("INTC","Intel"),("TXN","Texas Instr"),
+    ("AMAT","Applied Materials"),("INTU","Intuit"),("AMGN","Amgen"),("ISRG","Intuitive Surgical"),
+    ("BKNG","Booking"),("VRTX","Vertex"),("REGN","Regeneron"),("MU","Micron"),
+    ("LRCX","Lam Research"),("KLAC","KLA"),("MRVL","Marvell"),("SNPS","Synopsys"),
+    ("CDNS","Cadence"),("PANW","Palo Alto"),("CRWD","CrowdStrike"),("MELI","MercadoLibre"),
+    ("ADI","Analog Devices"),("ABNB","Airbnb"),("ORLY","O'Reilly"),("CSX","CSX"),
+    ("PYPL","PayPal"),("PCAR","Paccar"),("MAR","Marriott"),("FTNT","Fortinet"),
+    ("ADP","ADP"),("DXCM","Dexcom"),("ASML","ASML"),("TEAM","Atlassian"),
+    ("MNST","Monster"),("CHTR","Charter"),("BIIB","Biogen"),("IDXX","IDEXX"),
+    ("WDAY","Workday"),("CTAS","Cintas"),
+]
+
+INDICES = {
+    "🇺🇸 S&P 500":    "sp500",
+    "🇺🇸 나스닥 100":  "nasdaq100",
+    "🇺🇸 다우존스 30": "dow30",
+    "🇩🇪 DAX 40":     "dax40",
+}
+CURRENCY = {"sp500":"USD","nasdaq100":"USD","dow30":"USD","dax40":"EUR"}
+
+
+# ─────────────────────────────────────────────
+# 종목 목록 로드
+# ─────────────────────────────────────────────
+
+# 지수별 Wikipedia 페이지 · 검증 기준 (종목 수 범위, 티커 형식)
+WIKI = {
+    "sp500":     "https://en.wikipedia.org/wiki/List_of_S%26P_500_companies",
+    "dow30":     "https://en.wikipedia.org/wiki/Dow_Jones_Industrial_Average",
+    "nasdaq100": "https://en.wikipedia.org/wiki/Nasdaq-100",
+    "dax40":     "https://en.wikipedia.org/wiki/DAX",
+}
+EXPECT = {"sp500": (490, 520), "nasdaq100": (95, 110), "dow30": (30, 30), "dax40": (40, 40)}
+TICKER_RE = {"sp500":     r"^[A-Z]{1,5}(-[A-Z])?$",
+             "nasdaq100": r"^[A-Z]{1,5}$",
+             "dow30":     r"^[A-Z]{1,5}$",
+             "dax40":     r"^[0-9A-Z]{2,6}\.DE$"}
+
+SNAP_DIR = os.path.join(DEFAULT_DIR, "universe")
+MAX_AGE  = 7*86400      # 이보다 오래된 스냅샷은 백그라운드 갱신
+KEEP     = 5            # 지수별 보관 버전 수
+
+
+def _frame(t, tc, nc=None, sc=None, ok=None):
+    """표 → (ticker, name, sector) DataFrame (열 단위 연산)"""
+    tk = t[tc].astype(str).str.strip()
+    df = pd.DataFrame({"ticker": tk,
+                       "name":   t[nc].astype(str).str.strip() if nc else tk,
+                       "sector": t[sc].astype(str).str.strip() if sc else ""})
+    return df[ok(tk)] if ok else df
+
+def _cols(t):
+    return {str(c).lower(): c for c in t.columns}
+
+def fetch_universe(index_key):
+    """Wikipedia 파싱 → (ticker, name, sector) DataFrame (실패 시 예외)"""
+    tables = pd.read_html(WIKI[index_key])
+    if index_key == "sp500":
+        t = tables[0]; c = _cols(t)
+        df = _frame(t, c["symbol"], c["security"], c.get("gics sector"))
+        df["ticker"] = df["ticker"].str.replace(".", "-", regex=False)
+        return df.reset_index(drop=True)
+    for t in tables:
+        c = _cols(t)
+        if index_key == "dow30" and "symbol" in c:
+            return _frame(t, c["symbol"], c.get("company"), c.get("industry"),
+                          lambda s: s.str.isalpha()).reset_index(drop=True)
+        if index_key in ("nasdaq100", "dax40") and "ticker" in c:
+            ok = ((lambda s: s.str.isalpha()) if index_key == "nasdaq100" else
+                  (lambda s: s.str.endswith(".DE")))
+            df = _frame(t, c["ticker"], c.get("company", c.get("name")), None, ok)
+            if len(df): return df.reset_index(drop=True)
+    raise ValueError(f"{index_key}: 구성 종목 표를 찾지 못함")
+
+def validate(index_key, df):
+    """문제 목록 (비어 있으면 통과) — 종목 수 · 티커 형식 · 중복 · 빈 이름"""
+    bad = []
+    lo, hi = EXPECT.get(index_key, (1, 10**6))
+    if not lo <= len(df) <= hi: bad.append(f"종목 수 {len(df)} (기대 {lo}~{hi})")
+    fmt = ~df["ticker"].str.match(TICKER_RE.get(index_key, r".+"))
+    if fmt.any(): bad.append(f"티커 형식 오류 {fmt.sum()}개: {', '.join(df['ticker'][fmt][:5])}")
+    if df["ticker"].duplicated().any(): bad.append("중복 티커")
+    if (df["name"].str.len() == 0).any(): bad.append("빈 종목명")
+    return bad
+
+
+# ─────────────────────────────────────────────
+# 스냅샷 (버전별 JSON)
+# ─────────────────────────────────────────────
+
+def snapshots(index_key):
+    """저장된 스냅샷 경로 (오래된 → 최신)"""
+    if not os.path.isdir(SNAP_DIR): return []
+    return sorted(os.path.join(SNAP_DIR, f) for f in os.listdir(SNAP_DIR)
+                  if f.startswith(f"{index_key}-") and f.endswith(".json"))
+
+def read_snapshot(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def save_snapshot(index_key, df, source=""):
+    """검증된 목록을 새 버전으로 저장 (임시 파일 → 교체) 후 오래된 버전 정리"""
+    os.makedirs(SNAP_DIR, exist_ok=True)
+    now = time.time(); ver = time.strftime("%Y%m%dT%H%M%S", time.gmtime(now))
+    path = os.path.join(SNAP_DIR, f"{index_key}-{ver}.json")
+    snap = {"index": index_key, "version": ver, "created": now, "source": source,
+            "count": len(df), "rows": df.to_dict("records")}
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(snap, f, ensure_ascii=False)
+    os.replace(tmp, path)
+    for old in snapshots(index_key)[:-KEEP]:
+        try: os.remove(old)
+        except OSError: pass
+    return path
+
+def refresh(index_key):
+    """받아서 검증을 통과할 때만 새 스냅샷으로 교체 → (성공 여부, 메시지)"""
+    try:
+        df = fetch_universe(index_key)
+    except Exception as e:
+        return False, f"{index_key}: 받기 실패 ({type(e).__name__})"
+    bad = validate(index_key, df)
+    if bad:
+        return False, f"{index_key}: 검증 실패 — " + "; ".join(bad)
+    save_snapshot(index_key, df, WIKI[index_key])
+    return True, f"{index_key}: {len(df)}개 저장"
+
+_running = set(); _lock = threading.Lock()
+
+def refresh_async(index_key):
+    """백그라운드 갱신 (지수별 하나만 실행)"""
+    with _lock:
+        if index_key in _running: return
+        _running.add(index_key)
+    def job():
+        try: refresh(index_key)
+        finally:
+            with _lock: _running.discard(index_key)
+    threading.Thread(target=job, daemon=True, name=f"gescan-universe-{index_key}").start()
+
+
+# ─────────────────────────────────────────────
+# 종목 목록 로드
+# ─────────────────────────────────────────────
+
+def load_universe(index_key, max_age=MAX_AGE, background=True):
+    """
+    (종목 목록, 정보) — 최신 스냅샷을 바로 돌려주고, 오래됐으면 백그라운드로 갱신
+    스냅샷이 없을 때만 그 자리에서 받고, 그것도 실패하면 하드코딩 폴백
+    정보: source('snapshot' | 'fallback'), version, age(초), note
+    """
+    snaps = snapshots(index_key)
+    if not snaps:
+        ok, note = refresh(index_key)
+        snaps = snapshots(index_key)
+    else:
+        note = ""
+    for path in reversed(snaps):
+        try: snap = read_snapshot(path)
+        except (OSError, ValueError): continue
+        age = time.time() - snap["created"]
+        if age > max_age:
+            if background: refresh_async(index_key)
+            else: refresh(index_key)
+        return snap["rows"], {"source": "snapshot", "version": snap["version"],
+                              "age": age, "count": snap["count"], "note": note}
+
+    fallback = {
+        "dow30":    DOW30,
+        "dax40":    DAX40,
+        "nasdaq100":NASDAQ100_SAMPLE,
+        "sp500":    DOW30,   # sp500 목록을 한 번도 받지 못한 경우 다우 30개로 대체
+    }
+    rows = [{"ticker": t, "name": n, "sector": ""} for t, n in fallback.get(index_key, [])]
+    return rows, {"source": "fallback", "version": None, "age": None,
+                  "count": len(rows), "note": note}
+
+def load_tickers(index_key: str):
+    """스냅샷 → (없으면) Wikipedia → 하드코딩 폴백"""
+    return load_universe(index_key)[0]
+
+
+def select_tickers(tlist, sector="", max_n=None):
+    """섹터 부분 문자열 필터 → 앞에서 max_n 개"""
+    if sector:
+        tlist=[t for t in tlist if sector.lower() in t.get('sector','').lower()]
+    return tlist[:max_n] if max_n else tlist
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] not in ("refresh", "show"):
+        print("사용법: python -m gescan.universe refresh|show [지수 ...]", file=sys.stderr)
+        return 2
+    keys = argv[1:] or list(CURRENCY)
+    bad = 0
+    for k in keys:
+        if argv[0] == "refresh":
+            ok, msg = refresh(k); bad += not ok; print(msg)
+        else:
+            rows, info = load_universe(k, background=False)
+            print(f"{k}: {info['count']}개 · {info['source']} {info['version'] or ''}")
+    return 1 if bad else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())